@@ -0,0 +1,295 @@
+"""
+Admission-Control Server
+Author: OS Learning Project
+Description: asyncio front end that puts the Banker's check in front of many
+             local client processes, plus a load generator to measure it
+
+Protocol: one command per line, one response line per command, in order
+    REQ <pid> <v0> ... <vm-1>   ->  GRANT | DENY <reason>
+    REL <pid> <v0> ... <vm-1>   ->  OK
+    STATE                       ->  OK <json with available, allocation, need>
+    DETECT                      ->  SAFE <P.. sequence> | UNSAFE
+    any failure                 ->  ERR <message>
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AdmissionServer:
+    """
+    Serves one DeadlockDetectionSimulator to many connections.
+    Requests arriving within `window` seconds are coalesced into one
+    admit_batch call, which costs a single safety check whenever the whole
+    window can be granted (one per request otherwise). Every state operation runs on a single worker thread,
+    so checks never block the event loop and never race each other.
+    """
+
+    def __init__(self, simulator, window=0.002, policy="fifo"):
+        self.simulator = simulator
+        self.window = window
+        self.policy = policy
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._flush_handle = None
+        self.batches = 0
+        self.requests = 0
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        """Start listening on localhost TCP, or on a Unix socket when unix_path is given"""
+        if unix_path:
+            return await asyncio.start_unix_server(self._handle, path=unix_path)
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader, writer):
+        responses = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors="replace").split()
+                responses.put_nowait(asyncio.ensure_future(self._dispatch(words)))
+            responses.put_nowait(None)
+            await sender
+        except (ConnectionError, asyncio.CancelledError):
+            sender.cancel()     # client went away or the server is shutting down
+        writer.close()
+
+    async def _send(self, responses, writer):
+        # Responses go out in command order even though batches finish together
+        while True:
+            pending = await responses.get()
+            if pending is None:
+                break
+            writer.write((await pending + "\n").encode())
+            if responses.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+
+    async def _dispatch(self, words):
+        if any("\ufffd" in word for word in words):
+            return "ERR command is not valid UTF-8"
+        try:
+            command = words[0].upper() if words else ""
+            if command == "REQ":
+                return await self._request(int(words[1]), [int(v) for v in words[2:]])
+            if command == "REL":
+                return await self._run(self._release, int(words[1]), [int(v) for v in words[2:]])
+            if command == "STATE":
+                return await self._run(self._state)
+            if command == "DETECT":
+                return await self._run(self._detect)
+            return f"ERR unknown command '{command}'"
+        except (IndexError, ValueError) as exc:
+            return f"ERR {exc}"
+
+    def _run(self, function, *args):
+        # Requests still in the coalescing window go first, so every connection
+        # sees its own commands applied in order
+        if self._pending and function != self._admit:     # bound methods are new objects; compare equal
+            self._flush_handle.cancel()
+            self._flush()
+        return asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _request(self, process_id, request):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((process_id, request, future))
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return future
+
+    def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        task = self._run(self._admit, [(pid, request) for pid, request, _ in batch])
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _resolve(self, batch, done):
+        if done.cancelled():        # e.g. the executor shut down with the batch still queued
+            error = "ERR server shutting down"
+        elif done.exception() is not None:
+            error = f"ERR {done.exception()}"
+        else:
+            error = None
+            denied = done.result()["denied"]
+        for k, (_, _, future) in enumerate(batch):
+            if future.done():
+                continue            # the connection went away
+            if error is not None:
+                future.set_result(error)
+            else:
+                future.set_result(f"DENY {denied[k]}" if k in denied else "GRANT")
+
+    # The methods below run on the worker thread
+    def _admit(self, requests):
+        self.batches += 1
+        self.requests += len(requests)
+        return self.simulator.admit_batch(requests, policy=self.policy)
+
+    def _release(self, process_id, release):
+        if not 0 <= process_id < self.simulator.num_processes or len(release) != self.simulator.num_resources:
+            return "ERR invalid release"
+        return "OK" if self.simulator.release_resources(process_id, release) else "ERR release exceeds allocation"
+
+    def _state(self):
+        simulator = self.simulator
+        return "OK " + json.dumps({
+            "available": list(simulator.available),
+            "allocation": [list(row) for row in simulator.allocation],
+            "need": [list(row) for row in simulator.need],
+        }, separators=(",", ":"))
+
+    def _detect(self):
+        is_safe, sequence = self.simulator.safety_algorithm()
+        return "SAFE " + " ".join(sequence) if is_safe else "UNSAFE"
+
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, clients=16, requests=500,
+                   num_processes=None, num_resources=None, seed=0):
+    """
+    Load generator: every client sends REQ for a small random request of its own
+    process and, when granted, releases it again with REL.
+    num_processes: spread the clients over the server's first N processes (default: all)
+    num_resources: request only the first N resource types (default: all)
+    Returns: dict with requests per second, p50/p99 latency in ms and grant count
+    Raises: ValueError if the server has fewer processes or resource types
+    """
+    async def connect():
+        if unix_path:
+            return await asyncio.open_unix_connection(unix_path)
+        return await asyncio.open_connection(host, port)
+
+    reader, writer = await connect()
+    writer.write(b"STATE\n")
+    state = json.loads((await reader.readline()).decode().split(" ", 1)[1])
+    writer.close()
+    need = state["need"]
+    num_processes = num_processes or len(need)
+    num_resources = num_resources or len(state["available"])
+    if num_processes > len(need) or num_resources > len(state["available"]):
+        raise ValueError(f"The server has {len(need)} processes and {len(state['available'])} resource types")
+
+    latencies = []
+    granted = [0]
+
+    async def client(index):
+        rng = random.Random(seed * 1000 + index)
+        reader, writer = await connect()
+        pid = index % num_processes
+        for _ in range(requests):
+            request = [rng.randint(0, max(0, v) // 2) if j < num_resources else 0
+                       for j, v in enumerate(need[pid])]
+            line = f"REQ {pid} {' '.join(map(str, request))}\n"
+            start = time.perf_counter()
+            writer.write(line.encode())
+            response = (await reader.readline()).decode()
+            latencies.append(time.perf_counter() - start)
+            if response.startswith("GRANT"):
+                granted[0] += 1
+                writer.write(f"REL {pid} {' '.join(map(str, request))}\n".encode())
+                await reader.readline()
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "granted": granted[0],
+    }
+
+
+def print_load_result(result):
+    """Print a load generator result"""
+    print(f"\n🚦 {result['requests']} requests from {result['clients']} clients: "
+          f"{result['requests_per_second']:,.0f} req/s, p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, {result['granted']} granted")
+
+
+def _demo_simulator(num_processes, num_resources, seed):
+    from deadlock_simulator import DeadlockDetectionSimulator
+
+    rng = random.Random(seed)
+    simulator = DeadlockDetectionSimulator(engine="worklist")
+    simulator.num_processes, simulator.num_resources = num_processes, num_resources
+    simulator.max_need = [[rng.randint(1, 8) for _ in range(num_resources)] for _ in range(num_processes)]
+    simulator.allocation = [[0] * num_resources for _ in range(num_processes)]
+    simulator.available = [sum(row[j] for row in simulator.max_need) // 3 for j in range(num_resources)]
+    simulator.calculate_need()
+    return simulator
+
+
+async def _bench(args):
+    server = AdmissionServer(_demo_simulator(args.processes, args.resources, args.seed), window=args.window / 1000)
+    listener = await server.start(args.host, args.port, args.unix)
+    async with listener:
+        result = await run_load(args.host, args.port, args.unix, args.clients, args.requests, seed=args.seed)
+    print_load_result(result)
+    print(f"   {server.requests} requests evaluated in {server.batches} batches")
+
+
+async def _serve(args):
+    from snapshot_io import load_snapshot
+
+    simulator = load_snapshot(args.snapshot)
+    simulator.engine = "worklist"
+    listener = await AdmissionServer(simulator, window=args.window / 1000).start(args.host, args.port, args.unix)
+    print(f"🔐 Admission server listening on {args.unix or f'{args.host}:{args.port}'}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banker's admission-control server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen/connect on this Unix socket instead of TCP")
+    parser.add_argument("--window", type=float, default=2.0, help="request coalescing window in ms")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve a system loaded from a snapshot")
+    serve.add_argument("snapshot")
+
+    for name in ("load", "bench"):
+        command = commands.add_parser(name, help="run the load generator" if name == "load"
+                                      else "start a demo server in-process and load it")
+        command.add_argument("--clients", type=int, default=16)
+        command.add_argument("--requests", type=int, default=500)
+        if name == "bench":
+            command.add_argument("--processes", type=int, default=64, help="demo system size")
+            command.add_argument("--resources", type=int, default=8)
+        else:
+            command.add_argument("--processes", type=int, help="only drive the first N processes")
+            command.add_argument("--resources", type=int, help="only request the first N resource types")
+        command.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        asyncio.run(_serve(args))
+    elif args.command == "bench":
+        asyncio.run(_bench(args))
+    else:
+        try:
+            result = asyncio.run(run_load(args.host, args.port, args.unix, args.clients, args.requests,
+                                          args.processes, args.resources, seed=args.seed))
+        except ValueError as exc:
+            parser.error(str(exc))
+        print_load_result(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Batch Command Line
+Author: OS Learning Project
+Description: Non-interactive subcommands for scripts and pipelines, printing
+             one JSON result per line and exiting with a meaningful status
+
+Usage (also as `python deadlock_simulator.py ...`):
+    python batch_cli.py [--engine E] check SNAPSHOT... [--exact] [--components] [--recover ACTION [--budget S]]
+    python batch_cli.py request SNAPSHOT... --requests FILE [--policy P] [--save-dir DIR]
+    python batch_cli.py replay SNAPSHOT LOG [--detect-every N]
+    python batch_cli.py bench [--grid G] [--generators G...] [--output F] [--compare BASELINE]
+
+Exit status: 0 when everything is safe/granted, 1 when a system is unsafe, a
+request is denied, a deadlock is found or a benchmark regressed, 2 on errors.
+Every subcommand imports only the modules it uses.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+EXIT_OK = 0
+EXIT_UNSAFE = 1     # unsafe system, denied request, deadlock or regression
+EXIT_ERROR = 2      # unreadable input or invalid arguments
+
+# What reading a malformed or unreadable input file can raise
+# (UnicodeDecodeError is a ValueError)
+INPUT_ERRORS = (OSError, ValueError, KeyError, TypeError, struct.error)
+
+# Same names as benchmark.GENERATORS and benchmark.OPERATIONS, kept here so
+# building the parser does not import the benchmark module
+BENCH_GENERATORS = ("safe", "unsafe", "dense", "sparse", "adversarial")
+BENCH_OPERATIONS = ("calculate_need", "safety_algorithm", "detect_deadlock",
+                    "request_resources", "request_resources_cold")
+
+
+def _emit(result):
+    sys.stdout.write(json.dumps(result, separators=(",", ":")) + "\n")
+
+
+def _each_snapshot(paths, engine):
+    """Yield (path, simulator or None, error message or None) for every snapshot"""
+    from snapshot_io import load_snapshot
+
+    for path in paths:
+        try:
+            simulator = load_snapshot(path)
+        except INPUT_ERRORS as exc:
+            yield path, None, str(exc)
+            continue
+        simulator.engine = engine
+        yield path, simulator, None
+
+
+def cmd_check(args):
+    status = EXIT_OK
+    for path, simulator, error in _each_snapshot(args.snapshots, args.engine):
+        if error is not None:
+            _emit({"file": path, "error": error})
+            status = EXIT_ERROR
+            continue
+        if args.components:
+            simulator.enable_components()
+        is_safe, sequence = simulator.safety_algorithm()
+        result = {
+            "file": path,
+            "processes": simulator.num_processes,
+            "resources": simulator.num_resources,
+            "safe": is_safe,
+            "safe_sequence": sequence,
+        }
+        if args.components:
+            result["components"] = simulator.components.stats()["components"]
+        if args.exact:
+            result["deadlocked"], _ = simulator.find_deadlocked(mode="matrix")
+        if args.recover and not is_safe:
+            try:
+                plan = simulator.plan_recovery(action=args.recover, exact=True, time_budget=args.budget)
+            except ValueError as exc:
+                result["recovery"] = {"action": args.recover, "error": str(exc)}
+            else:
+                result["recovery"] = {key: plan[key] for key in ("action", "victims", "cost", "optimal",
+                                                                 "safe_sequence")}
+        _emit(result)
+        if not is_safe and status == EXIT_OK:
+            status = EXIT_UNSAFE
+    return status
+
+
+def read_requests(path):
+    """
+    Read (process_id, request, priority) from JSON lines like
+    {"pid": 1, "request": [1, 0, 2], "priority": 0} or CSV rows of
+    `pid,priority,v0,v1,...` (a header row starting with `pid` is skipped)
+    """
+    requests = []
+    with open(path, newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            import csv
+
+            for row in csv.reader(f):
+                if row and row[0].strip() != "pid":
+                    requests.append((int(row[0]), [int(v) for v in row[2:]], int(row[1] or 0)))
+        else:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    requests.append((int(item["pid"]), [int(v) for v in item["request"]],
+                                     int(item.get("priority", 0))))
+    return requests
+
+
+def cmd_request(args):
+    try:
+        requests = read_requests(args.requests)
+    except INPUT_ERRORS as exc:
+        _emit({"file": args.requests, "error": str(exc)})
+        return EXIT_ERROR
+    if args.save_dir:
+        try:
+            os.makedirs(args.save_dir, exist_ok=True)
+        except OSError as exc:
+            _emit({"file": args.save_dir, "error": str(exc)})
+            return EXIT_ERROR
+
+    status = EXIT_OK
+    for path, simulator, error in _each_snapshot(args.snapshots, args.engine):
+        if error is not None:
+            _emit({"file": path, "error": error})
+            status = EXIT_ERROR
+            continue
+        result = simulator.admit_batch(requests, policy=args.policy)
+        _emit({
+            "file": path,
+            "granted": result["granted"],
+            "denied": {str(k): reason for k, reason in sorted(result["denied"].items())},
+            "available": result["available"],
+            "safe_sequence": result["safe_sequence"],
+        })
+        if args.save_dir:
+            from snapshot_io import save_snapshot
+
+            target = os.path.join(args.save_dir, os.path.basename(path))
+            try:
+                save_snapshot(simulator, target)
+            except (OSError, ValueError) as exc:
+                _emit({"file": target, "error": str(exc)})
+                status = EXIT_ERROR
+        if result["denied"] and status == EXIT_OK:
+            status = EXIT_UNSAFE
+    return status
+
+
+def cmd_replay(args):
+    from event_replay import replay_log
+
+    path, simulator, error = next(_each_snapshot([args.snapshot], args.engine))
+    if error is not None:
+        _emit({"file": path, "error": error})
+        return EXIT_ERROR
+    try:
+        summary = replay_log(simulator, args.log, args.detect_every)
+    except INPUT_ERRORS as exc:
+        _emit({"file": args.log, "error": str(exc)})
+        return EXIT_ERROR
+    _emit(dict(summary, file=args.log))
+    return EXIT_UNSAFE if summary["deadlocks"] else EXIT_OK
+
+
+def cmd_bench(args):
+    import benchmark
+
+    run = benchmark.run_benchmarks(args.grid, args.generators, args.operations, args.engine,
+                                   args.repeat, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=1)
+    for result in run["results"]:
+        _emit(result)
+    if not args.compare:
+        return EXIT_OK
+    try:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as exc:
+        _emit({"file": args.compare, "error": str(exc)})
+        return EXIT_ERROR
+    regressions = benchmark.compare_results(baseline, run, args.threshold)
+    for result, old_seconds, ratio in regressions:
+        _emit({"regression": True, "generator": result["generator"],
+               "num_processes": result["num_processes"], "num_resources": result["num_resources"],
+               "engine": result["engine"], "operation": result["operation"], "baseline_seconds": old_seconds,
+               "min_seconds": result["min_seconds"], "ratio": ratio})
+    return EXIT_UNSAFE if regressions else EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="deadlock_simulator",
+                                     description="Non-interactive deadlock simulator (JSON lines on stdout)")
+    parser.add_argument("--engine", default="worklist", help="safety engine: scan, worklist, numpy or sparse")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("check", help="check the safety of snapshot files")
+    check.add_argument("snapshots", nargs="+", metavar="SNAPSHOT")
+    check.add_argument("--exact", action="store_true", help="also list deadlocked processes (detection on Need)")
+    check.add_argument("--components", action="store_true",
+                       help="check each group of processes sharing no resource type on its own")
+    check.add_argument("--recover", choices=("terminate", "preempt"),
+                       help="plan the fewest victims that make an unsafe system safe again")
+    check.add_argument("--budget", type=float, default=1.0, metavar="SECONDS",
+                       help="time for the exact recovery search (default: 1)")
+    check.set_defaults(handler=cmd_check)
+
+    request = commands.add_parser("request", help="apply a request file to every snapshot")
+    request.add_argument("snapshots", nargs="+", metavar="SNAPSHOT")
+    request.add_argument("--requests", required=True, metavar="FILE", help=".jsonl or .csv request file")
+    request.add_argument("--policy", default="fifo", choices=("fifo", "priority", "max-grants"))
+    request.add_argument("--save-dir", metavar="DIR", help="write every resulting state here (created if missing)")
+    request.set_defaults(handler=cmd_request)
+
+    replay = commands.add_parser("replay", help="replay an event log against a snapshot")
+    replay.add_argument("snapshot")
+    replay.add_argument("log")
+    replay.add_argument("--detect-every", type=int, default=0, metavar="N")
+    replay.set_defaults(handler=cmd_replay)
+
+    bench = commands.add_parser("bench", help="run the benchmark suite")
+    bench.add_argument("--grid", default="quick", choices=("quick", "standard", "full"))
+    bench.add_argument("--generators", nargs="+", choices=BENCH_GENERATORS, default=None)
+    bench.add_argument("--operations", nargs="+", choices=BENCH_OPERATIONS, default=BENCH_OPERATIONS[:4])
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--output", metavar="FILE", help="also save the full run as JSON")
+    bench.add_argument("--compare", metavar="BASELINE")
+    bench.add_argument("--threshold", type=float, default=0.10)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from deadlock_simulator import get_engine
+
+    try:
+        get_engine(args.engine)
+    except (ValueError, ImportError) as exc:
+        _emit({"error": str(exc)})
+        return EXIT_ERROR
+    try:
+        return args.handler(args)
+    except BrokenPipeError:     # e.g. piped into `head`
+        return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Benchmark Suite
+Author: OS Learning Project
+Description: Reproducible timings and peak memory of calculate_need,
+             safety_algorithm, request_resources and detect_deadlock on generated
+             systems up to 10k x 500, saved as JSON and compared across runs
+"""
+
+import argparse
+import json
+import operator
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from deadlock_simulator import DeadlockDetectionSimulator
+
+# Size grids: (processes, resources)
+GRIDS = {
+    "quick": [(100, 10), (500, 20), (1000, 50)],
+    "standard": [(100, 10), (1000, 50), (2000, 100), (5000, 200)],
+    "full": [(100, 10), (1000, 50), (2000, 100), (5000, 200), (10000, 500)],
+}
+
+OPERATIONS = ("calculate_need", "safety_algorithm", "detect_deadlock",
+              "request_resources", "request_resources_cold")
+
+
+def _safe_system(rng, num_processes, num_resources, draw_max_row):
+    """
+    Random Max/Allocation with the smallest Available that keeps a random
+    order safe, so every process only just fits when its turn comes
+    """
+    max_need = [draw_max_row() for _ in range(num_processes)]
+    allocation = [[int(rng.random() * (v + 1)) for v in row] for row in max_need]
+    order = list(range(num_processes))
+    rng.shuffle(order)
+    available = [0] * num_resources
+    work = [0] * num_resources       # allocations released so far, on top of Available
+    for i in order:
+        for j, (m, a) in enumerate(zip(max_need[i], allocation[i])):
+            short = m - a - work[j]
+            if short > available[j]:
+                available[j] = short
+        work = list(map(operator.add, work, allocation[i]))
+    return available, max_need, allocation, order
+
+
+def generate_safe(rng, num_processes, num_resources, max_value=10):
+    """Safe system with uniform claims in 0..max_value"""
+    def draw():
+        return [int(rng.random() * (max_value + 1)) for _ in range(num_resources)]
+    return _safe_system(rng, num_processes, num_resources, draw)[:3]
+
+
+def generate_unsafe(rng, num_processes, num_resources, max_value=10):
+    """
+    Unsafe only at the very end: every process but the last of a safe order can
+    finish, and the last one claims one unit more of R0 than could ever be free
+    """
+    def draw():
+        return [int(rng.random() * (max_value + 1)) for _ in range(num_resources)]
+    available, max_need, allocation, order = _safe_system(rng, num_processes, num_resources, draw)
+    last = order[-1]
+    held_by_others = sum(row[0] for row in allocation) - allocation[last][0]
+    max_need[last][0] = allocation[last][0] + available[0] + held_by_others + 1
+    return available, max_need, allocation
+
+
+def generate_dense(rng, num_processes, num_resources, max_value=1000):
+    """Safe system where every process claims every resource, with large values"""
+    def draw():
+        return [1 + int(rng.random() * max_value) for _ in range(num_resources)]
+    return _safe_system(rng, num_processes, num_resources, draw)[:3]
+
+
+def generate_sparse(rng, num_processes, num_resources, max_value=10, density=0.02):
+    """Safe system where each process claims only about `density` of the resource types"""
+    per_row = max(1, int(num_resources * density))
+
+    def draw():
+        row = [0] * num_resources
+        for j in rng.sample(range(num_resources), per_row):
+            row[j] = 1 + int(rng.random() * max_value)
+        return row
+    return _safe_system(rng, num_processes, num_resources, draw)[:3]
+
+
+def generate_adversarial(rng, num_processes, num_resources):
+    """
+    Worst case for the restart-at-P0 scan: only the highest unfinished pid can
+    ever run, so every step scans all remaining processes, O(n^2) checks in all.
+    Pi holds one unit of everything and needs n-1-i more; Available starts at 0.
+    """
+    allocation = [[1] * num_resources for _ in range(num_processes)]
+    max_need = [[num_processes - i] * num_resources for i in range(num_processes)]
+    return [0] * num_resources, max_need, allocation
+
+
+GENERATORS = {
+    "safe": generate_safe,
+    "unsafe": generate_unsafe,
+    "dense": generate_dense,
+    "sparse": generate_sparse,
+    "adversarial": generate_adversarial,
+}
+
+# Generators written against one engine's worst case also run on that engine,
+# whatever engine was chosen, limited to the whole-state checks they stress
+WORST_CASE_ENGINES = {"adversarial": ("scan",)}
+WORST_CASE_OPERATIONS = ("safety_algorithm", "detect_deadlock")
+
+
+def build_simulator(generator, num_processes, num_resources, seed=0, engine="worklist"):
+    """Returns: a headless simulator holding a generated system, Need already derived"""
+    rng = random.Random(f"{seed}:{generator}:{num_processes}x{num_resources}")
+    simulator = DeadlockDetectionSimulator(engine=engine)
+    simulator.num_processes, simulator.num_resources = num_processes, num_resources
+    simulator.available, simulator.max_need, simulator.allocation = GENERATORS[generator](
+        rng, num_processes, num_resources)
+    simulator.calculate_need()
+    return simulator
+
+
+def _request_workload(simulator, rng, count):
+    """Pick `count` requests of up to half of what a process may still claim and can get"""
+    candidates = [i for i, row in enumerate(simulator.need) if any(row)]
+    requests = []
+    for _ in range(min(count, len(candidates))):
+        pid = rng.choice(candidates)
+        requests.append((pid, [int(rng.random() * (min(n, a) // 2 + 1))
+                               for n, a in zip(simulator.need[pid], simulator.available)]))
+    return requests
+
+
+def _operation(simulator, name, requests):
+    """
+    Returns: (setup, function, teardown) for one repetition of an operation;
+             only `function` is timed
+    """
+    if name in ("calculate_need", "safety_algorithm", "detect_deadlock"):
+        return None, getattr(simulator, name), None
+
+    granted = []
+
+    def setup():
+        simulator.warm_start = name == "request_resources"
+        simulator.detect_deadlock()     # caches the order a warm start replays
+
+    def run_requests():
+        for pid, request in requests:
+            if simulator.request_resources(pid, request):
+                granted.append((pid, request))
+
+    def teardown():
+        # Releasing a grant restores Available, Allocation and Need exactly
+        while granted:
+            simulator.release_resources(*granted.pop())
+        simulator.warm_start = True
+    return setup, run_requests, teardown
+
+
+def measure(setup, function, teardown, repeat):
+    """
+    Time `repeat` calls, then one more under tracemalloc for the peak memory
+    (tracing slows the call down, so it is never part of the timings)
+    Returns: (timings in seconds, peak bytes)
+    """
+    timings = []
+    peak = 0
+    for trace in [False] * repeat + [True]:
+        if setup is not None:
+            setup()
+        if trace:
+            tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            if trace:
+                _, peak = tracemalloc.get_traced_memory()
+            else:
+                timings.append(elapsed)
+        finally:
+            if trace:
+                tracemalloc.stop()
+            if teardown is not None:
+                teardown()
+    return timings, peak
+
+
+def run_benchmarks(grid="quick", generators=None, operations=OPERATIONS, engine="worklist",
+                   repeat=3, requests=20, seed=0, progress=None):
+    """
+    Run every operation on every generated system of a grid.
+    Request timings are per request_resources call; the "_cold" variant turns
+    the warm start off so every check runs the full engine.
+    Generators in WORST_CASE_ENGINES are also timed on those engines.
+    Returns: dict with "meta" and "results" (one dict per system, engine and operation)
+    """
+    sizes = GRIDS[grid] if isinstance(grid, str) else list(grid)
+    results = []
+    for generator in generators or GENERATORS:
+        extra = [e for e in WORST_CASE_ENGINES.get(generator, ()) if e != engine]
+        for num_processes, num_resources in sizes:
+            runs = [(engine, operations)]
+            runs += [(e, [name for name in operations if name in WORST_CASE_OPERATIONS]) for e in extra]
+            for run_engine, names in runs:
+                for result in _run_system(generator, num_processes, num_resources, seed, run_engine,
+                                          names, repeat, requests):
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return {
+        "meta": {
+            "grid": grid if isinstance(grid, str) else sizes,
+            "engine": engine,
+            "repeat": repeat,
+            "requests": requests,
+            "seed": seed,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _run_system(generator, num_processes, num_resources, seed, engine, operations, repeat, requests):
+    """Yields: one result dict per operation on one generated system"""
+    start = time.perf_counter()
+    simulator = build_simulator(generator, num_processes, num_resources, seed, engine)
+    build_seconds = time.perf_counter() - start
+    is_safe, _ = simulator.safety_algorithm()
+    workload = _request_workload(simulator, random.Random(seed), requests)
+
+    for name in operations:
+        timings, peak = measure(*_operation(simulator, name, workload), repeat)
+        if name.startswith("request_resources"):
+            timings = [t / max(1, len(workload)) for t in timings]
+        yield {
+            "generator": generator,
+            "num_processes": num_processes,
+            "num_resources": num_resources,
+            "engine": simulator.engine,
+            "operation": name,
+            "safe": is_safe,
+            "min_seconds": min(timings),
+            "median_seconds": statistics.median(timings),
+            "peak_bytes": peak,
+            "build_seconds": build_seconds,
+        }
+
+
+def _key(result):
+    return (result["generator"], result["num_processes"], result["num_resources"],
+            result["engine"], result["operation"])
+
+
+def compare_results(baseline, current, threshold=0.10, floor=0.0005):
+    """
+    Compare two runs on the cases they share, using the fastest repetition
+    threshold: relative slowdown counted as a regression
+    floor: differences below this many seconds are treated as noise
+    Returns: list of (result, baseline_seconds, ratio) regressions, worst first
+    """
+    before = {_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        old_seconds, new_seconds = old["min_seconds"], result["min_seconds"]
+        if new_seconds - old_seconds > floor and new_seconds > old_seconds * (1 + threshold):
+            regressions.append((result, old_seconds, new_seconds / old_seconds if old_seconds else float("inf")))
+    regressions.sort(key=lambda item: -item[2])
+    return regressions
+
+
+def print_result(result):
+    """Print one benchmark result as a table row"""
+    print(f"{result['generator']:<11} | {result['num_processes']:>6} x {result['num_resources']:<4} | "
+          f"{result['engine']:<9} | {result['operation']:<22} | {result['min_seconds'] * 1000:>10.3f} | "
+          f"{result['median_seconds'] * 1000:>10.3f} | {result['peak_bytes'] / 1e6:>9.2f}")
+
+
+def print_header():
+    print(f"{'Generator':<11} | {'Size':^13} | {'Engine':<9} | {'Operation':<22} | {'Min (ms)':>10} | "
+          f"{'Median (ms)':>10} | {'Peak (MB)':>9}")
+    print("-" * 104)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the deadlock simulator on generated systems")
+    parser.add_argument("--grid", choices=GRIDS, default="quick")
+    parser.add_argument("--generators", nargs="+", choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--engine", default="worklist")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20, help="requests per request_resources run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON of an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    print_header()
+    run = run_benchmarks(args.grid, args.generators, args.operations, args.engine,
+                         args.repeat, args.requests, args.seed, progress=print_result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=1)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, run, args.threshold)
+        if not regressions:
+            print(f"\n✅ No regressions against {args.compare} (threshold {args.threshold:.0%})")
+            return 0
+        print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+        for result, old_seconds, ratio in regressions:
+            print(f"   {result['generator']} {result['num_processes']}x{result['num_resources']} "
+                  f"{result['engine']} {result['operation']}: {old_seconds * 1000:.3f} ms -> "
+                  f"{result['min_seconds'] * 1000:.3f} ms ({ratio:.2f}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
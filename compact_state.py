@@ -0,0 +1,169 @@
+"""
+Compact Array-Backed State
+Author: OS Learning Project
+Description: Keeps the Banker's matrices in flat row-major array('i') buffers
+             with zero-copy row views, instead of lists of boxed ints
+"""
+
+import operator
+import sys
+from array import array
+
+from deadlock_simulator import DeadlockDetectionSimulator
+
+
+class MatrixView:
+    """
+    A flat row-major buffer seen as a list of rows.
+    Rows are memoryview slices: reading and writing them touches the buffer
+    directly, without copying.
+    """
+    __slots__ = ("_view", "rows", "cols", "state")
+
+    def __init__(self, buffer, rows, cols):
+        self._view = memoryview(buffer)
+        if self._view.format != "i":
+            self._view = self._view.cast("B").cast("i")
+        if len(self._view) != rows * cols:
+            raise ValueError(f"Buffer holds {len(self._view)} values, expected {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.state = None       # the CompactState that owns it, for the Need matrix
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("row index out of range")
+        start = i * self.cols
+        return self._view[start:start + self.cols]
+
+    def __iter__(self):
+        view, cols = self._view, self.cols
+        for start in range(0, self.rows * cols, cols):
+            yield view[start:start + cols]
+
+    def tolist(self):
+        return [row.tolist() for row in self]
+
+
+class DerivedMaxView:
+    """Max matrix derived on demand as Allocation + Need; rows are fresh lists"""
+    __slots__ = ("allocation", "need")
+
+    def __init__(self, allocation, need):
+        self.allocation = allocation
+        self.need = need
+
+    def __len__(self):
+        return len(self.need)
+
+    def __getitem__(self, i):
+        return list(map(operator.add, self.allocation[i], self.need[i]))
+
+    def __iter__(self):
+        for alloc_row, need_row in zip(self.allocation, self.need):
+            yield list(map(operator.add, alloc_row, need_row))
+
+    def tolist(self):
+        return list(self)
+
+
+class CompactState:
+    """
+    Allocation and Need stored as two flat int32 buffers, Available as one more.
+    Max is not stored: it is Allocation + Need, derived when asked for.
+    """
+    __slots__ = ("num_processes", "num_resources", "available", "allocation", "need", "max_need")
+
+    def __init__(self, available, allocation, need, num_processes, num_resources):
+        """Wrap existing int32 buffers (array('i'), mmap, bytes...) without copying them"""
+        self.num_processes = num_processes
+        self.num_resources = num_resources
+        self.available = MatrixView(available, 1, num_resources)[0]
+        self.allocation = MatrixView(allocation, num_processes, num_resources)
+        self.need = MatrixView(need, num_processes, num_resources)
+        self.need.state = self
+        self.max_need = DerivedMaxView(self.allocation, self.need)
+
+    @classmethod
+    def from_lists(cls, available, max_need, allocation):
+        """Pack list-of-lists matrices into compact buffers"""
+        allocation_data = array("i")
+        need_data = array("i")
+        for max_row, alloc_row in zip(max_need, allocation):
+            allocation_data.extend(alloc_row)
+            need_data.extend(map(operator.sub, max_row, alloc_row))
+        return cls(array("i", available), allocation_data, need_data, len(max_need), len(available))
+
+    @classmethod
+    def from_simulator(cls, simulator):
+        """Pack a DeadlockDetectionSimulator's state into compact buffers"""
+        return cls.from_lists(simulator.available, simulator.max_need, simulator.allocation)
+
+    def calculate_need(self):
+        """
+        Need is stored directly and Max derived from it, so nothing to recompute
+        Returns: bytes written (none)
+        """
+        return 0
+
+    def to_simulator(self, tracer=None, engine="scan"):
+        """
+        Build a simulator whose matrices are views of this state (no copy).
+        Grants and rollbacks write straight into the compact buffers, and the
+        simulator's calculate_need() leaves the stored Need in place.
+        """
+        simulator = DeadlockDetectionSimulator(tracer=tracer, engine=engine)
+        simulator.num_processes = self.num_processes
+        simulator.num_resources = self.num_resources
+        simulator.available = self.available
+        simulator.allocation = self.allocation
+        simulator.need = self.need
+        simulator.max_need = self.max_need
+        return simulator
+
+
+def list_matrix_bytes(matrix):
+    """Approximate bytes held by a list of lists of ints (cached small ints are free)"""
+    total = sys.getsizeof(matrix)
+    for row in matrix:
+        total += sys.getsizeof(row)
+        total += sum(sys.getsizeof(v) for v in row if not -5 <= v <= 256)
+    return total
+
+
+def compare_footprint(simulator):
+    """
+    Compare the memory of a simulator's list-of-lists layout with the compact one
+    Returns: dict with "lists" and "compact" byte counts
+    """
+    lists = (sys.getsizeof(simulator.available)
+             + list_matrix_bytes(simulator.max_need)
+             + list_matrix_bytes(simulator.allocation)
+             + list_matrix_bytes(simulator.need))
+    state = CompactState.from_simulator(simulator)
+    compact = state.available.nbytes + state.allocation._view.nbytes + state.need._view.nbytes
+    return {"lists": lists, "compact": compact}
+
+
+if __name__ == "__main__":
+    import random
+
+    from deadlock_simulator import random_system
+
+    print(f"{'Processes':>9} | {'Resources':>9} | {'Lists (MB)':>10} | {'Compact (MB)':>12} | {'Ratio':>5}")
+    print("-" * 58)
+    rng = random.Random(0)
+    for num_processes, num_resources in [(100, 10), (1000, 50), (2000, 500)]:
+        simulator = DeadlockDetectionSimulator()
+        simulator.num_processes, simulator.num_resources = num_processes, num_resources
+        simulator.available, simulator.max_need, simulator.allocation = random_system(
+            rng, num_processes, num_resources, max_value=1000)
+        simulator.calculate_need()
+        sizes = compare_footprint(simulator)
+        print(f"{num_processes:>9} | {num_resources:>9} | {sizes['lists'] / 1e6:>10.2f} | "
+              f"{sizes['compact'] / 1e6:>12.2f} | {sizes['lists'] / sizes['compact']:>5.1f}")
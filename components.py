@@ -0,0 +1,223 @@
+"""
+Independent Components
+Author: OS Learning Project
+Description: Splits processes and resources into groups that share no resource
+             type, so each group's safety is checked (and re-checked) on its own
+"""
+
+import heapq
+import operator
+from concurrent.futures import ProcessPoolExecutor
+
+from deadlock_simulator import get_engine
+
+# Components with at least this many Need cells go to the worker pool
+PARALLEL_MIN_CELLS = 250_000
+
+
+def _check_component(engine, available, allocation, need):
+    """Run one component's safety check (module level so worker processes can unpickle it)"""
+    return get_engine(engine)(available, allocation, need)
+
+
+class ComponentIndex:
+    """
+    Union-find over resource types: a process joins every resource its
+    maximum claim touches, so each set of resources plus the processes
+    anchored in it is an independent Banker's problem. The system is safe
+    exactly when every component is, and merging the components' safe
+    sequences by pid gives the same lowest-pid-first sequence as checking
+    the whole system at once. Processes with no claim at all finish anywhere.
+
+    Verdicts are kept per component and dropped only when that component
+    changes: a grant or an arrival re-checks one component, and a release
+    keeps a safe verdict, since releasing never makes a safe state unsafe.
+    Union-find cannot split a set, so exits leave components coarser than
+    they need to be (still correct, only bigger) until enough have piled up
+    to rebuild from scratch.
+
+    workers: worker processes for components of at least parallel_min_cells
+             cells when more than one of them needs checking (1 = in process)
+    """
+
+    def __init__(self, simulator, workers=1, parallel_min_cells=PARALLEL_MIN_CELLS):
+        self.simulator = simulator
+        self.workers = workers
+        self.parallel_min_cells = parallel_min_cells
+        self.checked = 0        # component checks run (the rest were answered from verdicts)
+        self._pool = None
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the components from the Max matrix: O(n·m)"""
+        simulator = self.simulator
+        self._parent = list(range(simulator.num_resources))
+        self._anchor = []       # per process: one resource it claims, -1 if none
+        self._groups = None
+        self._verdicts = {}     # root -> (is_safe, safe_sequence in pids)
+        for row in simulator.max_need:
+            self._anchor.append(self._join(row))
+        self._exits = 0
+
+    def _find(self, j):
+        parent = self._parent
+        root = j
+        while parent[root] != root:
+            root = parent[root]
+        while parent[j] != root:      # path compression
+            parent[j], j = root, parent[j]
+        return root
+
+    def _join(self, row):
+        """Union every resource the row claims; returns its first resource or -1"""
+        anchor = -1
+        for j, value in enumerate(row):
+            if value:
+                if anchor < 0:
+                    anchor = j
+                    continue
+                a, b = self._find(anchor), self._find(j)
+                if a != b:
+                    self._parent[b] = a
+                    self._verdicts.pop(a, None)
+                    self._verdicts.pop(b, None)
+                    self._groups = None
+        return anchor
+
+    def _root(self, process_id):
+        anchor = self._anchor[process_id]
+        return self._find(anchor) if anchor >= 0 else None
+
+    def groups(self):
+        """
+        Returns: (components, idle) with components a dict of root ->
+                 (pids, resources) and idle the pids that claim nothing
+        """
+        if self._groups is None:
+            components = {}
+            idle = []
+            for j in range(self.simulator.num_resources):
+                components.setdefault(self._find(j), ([], []))[1].append(j)
+            for i in range(len(self._anchor)):
+                root = self._root(i)
+                if root is None:
+                    idle.append(i)
+                else:
+                    components[root][0].append(i)
+            # Resources nobody claims form components without processes
+            self._groups = ({root: group for root, group in components.items() if group[0]}, idle)
+        return self._groups
+
+    # Simulator hooks
+    def process_changed(self, process_id, released=False):
+        """A grant to (or a release by) the process changed its component"""
+        root = self._root(process_id)
+        if root is None:
+            return
+        if released:
+            verdict = self._verdicts.get(root)
+            if verdict is not None and verdict[0]:
+                return
+        self._verdicts.pop(root, None)
+
+    def process_added(self, process_id, max_need):
+        """A process arrived, possibly in the row of an earlier one"""
+        if process_id == len(self._anchor):
+            self._anchor.append(-1)
+        elif self._anchor[process_id] >= 0:
+            self._drop(process_id)
+        self._anchor[process_id] = self._join(max_need)
+        self._groups = None
+        self.process_changed(process_id)
+
+    def process_exited(self, process_id):
+        """A process left: its row no longer claims anything"""
+        self._drop(process_id)
+        self._groups = None
+
+    def _drop(self, process_id):
+        self.process_changed(process_id)
+        self._anchor[process_id] = -1
+        self._exits += 1
+        if self._exits > len(self._anchor) // 4:
+            self.rebuild()
+
+    # Checking
+    def _subproblem(self, pids, resources):
+        simulator = self.simulator
+        if len(resources) == simulator.num_resources:
+            return (list(simulator.available), [simulator.allocation[i] for i in pids],
+                    [simulator.need[i] for i in pids])
+        if len(resources) > 1:
+            pick = operator.itemgetter(*resources)
+        else:
+            def pick(row, j=resources[0]):
+                return (row[j],)
+        return (list(pick(simulator.available)), [pick(simulator.allocation[i]) for i in pids],
+                [pick(simulator.need[i]) for i in pids])
+
+    def check(self, engine, tracer=None):
+        """
+        Check every component without a current verdict, then merge
+        Returns: (is_safe, safe_sequence) for the whole system
+        """
+        if tracer is not None:
+            tracer.safety_started()
+        components, idle = self.groups()
+        pending = [root for root in components if root not in self._verdicts]
+        large = []
+        if self.workers > 1:
+            large = [root for root in pending
+                     if len(components[root][0]) * len(components[root][1]) >= self.parallel_min_cells]
+            if len(large) < 2:
+                large = []
+
+        futures = {}
+        if large:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            for root in large:
+                futures[root] = self._pool.submit(_check_component, engine,
+                                                  *self._subproblem(*components[root]))
+        for root in pending:
+            if root not in futures:
+                self._store(root, components[root][0], get_engine(engine)(*self._subproblem(*components[root])))
+        for root, future in futures.items():
+            self._store(root, components[root][0], future.result())
+
+        sequences = [idle]
+        is_safe = True
+        for root in components:
+            safe, sequence = self._verdicts[root]
+            if not safe:
+                is_safe = False
+                break
+            sequences.append(sequence)
+        order = list(heapq.merge(*sequences)) if is_safe else []
+        if tracer is not None:
+            tracer.safety_finished(is_safe, order)
+        return is_safe, order
+
+    def _store(self, root, pids, verdict):
+        is_safe, local = verdict
+        self._verdicts[root] = (is_safe, [pids[k] for k in local])
+        self.checked += 1
+
+    def stats(self):
+        """Returns: dict with components, idle, largest (processes, resources) and cached verdicts"""
+        components, idle = self.groups()
+        largest = max(components.values(), key=lambda g: len(g[0]) * len(g[1]), default=([], []))
+        return {
+            "components": len(components),
+            "idle": len(idle),
+            "largest_processes": len(largest[0]),
+            "largest_resources": len(largest[1]),
+            "cached_verdicts": len(self._verdicts),
+            "checked": self.checked,
+        }
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,207 @@
+"""
+Thread-Safe Banker's Allocator
+Author: OS Learning Project
+Description: Banker's Algorithm for real concurrent callers, with blocking
+             acquire/release and a multi-threaded contention benchmark
+"""
+
+import operator
+import random
+import threading
+import time
+
+from deadlock_simulator import RowOverlay, get_engine, replay_safe_sequence
+
+
+class ConcurrentBankersAllocator:
+    """
+    Banker's allocator safe to call from many threads.
+    State is published as immutable snapshots: Available and every row are
+    tuples, and the lists of rows are replaced on change, never mutated.
+    acquire() takes a snapshot under the lock in O(1), runs the safety check on
+    "snapshot + request" with no lock held, and commits under the lock if no
+    other grant happened meanwhile. Releases never make a safe state unsafe, so
+    a check stays valid across concurrent releases; only a concurrent grant
+    forces a retry.
+    """
+
+    def __init__(self, available, max_need, allocation=None, engine="worklist"):
+        if allocation is None:
+            allocation = [[0] * len(available) for _ in max_need]
+        self.num_processes = len(max_need)
+        self.num_resources = len(available)
+        self._engine = get_engine(engine)
+        self._available = tuple(available)
+        self._allocation = [tuple(row) for row in allocation]
+        self._need = [tuple(map(operator.sub, m, a)) for m, a in zip(max_need, allocation)]
+        self._grants = 0            # bumped by every commit
+        self._releases = 0          # bumped by every release
+        self._safe_order = None     # last proved safe sequence, for warm starts
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    @classmethod
+    def from_simulator(cls, simulator, engine="worklist"):
+        """Copy the state of a DeadlockDetectionSimulator into a thread-safe allocator"""
+        return cls(simulator.available, simulator.max_need, simulator.allocation, engine)
+
+    def snapshot(self):
+        """Returns: a consistent (available, allocation, need) view, never torn"""
+        with self._lock:
+            return self._available, self._allocation, self._need
+
+    def acquire(self, process_id, request, timeout=None):
+        """
+        Block until `request` can be granted safely or the timeout expires
+        Returns: True if granted, False on timeout
+        Raises: ValueError if the request is negative or exceeds the process's remaining need
+        """
+        request = tuple(request)
+        if min(request, default=0) < 0:
+            raise ValueError(f"Request of P{process_id} cannot be negative!")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        le = operator.le
+
+        while True:
+            with self._lock:
+                if not all(map(le, request, self._need[process_id])):
+                    raise ValueError(f"Request exceeds maximum need of P{process_id}!")
+                while not all(map(le, request, self._available)):
+                    if not self._wait(deadline):
+                        return False
+                version, releases = self._grants, self._releases
+                available, allocation, need = self._available, self._allocation, self._need
+                order = self._safe_order
+
+            # Safety check on "snapshot + request" without holding the lock
+            trial_available = list(map(operator.sub, available, request))
+            trial_allocation = RowOverlay(allocation, process_id,
+                                          tuple(map(operator.add, allocation[process_id], request)))
+            trial_need = RowOverlay(need, process_id, tuple(map(operator.sub, need[process_id], request)))
+            if order is not None and replay_safe_sequence(trial_available, trial_allocation, trial_need, order):
+                is_safe = True
+            else:
+                is_safe, order = self._engine(trial_available, trial_allocation, trial_need)
+
+            with self._lock:
+                if self._grants != version:
+                    continue        # another grant landed first; check again
+                if is_safe:
+                    self._commit(process_id, request, order)
+                    return True
+                # Unsafe until something is released
+                while self._releases == releases:
+                    if not self._wait(deadline):
+                        return False
+
+    def try_acquire(self, process_id, request):
+        """Grant `request` only if that is possible right away; never blocks on the state"""
+        return self.acquire(process_id, request, timeout=0)
+
+    def release(self, process_id, release):
+        """
+        Return resources held by a process and wake blocked acquirers
+        Raises: ValueError if the process does not hold that much
+        """
+        release = tuple(release)
+        with self._lock:
+            held = self._allocation[process_id]
+            if not all(map(operator.le, release, held)) or min(release, default=0) < 0:
+                raise ValueError(f"Cannot release more than allocated by P{process_id}!")
+            self._available = tuple(map(operator.add, self._available, release))
+            allocation = list(self._allocation)
+            allocation[process_id] = tuple(map(operator.sub, held, release))
+            need = list(self._need)
+            need[process_id] = tuple(map(operator.add, need[process_id], release))
+            self._allocation, self._need = allocation, need
+            self._releases += 1
+            self._changed.notify_all()
+
+    def _commit(self, process_id, request, order):
+        # Apply the request to the current state: only releases happened since the
+        # snapshot, and a release commutes with the grant and keeps the state safe
+        self._available = tuple(map(operator.sub, self._available, request))
+        allocation = list(self._allocation)
+        allocation[process_id] = tuple(map(operator.add, allocation[process_id], request))
+        need = list(self._need)
+        need[process_id] = tuple(map(operator.sub, need[process_id], request))
+        self._allocation, self._need = allocation, need
+        self._safe_order = order
+        self._grants += 1
+        self._changed.notify_all()
+
+    def _wait(self, deadline):
+        """Wait for a state change with the lock held; False once the deadline has passed"""
+        if deadline is None:
+            self._changed.wait()
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        self._changed.wait(remaining)
+        return True
+
+
+def run_contention_benchmark(threads=4, operations=2000, processes_per_thread=16,
+                             num_resources=8, seed=0, engine="worklist"):
+    """
+    Worker threads repeatedly acquire a small random request for one of their
+    own processes and release it again.
+    Returns: dict with throughput (acquires per second), p50/p99 acquire latency
+             in milliseconds and the number of timed-out acquires
+    """
+    rng = random.Random(seed)
+    num_processes = threads * processes_per_thread
+    max_need = [[rng.randint(1, 6) for _ in range(num_resources)] for _ in range(num_processes)]
+    available = [sum(row[j] for row in max_need) // 3 + 1 for j in range(num_resources)]
+    allocator = ConcurrentBankersAllocator(available, max_need, engine=engine)
+
+    latencies = []
+    timeouts = [0]
+    results_lock = threading.Lock()
+
+    def worker(index):
+        local_rng = random.Random(seed * 1000 + index)
+        own = range(index, num_processes, threads)
+        local = []
+        missed = 0
+        for _ in range(operations):
+            pid = local_rng.choice(own)
+            request = [local_rng.randint(0, v) for v in max_need[pid]]
+            start = time.perf_counter()
+            granted = allocator.acquire(pid, request, timeout=1.0)
+            local.append(time.perf_counter() - start)
+            if granted:
+                allocator.release(pid, request)
+            else:
+                missed += 1
+        with results_lock:
+            latencies.extend(local)
+            timeouts[0] += missed
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "threads": threads,
+        "acquires": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "timeouts": timeouts[0],
+    }
+
+
+if __name__ == "__main__":
+    print(f"{'Threads':>7} | {'Acquires/s':>10} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'Timeouts':>8}")
+    print("-" * 54)
+    for thread_count in (1, 2, 4, 8):
+        result = run_contention_benchmark(threads=thread_count)
+        print(f"{result['threads']:>7} | {result['throughput']:>10,.0f} | {result['p50_ms']:>8.3f} | "
+              f"{result['p99_ms']:>8.3f} | {result['timeouts']:>8}")
@@ -4,67 +4,531 @@ Author: OS Learning Project
 Description: Simulates deadlock detection for multiple processes and resources
 """
 
+import heapq
+import importlib
+import io
+import operator
+import random
+import sys
 import time
 
+# Tracer verbosity levels
+TRACE_QUIET = 0      # Only conclusions (detection verdicts, granted/denied requests)
+TRACE_SUMMARY = 1    # Adds state tables, safety verdicts and request progress
+TRACE_STEPS = 2      # Adds every Need <= Work comparison of the safety scan
+
+
+class SafetyTracer:
+    """
+    Observer for the safety engine and the simulator.
+    Every hook is a no-op; subclass it and override the events you need.
+    `work` and `finish` are the engine's live lists - copy them if you keep them.
+    """
+
+    # True for tracers that only count: engines that work in bulk then report
+    # each round through rows_checked instead of iteration and per-process hooks
+    counts_only = False
+
+    def detection_started(self, simulator):
+        pass
+
+    def detection_failed(self, error):
+        pass
+
+    def state_changed(self, simulator, title):
+        pass
+
+    def safety_started(self):
+        pass
+
+    def iteration(self, number, work, finish):
+        pass
+
+    def process_ready(self, pid, need, work):
+        pass
+
+    def process_waiting(self, pid, need, work):
+        pass
+
+    def process_finished(self, pid, work):
+        pass
+
+    def rows_checked(self, number, ready, waiting):
+        pass
+
+    def safety_finished(self, is_safe, sequence):
+        pass
+
+    def safety_replayed(self, sequence):
+        pass
+
+    def detection_finished(self, is_safe, sequence):
+        pass
+
+    def deadlock_found(self, deadlocked, cycles):
+        pass
+
+    def recovery_planned(self, plan):
+        pass
+
+    def request_started(self, pid, request):
+        pass
+
+    def request_rejected(self, pid, message, reason=None):
+        pass
+
+    def request_tentative(self, pid, request):
+        pass
+
+    def request_finished(self, pid, granted):
+        pass
+
+    def resources_released(self, pid, release):
+        pass
+
+    def state_copied(self, nbytes):
+        pass
+
+
+class ConsoleTracer(SafetyTracer):
+    """Narrates the simulation on the console, pausing between safety iterations"""
+
+    def __init__(self, verbosity=TRACE_STEPS, delay=1.0):
+        self.verbosity = verbosity
+        self.delay = delay
+
+    def detection_started(self, simulator):
+        if self.verbosity >= TRACE_SUMMARY:
+            print("\n" + "="*60)
+            print("DEADLOCK DETECTION SIMULATION".center(60))
+            print("="*60)
+
+    def state_changed(self, simulator, title):
+        if self.verbosity >= TRACE_SUMMARY:
+            simulator.print_state(title)
+
+    def safety_started(self):
+        if self.verbosity >= TRACE_SUMMARY:
+            print("\n🔍 Running Safety Algorithm...")
+            print("-" * 40)
+
+    def iteration(self, number, work, finish):
+        if self.verbosity < TRACE_STEPS:
+            return
+        if number > 1 and self.delay:
+            time.sleep(self.delay)  # Pause for visualization
+        print(f"\nIteration {number}:")
+        print(f"  Work: {work}")
+        finished_procs = [f'P{i}' for i, f in enumerate(finish) if f]
+        print(f"  Finished processes: {finished_procs if finished_procs else 'None'}")
+
+    def process_ready(self, pid, need, work):
+        if self.verbosity >= TRACE_STEPS:
+            print(f"  ✓ Process P{pid} can be allocated (Need: {list(need)} <= Work: {work})")
+            print(f"    Allocating resources to P{pid}...")
+
+    def process_waiting(self, pid, need, work):
+        if self.verbosity >= TRACE_STEPS:
+            print(f"  ✗ Process P{pid} must wait (Need: {list(need)} > Work: {work})")
+
+    def process_finished(self, pid, work):
+        if self.verbosity >= TRACE_STEPS:
+            print(f"    P{pid} finished. Work becomes: {work}")
+
+    def safety_finished(self, is_safe, sequence):
+        if self.verbosity < TRACE_SUMMARY:
+            return
+        if is_safe:
+            print(f"\n✅ System is in SAFE state!")
+            print(f"📈 Safe sequence: {' → '.join(f'P{i}' for i in sequence)}")
+        else:
+            print("\n❌ No process found that can be allocated. System is UNSAFE!")
+
+    def safety_replayed(self, sequence):
+        if self.verbosity >= TRACE_SUMMARY:
+            print(f"\n♻️  Cached safe sequence still valid: {' → '.join(f'P{i}' for i in sequence)}")
+            print("✅ System is in SAFE state!")
+
+    def detection_finished(self, is_safe, sequence):
+        if is_safe:
+            print("\n🎉 CONCLUSION: No deadlock detected!")
+            print(f"   The system is in a safe state.")
+            print(f"   Processes can complete in order: {' → '.join(f'P{i}' for i in sequence)}")
+        else:
+            print("\n⚠️  CONCLUSION: Deadlock detected!")
+            print("   The system is in an unsafe state.")
+            print("   One or more processes are deadlocked.")
+
+    def deadlock_found(self, deadlocked, cycles):
+        if not deadlocked:
+            print("\n🎉 Exact detection: no process is deadlocked.")
+            return
+        print(f"\n⛔ Deadlocked processes: {', '.join(f'P{i}' for i in deadlocked)}")
+        for cycle in cycles:
+            print(f"   Circular wait: {' → '.join(f'P{i}' for i in cycle + cycle[:1])}")
+
+    def recovery_planned(self, plan):
+        if not plan["victims"]:
+            print("\n🎉 Recovery: nothing to do, the system is already safe.")
+            return
+        exactness = "optimal" if plan["optimal"] else "best found"
+        print(f"\n🛠️  Recovery plan ({plan['action']} {', '.join(plan['victims'])}; "
+              f"cost {plan['cost']}, {exactness})")
+        print(f"   Safe sequence afterwards: {' → '.join(plan['safe_sequence'])}")
+
+    def request_started(self, pid, request):
+        if self.verbosity >= TRACE_SUMMARY:
+            print(f"\n📨 Process P{pid} requesting resources: {list(request)}")
+
+    def request_rejected(self, pid, message, reason=None):
+        print(f"❌ {message}")
+
+    def request_tentative(self, pid, request):
+        if self.verbosity >= TRACE_SUMMARY:
+            print("✓ Request validation passed. Temporarily allocating resources...")
+
+    def request_finished(self, pid, granted):
+        if granted:
+            print(f"\n✅ Request by P{pid} can be GRANTED safely")
+            print("✅ Resources have been allocated!")
+        else:
+            print(f"\n❌ Request by P{pid} would lead to UNSAFE state - Request DENIED")
+
+    def resources_released(self, pid, release):
+        if self.verbosity >= TRACE_SUMMARY:
+            print(f"\n📤 Process P{pid} released resources: {list(release)}")
+
+
+def scan_safety(available, allocation, need, tracer=None):
+    """
+    Banker's Safety Algorithm, headless: no printing and no pausing.
+    After every finished process the scan restarts at P0.
+    Returns: (is_safe, safe_sequence) with the sequence as process indices
+    """
+    num_processes = len(need)
+    le = operator.le
+    work = list(available)
+    finish = [False] * num_processes
+    safe_sequence = []
+
+    if tracer is not None:
+        tracer.safety_started()
+
+    iteration = 1
+    while len(safe_sequence) < num_processes:
+        if tracer is not None:
+            tracer.iteration(iteration, work, finish)
+
+        found = False
+        for i in range(num_processes):
+            if finish[i]:
+                continue
+            # Check if Need[i] <= Work
+            if all(map(le, need[i], work)):
+                if tracer is not None:
+                    tracer.process_ready(i, need[i], work)
+
+                # Simulate process completion
+                work = list(map(operator.add, work, allocation[i]))
+                finish[i] = True
+                safe_sequence.append(i)
+                found = True
+
+                if tracer is not None:
+                    tracer.process_finished(i, work)
+                break
+            elif tracer is not None:
+                tracer.process_waiting(i, need[i], work)
+
+        if not found:
+            if tracer is not None:
+                tracer.safety_finished(False, [])
+            return False, []
+
+        iteration += 1
+
+    if tracer is not None:
+        tracer.safety_finished(True, safe_sequence)
+    return True, safe_sequence
+
+
+class SafetyWorklist:
+    """
+    Incremental Need <= Work tracker used by the worklist safety engine.
+    Every unfinished process counts the resource types it is still blocked on,
+    and every resource keeps its blocked needs sorted, so growing Work[j] only
+    touches the processes whose need crosses the new value.
+    """
+
+    def __init__(self, work, allocation, need, done=None):
+        self.work = list(work)
+        self.allocation = allocation
+        self.need = need
+        self.finish = [False] * len(need) if done is None else list(done)
+        self.blocked = [0] * len(need)
+        self._waiting = [[] for _ in self.work]   # per resource: sorted (need, pid)
+        self._cursor = [0] * len(self.work)       # first entry still above Work[j]
+        self._ready = []                          # min-heap of runnable pids
+
+        work = self.work
+        for i, row in enumerate(need):
+            if self.finish[i]:
+                continue
+            count = 0
+            for j, value in enumerate(row):
+                if value > work[j]:
+                    self._waiting[j].append((value, i))
+                    count += 1
+            self.blocked[i] = count
+            if count == 0:
+                self._ready.append(i)   # appended in pid order, so already a heap
+        for entries in self._waiting:
+            entries.sort()
+
+    def add_work(self, vector):
+        """Add a vector to Work and unblock the processes it satisfies"""
+        work = self.work
+        for j, value in enumerate(vector):
+            if value:
+                work[j] += value
+                self._unblock(j)
+
+    def _unblock(self, j):
+        entries = self._waiting[j]
+        k = self._cursor[j]
+        limit = self.work[j]
+        blocked = self.blocked
+        finish = self.finish
+        size = len(entries)
+        while k < size and entries[k][0] <= limit:
+            i = entries[k][1]
+            k += 1
+            if not finish[i]:
+                blocked[i] -= 1
+                if blocked[i] == 0:
+                    heapq.heappush(self._ready, i)
+        self._cursor[j] = k
+
+    def copy(self):
+        """
+        Independent copy for trying out different Work increases; the sorted
+        need lists are only ever read, so they are shared: O(n + m)
+        """
+        clone = object.__new__(type(self))
+        clone.work = list(self.work)
+        clone.allocation = self.allocation
+        clone.need = self.need
+        clone.finish = list(self.finish)
+        clone.blocked = list(self.blocked)
+        clone._waiting = self._waiting
+        clone._cursor = list(self._cursor)
+        clone._ready = list(self._ready)
+        return clone
+
+    def covers(self, row):
+        """Returns: whether Work >= row in every resource"""
+        return all(map(operator.le, row, self.work))
+
+    def run(self, tracer=None, target=None):
+        """
+        Finish runnable processes until none is left, lowest pid first
+        target: a need row; stop as soon as Work covers it
+        Returns: the processes finished by this call, in order
+        """
+        finished = []
+        ready = self._ready
+        if target is not None and self.covers(target):
+            return finished
+        while ready:
+            i = heapq.heappop(ready)
+            if self.finish[i]:
+                continue
+            if tracer is not None:
+                tracer.process_ready(i, self.need[i], self.work)
+            self.finish[i] = True
+            finished.append(i)
+            self.add_work(self.allocation[i])
+            if tracer is not None:
+                tracer.process_finished(i, self.work)
+            if target is not None and self.covers(target):
+                break
+        return finished
+
+
+def worklist_safety(available, allocation, need, tracer=None):
+    """
+    Banker's Safety Algorithm driven by per-resource worklists: O(n·m·log n).
+    Always picks the lowest runnable pid, so it yields the same safe sequence
+    as scan_safety without rescanning from P0 after every finish.
+    Returns: (is_safe, safe_sequence) with the sequence as process indices
+    """
+    if tracer is not None:
+        tracer.safety_started()
+
+    safe_sequence = SafetyWorklist(available, allocation, need).run(tracer)
+    is_safe = len(safe_sequence) == len(need)
+    if not is_safe:
+        safe_sequence = []
+
+    if tracer is not None:
+        tracer.safety_finished(is_safe, safe_sequence)
+    return is_safe, safe_sequence
+
+
+# Selectable safety engines: name -> engine(available, allocation, need, tracer)
+SAFETY_ENGINES = {
+    "scan": scan_safety,
+    "worklist": worklist_safety,
+}
+
+
+# Engines living in modules with optional dependencies, imported on first use
+OPTIONAL_ENGINES = {
+    "numpy": ("numpy_engine", "numpy_safety"),
+    "sparse": ("sparse_state", "sparse_safety"),
+}
+
+
+def get_engine(engine):
+    """Resolve a safety engine given by name or as a callable"""
+    if callable(engine):
+        return engine
+    if engine not in SAFETY_ENGINES and engine in OPTIONAL_ENGINES:
+        module_name, function_name = OPTIONAL_ENGINES[engine]
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as exc:
+            raise ImportError(f"The '{engine}' safety engine is unavailable: {exc}") from exc
+        SAFETY_ENGINES[engine] = getattr(module, function_name)
+    try:
+        return SAFETY_ENGINES[engine]
+    except KeyError:
+        choices = ', '.join(list(SAFETY_ENGINES) + [e for e in OPTIONAL_ENGINES if e not in SAFETY_ENGINES])
+        raise ValueError(f"Unknown safety engine '{engine}' (choose from: {choices})") from None
+
+
+def random_system(rng, num_processes, num_resources, max_value=10):
+    """
+    Build a random Banker's system with a seeded random.Random
+    Returns: (available, max_need, allocation)
+    """
+    max_need = [[rng.randint(0, max_value) for _ in range(num_resources)]
+                for _ in range(num_processes)]
+    allocation = [[rng.randint(0, v) for v in row] for row in max_need]
+    available = [rng.randint(0, max_value) for _ in range(num_resources)]
+    return available, max_need, allocation
+
+
+def replay_safe_sequence(available, allocation, need, order):
+    """
+    Check that `order` is a valid safe sequence for the given state
+    Returns: True if every process in order fits in Work when its turn comes
+    """
+    if len(order) != len(need) or len(set(order)) != len(need):
+        return False
+    le = operator.le
+    work = list(available)
+    for i in order:
+        if not all(map(le, need[i], work)):
+            return False
+        work = list(map(operator.add, work, allocation[i]))
+    return True
+
+
+def cross_check_engines(trials=500, max_processes=8, max_resources=4, seed=0, engines=None):
+    """
+    Run every engine on the same random systems and compare their verdicts.
+    Each safe sequence is replayed to make sure it is valid.
+    Returns: list of (available, max_need, allocation) systems they disagree on
+    """
+    rng = random.Random(seed)
+    engines = [get_engine(e) for e in (engines or SAFETY_ENGINES)]
+    mismatches = []
+    for _ in range(trials):
+        available, max_need, allocation = random_system(
+            rng, rng.randint(1, max_processes), rng.randint(1, max_resources))
+        need = [[m - a for m, a in zip(mrow, arow)] for mrow, arow in zip(max_need, allocation)]
+        verdicts = set()
+        for engine in engines:
+            is_safe, order = engine(available, allocation, need)
+            if is_safe and not replay_safe_sequence(available, allocation, need, order):
+                is_safe = None   # an invalid sequence never agrees with anything
+            verdicts.add(is_safe)
+        if len(verdicts) != 1:
+            mismatches.append((available, max_need, allocation))
+    return mismatches
+
+
+# Ordering policies for DeadlockDetectionSimulator.admit_batch
+BATCH_FIFO = "fifo"
+BATCH_PRIORITY = "priority"
+BATCH_MAX_GRANTS = "max-grants"
+
+
+class RowOverlay:
+    """
+    Read-only matrix view with one row replaced, so a tentative grant can be
+    checked as "state + delta" without copying the other rows
+    """
+    __slots__ = ("base", "row_index", "row")
+
+    def __init__(self, base, row_index, row):
+        self.base = base
+        self.row_index = row_index
+        self.row = row
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, i):
+        if i == self.row_index:
+            return self.row
+        return self.base[i]
+
+    def __iter__(self):
+        row_index, row = self.row_index, self.row
+        for i, base_row in enumerate(self.base):
+            yield row if i == row_index else base_row
+
+
 class DeadlockDetectionSimulator:
-    def __init__(self):
+    __slots__ = ("num_processes", "num_resources", "max_need", "allocation", "available",
+                 "need", "tracer", "engine", "_undo_log", "warm_start", "_safe_order",
+                 "verdict_cache", "_fingerprint", "components", "journal", "wait_for_graph")
+    
+    def __init__(self, tracer=None, engine="scan"):
         self.num_processes = 0
         self.num_resources = 0
         self.max_need = []      # Maximum resources each process may request
         self.allocation = []    # Resources currently allocated to each process
         self.available = []     # Available instances of each resource
         self.need = []          # Remaining resource needs for each process
+        self.tracer = tracer    # Optional SafetyTracer; None runs fully headless
+        self.engine = engine    # Safety engine name (see SAFETY_ENGINES) or callable
+        self._undo_log = []     # (process_id, request) of uncommitted tentative grants
+        self.warm_start = True  # Replay the last safe sequence before a full search
+        self._safe_order = None # Last safe sequence proved for this system (indices)
+        self.verdict_cache = None   # Optional VerdictCache (see enable_verdict_cache)
+        self._fingerprint = None    # StateFingerprint kept in step with the state
+        self.components = None      # Optional ComponentIndex (see enable_components)
+        self.journal = None         # Optional Journal (see enable_journal)
+        self.wait_for_graph = None  # Optional IncrementalWaitForGraph (see enable_wait_for_graph)
         
-    def print_state(self, title="System State"):
-        """Print current system state in a formatted table"""
-        print(f"\n{'='*60}")
-        print(f"{title:^60}")
-        print(f"{'='*60}")
-        
-        # Print available resources
-        print("\n📊 Available Resources:")
-        headers = [f"R{i}" for i in range(self.num_resources)]
-        print("+---" * self.num_resources + "+")
-        print("| " + " | ".join(headers) + " |")
-        print("+---" * self.num_resources + "+")
-        print("| " + " | ".join(f"{x:^3}" for x in self.available) + " |")
-        print("+---" * self.num_resources + "+")
-        
-        # Print processes information
-        print("\n📋 Process Information:")
-        print("+---------+" + "---------+" * (self.num_resources * 3) + "")
-        
-        # Print headers
-        headers = ["Process"]
-        for j in range(self.num_resources):
-            headers.append(f"Max R{j}")
-        for j in range(self.num_resources):
-            headers.append(f"Alloc R{j}")
-        for j in range(self.num_resources):
-            headers.append(f"Need R{j}")
-        
-        header_line = "|"
-        for h in headers:
-            header_line += f" {h:^7} |"
-        print(header_line)
-        print("+---------+" + "---------+" * (self.num_resources * 3) + "")
-        
-        # Print process data
-        for i in range(self.num_processes):
-            row = [f"P{i}"]
-            row.extend(self.max_need[i])
-            row.extend(self.allocation[i])
-            row.extend(self.need[i])
-            
-            row_line = "|"
-            for val in row:
-                if isinstance(val, str):
-                    row_line += f" {val:^7} |"
-                else:
-                    row_line += f" {val:^7} |"
-            print(row_line)
+    def print_state(self, title="System State", view="full", page=0, top=10, page_size=50):
+        """
+        Print current system state in formatted tables, one page at a time.
+        A system that fits on one page keeps the classic full table.
+        view: "full", "top" (most remaining need), "blocked", "deadlocked" or
+              "utilisation" (per-resource aggregates); see state_render
+        """
+        from state_render import StateRenderer, write_classic
         
-        print("+---------+" + "---------+" * (self.num_resources * 3) + "")
+        if view == "full" and page == 0 and self.num_processes <= page_size:
+            out = io.StringIO()
+            write_classic(out, self, title)
+            sys.stdout.write(out.getvalue())
+            return
+        StateRenderer(self, page_size=page_size).print(title, view, page, top)
     
     def initialize_system(self):
         """Initialize the system with user input"""
@@ -186,155 +650,641 @@ class DeadlockDetectionSimulator:
     
     def calculate_need(self):
         """Calculate the Need matrix: Need = Max - Allocation"""
-        self.need = []
-        for i in range(self.num_processes):
-            need_row = []
-            for j in range(self.num_resources):
-                need = self.max_need[i][j] - self.allocation[i][j]
-                need_row.append(need)
-            self.need.append(need_row)
+        backend = getattr(self.need, "state", None)
+        if backend is not None:
+            # Sparse or compact state owns Need: recomputed (or kept) in place, so
+            # its Max view stays in step
+            copied = backend.calculate_need()
+        else:
+            self.need = [list(map(operator.sub, max_row, alloc_row))
+                         for max_row, alloc_row in zip(self.max_need, self.allocation)]
+            copied = sys.getsizeof(self.need) + sum(map(sys.getsizeof, self.need))
+        self._safe_order = None
+        if self.tracer is not None:
+            self.tracer.state_copied(copied)
+        if self._fingerprint is not None:
+            self._fingerprint.rehash(self.available, self.allocation, self.need)
+        if self.components is not None:
+            self.components.rebuild()
+        if self.journal is not None:
+            self.journal.checkpoint()     # the state was replaced, not changed step by step
+        if self.wait_for_graph is not None:
+            self.enable_wait_for_graph()
     
-    def safety_algorithm(self):
+    def enable_verdict_cache(self, max_size=1024):
         """
-        Banker's Safety Algorithm to check if system is in safe state
-        Returns: (is_safe, safe_sequence)
+        Memoize safety verdicts by a fingerprint of (Available, Allocation, Need)
+        that every grant, release, arrival and exit updates in O(m).
+        Call it once the state is set up; calculate_need() rehashes.
+        Returns: the VerdictCache, for its hit/miss statistics
         """
-        print("\n🔍 Running Safety Algorithm...")
-        print("-" * 40)
+        from verdict_cache import StateFingerprint, VerdictCache
         
-        # Work = Available
-        work = self.available.copy()
-        finish = [False] * self.num_processes
-        safe_sequence = []
+        self.verdict_cache = VerdictCache(max_size)
+        self._fingerprint = StateFingerprint(self.available, self.allocation, self.need)
+        return self.verdict_cache
+    
+    def disable_verdict_cache(self):
+        """Stop memoizing verdicts and drop the cache"""
+        self.verdict_cache = None
+        self._fingerprint = None
+    
+    def enable_components(self, workers=1):
+        """
+        Check safety per group of processes that share no resource type, and
+        re-check only the group a grant, arrival or exit touches. The groups
+        come from a union-find over the nonzero entries of Max, kept up to
+        date as processes arrive; calculate_need() rebuilds it.
+        workers: worker processes for large groups (1 checks in process)
+        Returns: the ComponentIndex, for its statistics
+        """
+        from components import ComponentIndex
         
-        iteration = 1
+        if self.components is not None:
+            self.components.close()
+        self.components = ComponentIndex(self, workers)
+        return self.components
+    
+    def disable_components(self):
+        """Go back to checking the whole system as one problem"""
+        if self.components is not None:
+            self.components.close()
+        self.components = None
+    
+    def enable_journal(self, directory, **options):
+        """
+        Record every committed grant, release, arrival and exit in a crash-safe
+        journal in `directory`, starting from a checkpoint of the current state.
+        After a restart, journal.restore(directory) rebuilds the state.
+        options: sync_every, sync_interval and checkpoint_every (see journal.Journal)
+        Returns: the Journal, for sync() and its statistics
+        """
+        from journal import Journal
         
-        while len(safe_sequence) < self.num_processes:
-            print(f"\nIteration {iteration}:")
-            print(f"  Work: {work}")
-            finished_procs = [f'P{i}' for i, f in enumerate(finish) if f]
-            print(f"  Finished processes: {finished_procs if finished_procs else 'None'}")
-            
-            found = False
-            for i in range(self.num_processes):
-                if not finish[i]:
-                    # Check if Need[i] <= Work
-                    can_allocate = True
-                    for j in range(self.num_resources):
-                        if self.need[i][j] > work[j]:
-                            can_allocate = False
-                            break
-                    
-                    if can_allocate:
-                        print(f"  ✓ Process P{i} can be allocated (Need: {self.need[i]} <= Work: {work})")
-                        print(f"    Allocating resources to P{i}...")
-                        
-                        # Simulate process completion
-                        for j in range(self.num_resources):
-                            work[j] += self.allocation[i][j]
-                        
-                        finish[i] = True
-                        safe_sequence.append(f"P{i}")
-                        found = True
-                        
-                        print(f"    P{i} finished. Work becomes: {work}")
-                        break
-                    else:
-                        print(f"  ✗ Process P{i} must wait (Need: {self.need[i]} > Work: {work})")
-            
-            if not found:
-                print("\n❌ No process found that can be allocated. System is UNSAFE!")
-                return False, []
-            
-            iteration += 1
-            if iteration <= self.num_processes:  # Only pause for first few iterations
-                time.sleep(1)  # Pause for visualization
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = Journal(self, directory, **options)
+        self.journal.checkpoint()
+        return self.journal
+    
+    def disable_journal(self):
+        """Sync and stop journaling"""
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = None
+    
+    def enable_wait_for_graph(self):
+        """
+        Keep a resource-allocation graph of a single-instance system in step
+        with every committed grant, release, arrival and exit, each process
+        waiting for all it may still claim (Need, as in find_deadlocked).
+        Its cycles() and deadlocked_processes() then answer without a full
+        detection pass; calculate_need() rebuilds it.
+        Returns: the IncrementalWaitForGraph
+        Raises: ValueError if some resource type has more than one instance
+        """
+        from detection import IncrementalWaitForGraph
         
-        print(f"\n✅ System is in SAFE state!")
-        print(f"📈 Safe sequence: {' → '.join(safe_sequence)}")
-        return True, safe_sequence
+        self.wait_for_graph, _ = IncrementalWaitForGraph.from_simulator(self, self.need)
+        return self.wait_for_graph
+    
+    def disable_wait_for_graph(self):
+        """Stop maintaining the wait-for graph"""
+        self.wait_for_graph = None
+    
+    def safety_algorithm(self, engine=None):
+        """
+        Banker's Safety Algorithm to check if system is in safe state
+        engine: overrides self.engine for this call
+        Returns: (is_safe, safe_sequence)
+        """
+        is_safe, order = self._run_engine(self.available, self.allocation, self.need,
+                                          self.tracer, self._state_key(), engine)
+        return is_safe, [f"P{i}" for i in order]
     
     def detect_deadlock(self):
         """Main deadlock detection function"""
-        print("\n" + "="*60)
-        print("DEADLOCK DETECTION SIMULATION".center(60))
-        print("="*60)
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.detection_started(self)
+            tracer.state_changed(self, "Initial State")
         
-        self.print_state("Initial State")
+        try:
+            is_safe, order = self._run_engine(self.available, self.allocation, self.need,
+                                              tracer, self._state_key())
+        except BaseException as exc:
+            if tracer is not None:
+                tracer.detection_failed(exc)
+            raise
+        if is_safe:
+            self._safe_order = list(order)
         
-        is_safe, safe_seq = self.safety_algorithm()
+        if tracer is not None:
+            tracer.detection_finished(is_safe, order)
         
-        if is_safe:
-            print("\n🎉 CONCLUSION: No deadlock detected!")
-            print(f"   The system is in a safe state.")
-            print(f"   Processes can complete in order: {' → '.join(safe_seq)}")
+        return is_safe, [f"P{i}" for i in order]
+    
+    def find_deadlocked(self, request=None, mode="auto"):
+        """
+        Exact deadlock detection from outstanding requests (unlike detect_deadlock,
+        which checks Banker's safety against the maximum need).
+        request: outstanding Request matrix; defaults to Need, i.e. every process
+                 asking for everything it may still claim
+        mode: "matrix" (multi-instance detection algorithm), "graph" (wait-for
+              graph cycles) or "auto" (graph when every resource has one instance)
+        Returns: (deadlocked, cycles) as process labels; cycles is empty in matrix mode
+        """
+        import detection
+        
+        if request is None:
+            request = self.need
+        if mode == detection.DETECT_AUTO:
+            single = detection.is_single_instance(self.available, self.allocation)
+            mode = detection.DETECT_GRAPH if single else detection.DETECT_MATRIX
+        
+        if mode == detection.DETECT_GRAPH:
+            deadlocked, cycles = detection.detect_wait_for_deadlock(self.allocation, request, self.available)
+        elif mode == detection.DETECT_MATRIX:
+            deadlocked, cycles = detection.detect_deadlocked(self.available, self.allocation, request), []
         else:
-            print("\n⚠️  CONCLUSION: Deadlock detected!")
-            print("   The system is in an unsafe state.")
-            print("   One or more processes are deadlocked.")
+            raise ValueError(f"Unknown detection mode '{mode}'")
         
-        return is_safe, safe_seq
+        if self.tracer is not None:
+            self.tracer.deadlock_found(deadlocked, cycles)
+        return [f"P{i}" for i in deadlocked], [[f"P{i}" for i in cycle] for cycle in cycles]
+    
+    def plan_recovery(self, costs=None, action="terminate", exact=False, time_budget=1.0):
+        """
+        Cheapest set of victims to preempt or terminate so that a safe
+        sequence exists again (see recovery.plan_recovery). The state is not
+        modified; pass the plan to recover() to carry it out.
+        costs: cost of each victim (list or dict by pid), 1 each by default
+        action: "terminate" (claim dropped) or "preempt" (allocation taken
+                back; the victim needs its whole maximum again and restarts
+                after everyone else)
+        exact: search branch-and-bound for the cheapest plan within time_budget
+        Returns: dict with action, victims, cost, safe_sequence, optimal,
+                 nodes and seconds
+        Raises: ValueError for an unknown action, or when preempting cannot
+                help because some maximum claim exceeds the total resources
+        """
+        import recovery
+        
+        plan = recovery.plan_recovery(self.available, self.allocation, self.need, costs, exact, time_budget,
+                                      action=action)
+        plan = dict(plan, action=action, victims=[f"P{i}" for i in plan["victims"]],
+                    safe_sequence=[f"P{i}" for i in plan["safe_sequence"]])
+        if self.tracer is not None:
+            self.tracer.recovery_planned(plan)
+        return plan
+    
+    def recover(self, plan):
+        """
+        Carry out a plan from plan_recovery: terminated victims exit, preempted
+        victims release everything they hold and keep their maximum claim.
+        Returns: the allocation freed per victim label
+        """
+        freed = {}
+        for label in plan["victims"]:
+            pid = int(label[1:])
+            if plan["action"] == "terminate":
+                freed[label] = self.exit_process(pid)
+            else:
+                freed[label] = list(self.allocation[pid])
+                self.release_resources(pid, freed[label])
+        return freed
     
     def request_resources(self, process_id, request):
         """
         Simulate a process requesting resources
         Returns: True if request can be granted safely
         """
-        print(f"\n📨 Process P{process_id} requesting resources: {request}")
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.request_started(process_id, request)
         
-        # Check if request is valid (request <= need)
-        for j in range(self.num_resources):
-            if request[j] > self.need[process_id][j]:
-                print(f"❌ Request exceeds maximum need! (Request: {request[j]} > Need: {self.need[process_id][j]} for R{j})")
-                return False
+        problem = self._check_request(process_id, request)
+        if problem is not None:
+            if tracer is not None:
+                tracer.request_rejected(process_id, problem[1], problem[0])
+            return False
         
-        # Check if request <= available
-        for j in range(self.num_resources):
-            if request[j] > self.available[j]:
-                print(f"❌ Not enough resources available! (Request: {request[j]} > Available: {self.available[j]} for R{j})")
-                return False
+        if tracer is not None:
+            tracer.request_tentative(process_id, request)
         
-        print("✓ Request validation passed. Temporarily allocating resources...")
+        # Allocate in place; the undo log restores the row if the state is unsafe
+        mark = len(self._undo_log)
+        self._tentative_grant(process_id, request)
         
-        # Try to allocate
-        temp_available = self.available.copy()
-        temp_allocation = [row.copy() for row in self.allocation]
-        temp_need = [row.copy() for row in self.need]
+        if tracer is not None:
+            tracer.state_changed(self, "State After Temporary Allocation")
         
-        # Simulate allocation
-        for j in range(self.num_resources):
-            temp_available[j] -= request[j]
-            temp_allocation[process_id][j] += request[j]
-            temp_need[process_id][j] -= request[j]
+        # Check if state is safe
+        is_safe, _ = self._verify_safe(self.available, self.allocation, self.need, tracer)
+        
+        if is_safe:
+            self._commit(mark)
+        else:
+            self._rollback(mark)
         
-        # Save original state
-        original_available = self.available.copy()
-        original_allocation = [row.copy() for row in self.allocation]
-        original_need = [row.copy() for row in self.need]
+        if tracer is not None:
+            tracer.request_finished(process_id, is_safe)
+        return is_safe
+    
+    def release_resources(self, process_id, release):
+        """
+        Return resources held by a process to Available.
+        Releasing never makes a safe state unsafe, so the cached safe sequence stays valid.
+        Returns: True if released, False if the process does not hold that much
+        """
+        allocation = self.allocation[process_id]
+        for j in range(self.num_resources):
+            if release[j] < 0 or release[j] > allocation[j]:
+                if self.tracer is not None:
+                    self.tracer.request_rejected(process_id, f"Cannot release more than allocated! (Release: {release[j]} > Allocation: {allocation[j]} for R{j})", "invalid-release")
+                return False
         
-        # Temporarily change state
-        self.available, self.allocation, self.need = temp_available, temp_allocation, temp_need
+        self._apply_grant(process_id, release, sign=-1)
+        if self.journal is not None:
+            self.journal.released(process_id, release)
+        if self.wait_for_graph is not None:
+            self.wait_for_graph.sync_process(process_id, allocation, self.need[process_id])
+        if self.tracer is not None:
+            self.tracer.resources_released(process_id, release)
+        return True
+    
+    def add_process(self, max_need, process_id=None):
+        """
+        Admit a new process holding nothing yet. A simulator over compact or
+        memory-mapped state switches to list rows on its first appended process.
+        process_id: reuse the row of a process that has exited instead of appending
+        Returns: the process ID
+        """
+        if len(max_need) != self.num_resources or any(v < 0 for v in max_need):
+            raise ValueError(f"Need exactly {self.num_resources} non-negative values!")
         
-        self.print_state("State After Temporary Allocation")
+        if process_id is None:
+            process_id = self.num_processes
+            if not hasattr(self.max_need, "append"):
+                # Fixed-size views (compact or memory-mapped state) cannot grow: move to lists
+                self.available = list(self.available)
+                self.max_need, self.allocation, self.need = (
+                    [list(row) for row in matrix] for matrix in (self.max_need, self.allocation, self.need))
+            if self._fingerprint is not None:
+                self._fingerprint.replace_need_row(process_id, [0] * self.num_resources, max_need)
+            self.max_need.append(list(max_need))
+            self.allocation.append([0] * self.num_resources)
+            self.need.append(list(max_need))
+            self.num_processes += 1
+            if self._safe_order is not None:
+                self._safe_order = self._safe_order + [process_id]
+        else:
+            if any(self.allocation[process_id]):
+                raise ValueError(f"P{process_id} still holds resources!")
+            max_row, need_row = self.max_need[process_id], self.need[process_id]
+            if self._fingerprint is not None:
+                self._fingerprint.replace_need_row(process_id, need_row, max_need)
+            for j, value in enumerate(max_need):
+                max_row[j] = value
+                need_row[j] = value
+        if self.components is not None:
+            self.components.process_added(process_id, max_need)
+        if self.journal is not None:
+            self.journal.process_added(process_id, max_need)
+        if self.wait_for_graph is not None:
+            self.wait_for_graph.sync_process(process_id, self.allocation[process_id], self.need[process_id])
+        return process_id
+    
+    def exit_process(self, process_id):
+        """
+        Finish a process: release everything it holds and clear its maximum claim.
+        The row stays as an idle placeholder so other process IDs do not shift.
+        Returns: the released allocation
+        """
+        released = list(self.allocation[process_id])
+        self._apply_grant(process_id, released, sign=-1)
+        max_row, need_row = self.max_need[process_id], self.need[process_id]
+        if self._fingerprint is not None:
+            self._fingerprint.replace_need_row(process_id, need_row, [0] * self.num_resources)
+        for j in range(self.num_resources):
+            max_row[j] = 0
+            need_row[j] = 0
+        if self.components is not None:
+            self.components.process_exited(process_id)
+        if self.journal is not None:
+            self.journal.process_exited(process_id, released)
+        if self.wait_for_graph is not None:
+            self.wait_for_graph.sync_process(process_id, self.allocation[process_id], need_row)
+        if self.tracer is not None:
+            self.tracer.resources_released(process_id, released)
+        return released
+    
+    def is_request_safe(self, process_id, request):
+        """
+        Read-only check of a request against the state plus its delta.
+        Only the new Available vector and the two changed rows are built: O(m).
+        Returns: (is_safe, safe_sequence) of the hypothetical state
+        """
+        if self._check_request(process_id, request) is not None:
+            return False, []
+        available, allocation, need = self._with_grant(process_id, request)
+        key = None
+        if self._fingerprint is not None:
+            key = self._state_key(self._fingerprint.with_grant(
+                process_id, request, self.available, self.allocation[process_id], self.need[process_id]),
+                available)
+        is_safe, order = self._verify_safe(available, allocation, need, remember=False, key=key)
+        return is_safe, [f"P{i}" for i in order]
+    
+    def max_grantable(self, process_id, frontier=True):
+        """
+        Read-only query of the largest safe request process_id can make now:
+        the maximum of each resource alone, plus one maximal safe vector
+        (see grant_query.max_grantable). The state is never modified.
+        Returns: dict with limits, max_per_resource, frontier, box_safe,
+                 safe_state, probes and seconds
+        """
+        import grant_query
+        return grant_query.max_grantable(self, process_id, frontier)
+    
+    def admit_batch(self, requests, policy=BATCH_FIFO, apply=True):
+        """
+        Evaluate a burst of requests against the current state in one pass.
+        requests: list of (process_id, request) or (process_id, request, priority)
+        policy: BATCH_FIFO (input order), BATCH_PRIORITY (highest priority first)
+                or BATCH_MAX_GRANTS (smallest requests first to grant as many as possible)
+        apply: keep the granted requests; False only reports what would happen
+        The tracer sees every decision like a request_resources call, except in
+        a dry run (apply=False).
+        The whole batch is first granted together and proved safe with one check.
+        Only if that fails is each request checked on its own, warm-started from
+        the sequence proved by the previous grant; a request that proved unsafe
+        then denies every larger request of that process without another safety
+        check: granting more never turns unsafe into safe.
+        Returns: dict with "granted" (request indices in grant order), "denied"
+                 ({index: reason}), "available" and "safe_sequence" of the final state
+        """
+        order = list(range(len(requests)))
+        if policy == BATCH_PRIORITY:
+            order.sort(key=lambda k: -(requests[k][2] if len(requests[k]) > 2 else 0))
+        elif policy == BATCH_MAX_GRANTS:
+            order.sort(key=lambda k: sum(requests[k][1]))
+        elif policy != BATCH_FIFO:
+            raise ValueError(f"Unknown batch policy '{policy}'")
         
-        # Check if state is safe
-        is_safe, _ = self.safety_algorithm()
+        mark = len(self._undo_log)
+        tracer = self.tracer if apply else None
+        verdict = self._admit_all(requests, order, tracer) if len(order) > 1 else None
+        if verdict is not None:
+            granted, denied, final_order = verdict
+        else:
+            granted, denied = self._admit_each(requests, order, tracer)
+            _, final_order = self._verify_safe(self.available, self.allocation, self.need)
+        result = {
+            "granted": granted,
+            "denied": denied,
+            "available": list(self.available),
+            "safe_sequence": [f"P{i}" for i in final_order],
+        }
+        if apply:
+            self._commit(mark)
+        else:
+            self._rollback(mark)
+        return result
+    
+    def _batch_problem(self, process_id, request):
+        """Returns: None when a batch request may be granted, otherwise (reason, message)"""
+        if not 0 <= process_id < self.num_processes or len(request) != self.num_resources:
+            return "invalid", (f"Request needs a process below {self.num_processes} "
+                               f"and exactly {self.num_resources} values!")
+        return self._check_request(process_id, request)
+    
+    def _admit_all(self, requests, order, tracer=None):
+        """
+        Grant every request of a batch that passes its checks and prove the
+        result safe with a single check. Taking part of a grant back keeps a
+        safe state safe, so this grants exactly what admitting the requests one
+        by one in the same order would.
+        Returns: (granted, denied, safe_sequence), or None with the state
+                 untouched when the combined grants are unsafe
+        """
+        mark = len(self._undo_log)
+        granted = []
+        problems = {}
+        for k in order:
+            process_id, request = requests[k][0], requests[k][1]
+            problem = self._batch_problem(process_id, request)
+            if problem is not None:
+                problems[k] = problem
+            else:
+                self._tentative_grant(process_id, request)
+                granted.append(k)
         
-        # Restore original state
-        self.available, self.allocation, self.need = original_available, original_allocation, original_need
+        is_safe, sequence = self._verify_safe(self.available, self.allocation, self.need)
+        if not is_safe:
+            self._rollback(mark)
+            return None
+        if tracer is not None:
+            for k in order:
+                process_id, request = requests[k][0], requests[k][1]
+                tracer.request_started(process_id, request)
+                if k in problems:
+                    tracer.request_rejected(process_id, problems[k][1], problems[k][0])
+                else:
+                    tracer.request_finished(process_id, True)
+        return granted, {k: problem[0] for k, problem in problems.items()}, sequence
+    
+    def _admit_each(self, requests, order, tracer=None):
+        """
+        Grant the requests of a batch one at a time, each with its own safety
+        check. A request that proved unsafe denies every larger request of
+        that process without another check.
+        Returns: (granted, denied)
+        """
+        granted = []
+        denied = {}
+        unsafe_seen = {}    # process_id -> requests already proved unsafe
+        ge = operator.ge
+        for k in order:
+            process_id, request = requests[k][0], requests[k][1]
+            if tracer is not None:
+                tracer.request_started(process_id, request)
+            problem = self._batch_problem(process_id, request)
+            if problem is not None:
+                denied[k] = problem[0]
+                if tracer is not None:
+                    tracer.request_rejected(process_id, problem[1], problem[0])
+                continue
+            if any(all(map(ge, request, bad)) for bad in unsafe_seen.get(process_id, ())):
+                denied[k] = "unsafe"
+                if tracer is not None:
+                    tracer.request_finished(process_id, False)
+                continue
+            
+            step = len(self._undo_log)
+            self._tentative_grant(process_id, request)
+            is_safe, _ = self._verify_safe(self.available, self.allocation, self.need, tracer)
+            if is_safe:
+                granted.append(k)
+            else:
+                self._rollback(step)
+                unsafe_seen.setdefault(process_id, []).append(request)
+                denied[k] = "unsafe"
+            if tracer is not None:
+                tracer.request_finished(process_id, is_safe)
+        return granted, denied
+    
+    def _verify_safe(self, available, allocation, need, tracer=None, remember=True, key=None):
+        """
+        Safety check warm-started from the last safe sequence: replaying it is a
+        single linear pass, and the full engine only runs if the replay fails.
+        key: verdict cache key of the state checked; by default the simulator's
+             own state is keyed, and any other state is not cached
+        Returns: (is_safe, safe_sequence) with the sequence as process indices
+        """
+        if key is None and available is self.available:
+            key = self._state_key()
+        verdict = self._cached_verdict(key, tracer)
+        if verdict is not None:
+            if verdict[0] and remember:
+                self._safe_order = list(verdict[1])
+            return verdict
         
-        if is_safe:
-            print(f"\n✅ Request by P{process_id} can be GRANTED safely")
-            # Actually apply the allocation
-            for j in range(self.num_resources):
-                self.available[j] -= request[j]
-                self.allocation[process_id][j] += request[j]
-                self.need[process_id][j] -= request[j]
-            print("✅ Resources have been allocated!")
-            return True
+        order = self._safe_order
+        if self.components is not None and available is self.available:
+            # Per-component verdicts already skip every group that did not change
+            is_safe, order = self.components.check(self.engine, tracer)
+            if is_safe and remember:
+                self._safe_order = order
+        elif self.warm_start and order is not None and replay_safe_sequence(available, allocation, need, order):
+            if tracer is not None:
+                tracer.safety_replayed(order)
+            is_safe = True
         else:
-            print(f"\n❌ Request by P{process_id} would lead to UNSAFE state - Request DENIED")
-            return False
+            is_safe, order = get_engine(self.engine)(available, allocation, need, tracer)
+            if is_safe and remember:
+                self._safe_order = order
+        if key is not None:
+            self.verdict_cache.put(key, is_safe, order)
+        return is_safe, order
+    
+    def _state_key(self, fingerprint=None, available=None):
+        """
+        Verdict cache key of the current state, or of the state with `fingerprint`
+        and `available`. Available itself is part of the key (O(m)), so a
+        fingerprint collision only matters between states with equal Available.
+        Returns: the key, None if not caching
+        """
+        if self._fingerprint is None:
+            return None
+        if fingerprint is None:
+            fingerprint, available = self._fingerprint.value, self.available
+        return self.num_processes, fingerprint, tuple(available)
+    
+    def _run_engine(self, available, allocation, need, tracer=None, key=None, engine=None):
+        """
+        Run the safety engine, answering from the verdict cache when `key` is cached
+        Returns: (is_safe, safe_sequence) with the sequence as process indices
+        """
+        verdict = self._cached_verdict(key, tracer)
+        if verdict is not None:
+            return verdict
+        is_safe, order = self._engine_check(available, allocation, need, tracer, engine)
+        if key is not None:
+            self.verdict_cache.put(key, is_safe, order)
+        return is_safe, order
+    
+    def _engine_check(self, available, allocation, need, tracer=None, engine=None):
+        """Run the engine, per component when components are on and the state is the simulator's own"""
+        if self.components is not None and available is self.available:
+            return self.components.check(engine or self.engine, tracer)
+        return get_engine(engine or self.engine)(available, allocation, need, tracer)
+    
+    def _cached_verdict(self, key, tracer=None):
+        """Returns: the cached (is_safe, safe_sequence) for `key`, or None"""
+        if key is None:
+            return None
+        verdict = self.verdict_cache.get(key)
+        if verdict is not None and tracer is not None:
+            tracer.safety_finished(*verdict)
+        return verdict
+    
+    def _check_request(self, process_id, request):
+        """
+        Validate 0 <= request <= need and request <= available
+        Returns: None when valid, otherwise (reason, message) with reason
+                 "invalid", "exceeds-need" or "unavailable"
+        """
+        need = self.need[process_id]
+        # Check if request is valid (0 <= request <= need)
+        for j in range(self.num_resources):
+            if request[j] < 0:
+                return "invalid", f"Request cannot be negative! (Request: {request[j]} for R{j})"
+            if request[j] > need[j]:
+                return "exceeds-need", f"Request exceeds maximum need! (Request: {request[j]} > Need: {need[j]} for R{j})"
+        
+        # Check if request <= available
+        for j in range(self.num_resources):
+            if request[j] > self.available[j]:
+                return "unavailable", f"Not enough resources available! (Request: {request[j]} > Available: {self.available[j]} for R{j})"
+        return None
+    
+    def _with_grant(self, process_id, request):
+        """Returns: (available, allocation, need) views of the state with request granted"""
+        available = list(map(operator.sub, self.available, request))
+        allocation = RowOverlay(self.allocation, process_id,
+                                list(map(operator.add, self.allocation[process_id], request)))
+        need = RowOverlay(self.need, process_id,
+                          list(map(operator.sub, self.need[process_id], request)))
+        if self.tracer is not None:
+            self.tracer.state_copied(sys.getsizeof(available) + sys.getsizeof(allocation.row)
+                                     + sys.getsizeof(need.row))
+        return available, allocation, need
+    
+    def _apply_grant(self, process_id, request, sign=1):
+        """Move `request` from Available to the process (sign=-1 moves it back)"""
+        available = self.available
+        allocation = self.allocation[process_id]
+        need = self.need[process_id]
+        if self._fingerprint is not None:
+            self._fingerprint.apply_grant(process_id, request, available, allocation, need, sign)
+        if self.components is not None:
+            self.components.process_changed(process_id, released=sign < 0)
+        for j, amount in enumerate(request):
+            if amount:
+                amount *= sign
+                available[j] -= amount
+                allocation[j] += amount
+                need[j] -= amount
+    
+    def _tentative_grant(self, process_id, request):
+        """Grant in place and record an undo entry for _rollback"""
+        self._apply_grant(process_id, request)
+        entry = (process_id, tuple(request))
+        self._undo_log.append(entry)
+        if self.tracer is not None:
+            self.tracer.state_copied(sys.getsizeof(entry) + sys.getsizeof(entry[1]))
+    
+    def _commit(self, mark=0):
+        """Keep every tentative grant made since `mark`"""
+        if self.journal is None and self.wait_for_graph is None:
+            del self._undo_log[mark:]
+            return
+        committed = self._undo_log[mark:]
+        del self._undo_log[mark:]
+        if committed and self.journal is not None:
+            self.journal.granted(committed)
+        if self.wait_for_graph is not None:
+            for process_id in dict.fromkeys(process_id for process_id, _ in committed):
+                self.wait_for_graph.sync_process(process_id, self.allocation[process_id],
+                                                 self.need[process_id])
+    
+    def _rollback(self, mark=0):
+        """Undo the tentative grants made since `mark`, newest first"""
+        log = self._undo_log
+        while len(log) > mark:
+            process_id, request = log.pop()
+            self._apply_grant(process_id, request, sign=-1)
 
 
 def run_predefined_examples():
@@ -359,7 +1309,7 @@ def run_predefined_examples():
             print("EXAMPLE 1: System in SAFE State".center(60))
             print("="*60)
             
-            simulator = DeadlockDetectionSimulator()
+            simulator = DeadlockDetectionSimulator(tracer=ConsoleTracer())
             simulator.num_processes = 5
             simulator.num_resources = 3
             
@@ -395,7 +1345,7 @@ def run_predefined_examples():
             print("⚠️  This is a classic deadlock scenario!")
             print("   All processes are waiting for resources held by others")
             
-            simulator = DeadlockDetectionSimulator()
+            simulator = DeadlockDetectionSimulator(tracer=ConsoleTracer())
             simulator.num_processes = 3
             simulator.num_resources = 3
             
@@ -418,6 +1368,7 @@ def run_predefined_examples():
             
             simulator.calculate_need()
             simulator.detect_deadlock()
+            simulator.find_deadlocked()
             
         elif example_choice == '3':
             # Example 3: Resource Request
@@ -426,7 +1377,7 @@ def run_predefined_examples():
             print("="*60)
             
             # First create a safe system
-            simulator = DeadlockDetectionSimulator()
+            simulator = DeadlockDetectionSimulator(tracer=ConsoleTracer())
             simulator.num_processes = 5
             simulator.num_resources = 3
             
@@ -473,7 +1424,7 @@ def run_predefined_examples():
             print("💡 This demonstrates the classic dining philosophers problem")
             print("   Each process holds one resource and needs another")
             
-            simulator = DeadlockDetectionSimulator()
+            simulator = DeadlockDetectionSimulator(tracer=ConsoleTracer())
             simulator.num_processes = 4
             simulator.num_resources = 4
             
@@ -505,6 +1456,7 @@ def run_predefined_examples():
             print("• This creates a circular wait → DEADLOCK!")
             
             simulator.detect_deadlock()
+            simulator.find_deadlocked()
             
         elif example_choice == '5':
             print("↩️  Returning to main menu...")
@@ -526,7 +1478,7 @@ def interactive_mode():
     print("INTERACTIVE DEADLOCK DETECTION".center(60))
     print("="*60)
     
-    simulator = DeadlockDetectionSimulator()
+    simulator = DeadlockDetectionSimulator(tracer=ConsoleTracer())
     
     while True:
         print("\n📝 Menu:")
@@ -535,9 +1487,10 @@ def interactive_mode():
         print("3. Make resource request")
         print("4. Show current state")
         print("5. Run predefined examples")
-        print("6. Exit")
+        print("6. Load system from snapshot file (.json, .csv, .bin)")
+        print("7. Exit")
         
-        choice = input("\nEnter your choice (1-6): ").strip()
+        choice = input("\nEnter your choice (1-7): ").strip()
         
         if choice == '1':
             simulator.initialize_system()
@@ -545,7 +1498,12 @@ def interactive_mode():
             if simulator.num_processes == 0:
                 print("❌ Please initialize the system first!")
             else:
-                simulator.detect_deadlock()
+                is_safe, _ = simulator.detect_deadlock()
+                if not is_safe and input("\nPlan a recovery (fewest victims to terminate)? (y/n): ").strip().lower() == 'y':
+                    plan = simulator.plan_recovery(exact=True)
+                    if input("Apply this plan? (y/n): ").strip().lower() == 'y':
+                        simulator.recover(plan)
+                        simulator.detect_deadlock()
         elif choice == '3':
             if simulator.num_processes == 0:
                 print("❌ Please initialize the system first!")
@@ -573,19 +1531,35 @@ def interactive_mode():
         elif choice == '4':
             if simulator.num_processes == 0:
                 print("❌ System not initialized!")
+            elif simulator.num_processes > 20 or simulator.num_resources > 8:
+                from state_render import browse_state
+                browse_state(simulator)
             else:
                 simulator.print_state()
         elif choice == '5':
             run_predefined_examples()
         elif choice == '6':
+            from snapshot_io import load_snapshot
+            path = input("Enter snapshot path: ").strip()
+            try:
+                simulator = load_snapshot(path, tracer=simulator.tracer)
+                print(f"\n✅ System loaded with {simulator.num_processes} processes and {simulator.num_resources} resource types")
+            except (OSError, ValueError, KeyError) as exc:
+                print(f"❌ Could not load snapshot: {exc}")
+        elif choice == '7':
             print("👋 Exiting simulator. Goodbye!")
             break
         else:
-            print("❌ Invalid choice! Please enter 1-6.")
+            print("❌ Invalid choice! Please enter 1-7.")
 
 
-def main():
-    """Main function"""
+def main(argv=None):
+    """Main function: the interactive menus, or the batch CLI when arguments are given"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from batch_cli import main as batch_main
+        sys.exit(batch_main(argv))
+    
     print("🔐 DEADLOCK DETECTION SIMULATOR")
     print("📚 Implements Banker's Algorithm for Deadlock Detection")
     print("-" * 60)
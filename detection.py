@@ -0,0 +1,446 @@
+"""
+Deadlock Detection Engines
+Author: OS Learning Project
+Description: Detects the exact set of deadlocked processes from outstanding requests,
+             with a Request matrix for multi-instance resources and a wait-for graph
+             for single-instance resources
+"""
+
+from deadlock_simulator import SafetyWorklist
+
+# Detection modes for DeadlockDetectionSimulator.find_deadlocked
+DETECT_AUTO = "auto"        # Wait-for graph when every resource has a single instance
+DETECT_MATRIX = "matrix"
+DETECT_GRAPH = "graph"
+
+
+def detect_deadlocked(available, allocation, request):
+    """
+    Multi-instance deadlock detection (Coffman et al.) on the Request matrix.
+    Processes holding nothing cannot be part of a deadlock and start finished;
+    the rest finish whenever Request[i] <= Work, tracked with per-resource
+    worklists so the whole check is O(n·m·log n).
+    Returns: sorted list of deadlocked process indices
+    """
+    done = [not any(row) for row in allocation]
+    worklist = SafetyWorklist(available, allocation, request, done)
+    worklist.run()
+    return [i for i, finished in enumerate(worklist.finish) if not finished]
+
+
+def is_single_instance(available, allocation):
+    """Returns: True if no resource type has more than one instance in total"""
+    totals = list(available)
+    for row in allocation:
+        for j, value in enumerate(row):
+            if value:
+                totals[j] += value
+    return all(total <= 1 for total in totals)
+
+
+def build_wait_for_graph(allocation, request):
+    """
+    Build the wait-for graph: Pi -> Pj when Pi requests a resource Pj holds.
+    Returns: list of successor lists indexed by process
+    """
+    holders = [[] for _ in range(len(allocation[0]) if len(allocation) else 0)]
+    for i, row in enumerate(allocation):
+        for j, value in enumerate(row):
+            if value > 0:
+                holders[j].append(i)
+
+    graph = []
+    for i, row in enumerate(request):
+        successors = set()
+        for j, value in enumerate(row):
+            if value > 0:
+                successors.update(holders[j])
+        successors.discard(i)
+        graph.append(sorted(successors))
+    return graph
+
+
+def strongly_connected_components(graph):
+    """
+    Tarjan's algorithm without recursion, O(V + E)
+    Returns: list of components, each a list of node indices
+    """
+    num_nodes = len(graph)
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        frames = [(root, 0)]
+
+        while frames:
+            v, k = frames[-1]
+            successors = graph[v]
+            if k < len(successors):
+                frames[-1] = (v, k + 1)
+                w = successors[k]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    frames.append((w, 0))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+    return components
+
+
+def find_cycle(graph, component):
+    """
+    Find a circular wait inside a strongly connected component with a BFS
+    from its lowest node back to itself
+    Returns: list of nodes in wait order, starting at the lowest node
+    """
+    members = set(component)
+    start = min(component)
+    parent = {start: None}
+    queue = [start]
+    for v in queue:
+        for w in graph[v]:
+            if w == start:
+                cycle = [v]
+                while parent[cycle[-1]] is not None:
+                    cycle.append(parent[cycle[-1]])
+                cycle.reverse()
+                return cycle
+            if w in members and w not in parent:
+                parent[w] = v
+                queue.append(w)
+    return []
+
+
+def detect_wait_for_deadlock(allocation, request, available=None):
+    """
+    Single-instance deadlock detection on the wait-for graph.
+    A process is deadlocked when it lies on a cycle or, while holding resources,
+    waits directly or transitively on a process that does - the same set the
+    Request matrix algorithm reports. Like that algorithm, a process holding
+    resources that asks for more of a type than it could ever get (a second
+    instance of one it holds, or one that does not exist) is deadlocked on its
+    own, without a cycle; the wait-for graph itself has no self-loops.
+    available: Available vector; without it, every resource type nobody
+               holds counts as one free instance
+    Returns: (deadlocked, cycles) - sorted process indices and one circular
+             wait for every cyclic strongly connected component
+    """
+    graph = build_wait_for_graph(allocation, request)
+    cyclic = [c for c in strongly_connected_components(graph) if len(c) > 1]
+    cycles = [find_cycle(graph, c) for c in cyclic]
+
+    num_resources = len(request[0]) if len(request) else 0
+    totals = list(available) if available is not None else [0] * num_resources
+    for row in allocation:
+        for j, value in enumerate(row):
+            totals[j] += value
+    if available is None:
+        totals = [max(total, 1) for total in totals]
+    stranded = [i for i, row in enumerate(request) if any(allocation[i]) and
+                any(value > totals[j] - allocation[i][j] for j, value in enumerate(row))]
+
+    waiters = [[] for _ in graph]
+    for i, successors in enumerate(graph):
+        for j in successors:
+            waiters[j].append(i)
+
+    deadlocked = [False] * len(graph)
+    pending = [i for component in cyclic for i in component] + stranded
+    for i in pending:
+        deadlocked[i] = True
+    while pending:
+        j = pending.pop()
+        for i in waiters[j]:
+            if not deadlocked[i] and any(allocation[i]):
+                deadlocked[i] = True
+                pending.append(i)
+
+    return [i for i, flag in enumerate(deadlocked) if flag], sorted(cycles)
+
+
+class IncrementalWaitForGraph:
+    """
+    Resource-allocation graph for single-instance resources, kept up to date
+    one edge at a time: Pi -> Rj while Pi waits for Rj, Rj -> Pi while Pi holds it.
+    A dynamic topological order (Pearce-Kelly) is maintained over the graph's
+    acyclic part, so an insert only searches the nodes between its endpoints
+    in the order. An edge that would close a cycle there is a deadlock: it
+    stays in the graph but is parked outside the order with the cycle it
+    closes, so every cycle of the graph runs through a parked edge. While
+    edges are parked, an insert also searches through them, and removing an
+    edge re-checks only the parked edges whose cycle it broke.
+    """
+
+    def __init__(self, num_processes, num_resources):
+        self.num_processes = num_processes
+        self.num_resources = num_resources
+        size = num_resources + num_processes    # resource nodes first, so processes can be appended
+        self._succ = [set() for _ in range(size)]   # every edge, parked or not
+        self._pred = [set() for _ in range(size)]
+        self._order = list(range(size))   # topological position of every node over unparked edges
+        self._parked = {}                  # (u, v) -> cycle closed by that edge, as nodes
+        self._found = {}                   # (u, v) -> cycle an unparked edge closed through parked ones
+
+    @classmethod
+    def from_simulator(cls, simulator, request=None):
+        """
+        Build the graph from a simulator's Allocation and an optional Request matrix
+        Returns: (graph, cycles) with the cycles found while loading
+        """
+        if not is_single_instance(simulator.available, simulator.allocation):
+            raise ValueError("Wait-for graphs need single-instance resources")
+        graph = cls(simulator.num_processes, simulator.num_resources)
+        cycles = []
+        for i, row in enumerate(simulator.allocation):
+            for j, value in enumerate(row):
+                if value > 0:
+                    graph.grant(i, j)
+        for i, row in enumerate(request or []):
+            for j, value in enumerate(row):
+                if value > 0 and not simulator.allocation[i][j]:
+                    cycle = graph.add_request(i, j)
+                    if cycle:
+                        cycles.append(cycle)
+        return graph, cycles
+
+    def _process(self, process_id):
+        return self.num_resources + process_id
+
+    def _label(self, node):
+        if node < self.num_resources:
+            return f"R{node}"
+        return f"P{node - self.num_resources}"
+
+    def _labels(self, cycle):
+        return [self._label(node) for node in cycle]
+
+    def add_process(self):
+        """
+        Append a process with no edges
+        Returns: its process ID
+        """
+        self._succ.append(set())
+        self._pred.append(set())
+        self._order.append(len(self._order))
+        self.num_processes += 1
+        return self.num_processes - 1
+
+    def add_request(self, process_id, resource_id):
+        """
+        Pi starts waiting for Rj
+        Returns: the new deadlock cycle as P/R labels, or None
+        """
+        return self._insert(self._process(process_id), resource_id)
+
+    def remove_request(self, process_id, resource_id):
+        """Pi stops waiting for Rj"""
+        self._remove(self._process(process_id), resource_id)
+
+    def grant(self, process_id, resource_id):
+        """
+        Rj is assigned to Pi, replacing Pi's request for it
+        Returns: the new deadlock cycle as P/R labels, or None
+        """
+        process = self._process(process_id)
+        self._remove(process, resource_id)
+        return self._insert(resource_id, process)
+
+    def release(self, process_id, resource_id):
+        """Pi gives Rj back"""
+        self._remove(resource_id, self._process(process_id))
+
+    def sync_process(self, process_id, allocation_row, request_row):
+        """
+        Make Pi's edges match its rows: it holds what it is allocated and
+        waits for the rest of what it requests. Edges are removed before any
+        is added, so a cycle that the change breaks is never reported.
+        Returns: the new deadlock cycles as P/R labels
+        """
+        while process_id >= self.num_processes:
+            self.add_process()
+        process = self._process(process_id)
+        holds = self._pred[process]
+        waits = self._succ[process]
+        for j in range(self.num_resources):
+            if j in holds and not allocation_row[j]:
+                self.release(process_id, j)
+            if j in waits and (allocation_row[j] or not request_row[j]):
+                self.remove_request(process_id, j)
+        cycles = []
+        for j in range(self.num_resources):
+            if allocation_row[j]:
+                cycle = self.grant(process_id, j) if j not in holds else None
+            else:
+                cycle = self.add_request(process_id, j) if request_row[j] and j not in waits else None
+            if cycle:
+                cycles.append(cycle)
+        return cycles
+
+    def cycles(self):
+        """
+        Returns: the deadlock cycles found so far that are still intact, at
+                 least one through every edge closing a cycle
+        """
+        return [self._labels(cycle) for cycle in list(self._parked.values()) + list(self._found.values())]
+
+    def deadlocked_processes(self):
+        """
+        Processes on a cycle, i.e. in a strongly connected component with
+        more than one node: O(1) without parked edges, O(V + E) otherwise
+        Returns: sorted process labels
+        """
+        if not self._parked:
+            return []
+        graph = [list(successors) for successors in self._succ]
+        found = [node - self.num_resources for component in strongly_connected_components(graph)
+                 if len(component) > 1 for node in component if node >= self.num_resources]
+        return [f"P{i}" for i in sorted(found)]
+
+    def _insert(self, u, v):
+        if v in self._succ[u]:
+            cycle = self._parked.get((u, v))
+            return self._labels(cycle) if cycle is not None else None
+        self._succ[u].add(v)
+        self._pred[v].add(u)
+        return self._place(u, v)
+
+    def _place(self, u, v):
+        """
+        Fit the edge u -> v into the topological order, or park it
+        Returns: the cycle it closes as P/R labels, or None
+        """
+        cycle = self._reorder(u, v)
+        if cycle is not None:
+            self._parked[(u, v)] = cycle
+            return self._labels(cycle)
+        if self._parked:
+            # The order says nothing about paths through parked edges
+            path = self._path(v, u)
+            if path is not None:
+                self._found[(u, v)] = [u] + path
+                return self._labels(self._found[(u, v)])
+        return None
+
+    def _reorder(self, u, v):
+        """
+        Pearce-Kelly insert of u -> v over the unparked edges
+        Returns: the cycle closed as nodes from u (order unchanged), or None once reordered
+        """
+        order = self._order
+        parked = self._parked
+        lower, upper = order[v], order[u]
+        if upper < lower:
+            return None
+
+        # Forward search from v through the affected region; reaching u closes a cycle
+        parent = {v: None}
+        forward = [v]
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            for w in self._succ[node]:
+                if (node, w) in parked:
+                    continue
+                if w == u:
+                    path = [node]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                    return [u] + path
+                if w not in parent and order[w] < upper:
+                    parent[w] = node
+                    forward.append(w)
+                    stack.append(w)
+
+        # Backward search from u, then reorder the two sets inside their old slots
+        seen = {u}
+        backward = [u]
+        stack = [u]
+        while stack:
+            node = stack.pop()
+            for w in self._pred[node]:
+                if w not in seen and order[w] > lower and (w, node) not in parked:
+                    seen.add(w)
+                    backward.append(w)
+                    stack.append(w)
+
+        backward.sort(key=order.__getitem__)
+        forward.sort(key=order.__getitem__)
+        slots = sorted(order[n] for n in backward + forward)
+        for node, slot in zip(backward + forward, slots):
+            order[node] = slot
+        return None
+
+    def _path(self, source, target):
+        """
+        Breadth-first search over every edge
+        Returns: the nodes from source to the last one before target, or None
+        """
+        parent = {source: None}
+        queue = [source]
+        for node in queue:
+            for w in self._succ[node]:
+                if w == target:
+                    path = [node]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                    return path
+                if w not in parent:
+                    parent[w] = node
+                    queue.append(w)
+        return None
+
+    def _remove(self, u, v):
+        if v not in self._succ[u]:
+            return
+        self._succ[u].discard(v)
+        self._pred[v].discard(u)
+        self._found.pop((u, v), None)
+        self._drop_broken(self._found, u, v)
+        if self._parked.pop((u, v), None) is not None:
+            return      # parked cycles only run through unparked edges, so no other one breaks
+
+        # Only a parked edge whose cycle ran through u -> v may fit the order again
+        for edge in self._drop_broken(self._parked, u, v):
+            self._place(*edge)
+
+    @staticmethod
+    def _drop_broken(cycles, u, v):
+        """
+        Forget the cycles that run through u -> v
+        Returns: the edges they were recorded under
+        """
+        broken = [edge for edge, cycle in cycles.items()
+                  if any(cycle[k] == u and cycle[k + 1 - len(cycle)] == v for k in range(len(cycle)))]
+        for edge in broken:
+            del cycles[edge]
+        return broken
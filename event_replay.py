@@ -0,0 +1,165 @@
+"""
+Event Log Replay
+Author: OS Learning Project
+Description: Streams a JSONL or CSV event log (request, release, arrive, exit)
+             through the simulator and reports grant/deny/deadlock outcomes
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+
+# Event operations
+OP_REQUEST = "request"
+OP_RELEASE = "release"
+OP_ARRIVE = "arrive"    # vector is the new process's maximum need
+OP_EXIT = "exit"        # vector is ignored
+OP_DETECT = "detect"    # emitted by the replayer for periodic deadlock checks
+
+OPERATIONS = (OP_REQUEST, OP_RELEASE, OP_ARRIVE, OP_EXIT)
+
+
+def read_jsonl_events(f):
+    """Yield (op, pid, vector) from lines like {"op": "request", "pid": 3, "vector": [1, 0, 2]}"""
+    for line in f:
+        line = line.strip()
+        if line:
+            event = json.loads(line)
+            yield event["op"], int(event["pid"]), event.get("vector") or []
+
+
+def read_csv_events(f):
+    """Yield (op, pid, vector) from rows of `op,pid,v0,v1,...` (an `op` header row is skipped)"""
+    for row in csv.reader(f):
+        if row and row[0] != "op":
+            yield row[0].strip(), int(row[1]), [int(v) for v in row[2:]]
+
+
+def read_events(path):
+    """Yield the events of a log file one at a time, picking the reader by extension"""
+    reader = read_csv_events if os.path.splitext(path)[1].lower() == ".csv" else read_jsonl_events
+    with open(path, newline="") as f:
+        yield from reader(f)
+
+
+def write_events(events, path):
+    """Write (op, pid, vector) events as JSONL or CSV, chosen by extension"""
+    with open(path, "w", newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            writer = csv.writer(f)
+            for op, pid, vector in events:
+                writer.writerow([op, pid] + list(vector))
+        else:
+            for op, pid, vector in events:
+                f.write(json.dumps({"op": op, "pid": pid, "vector": list(vector)}, separators=(",", ":")) + "\n")
+
+
+def replay_events(simulator, events, detect_every=0):
+    """
+    Apply events to the simulator one at a time.
+    Trace pids are mapped onto simulator rows; the rows of exited processes are
+    reused by later arrivals, so memory follows the number of live processes,
+    not the length of the log. The simulator's initial processes keep their IDs.
+    detect_every: every N events, run exact deadlock detection over the requests
+                  still waiting (the last denied request of each process)
+    Yields: (op, pid, outcome) where outcome is "granted", "unavailable", "unsafe",
+            "exceeds-need", "released", "arrived", "exited", "invalid", or for
+            OP_DETECT events the list of deadlocked trace pids
+    """
+    rows = {pid: pid for pid in range(simulator.num_processes)}
+    pids = dict(rows)           # row -> trace pid
+    free_rows = []
+    waiting = {}                # row -> last denied request
+    zero_row = [0] * simulator.num_resources
+    count = 0
+
+    for op, pid, vector in events:
+        count += 1
+        row = rows.get(pid)
+        if op == OP_ARRIVE:
+            if row is not None or len(vector) != simulator.num_resources:
+                outcome = "invalid"
+            else:
+                row = simulator.add_process(vector, free_rows.pop() if free_rows else None)
+                rows[pid] = row
+                pids[row] = pid
+                outcome = "arrived"
+        elif row is None or (op != OP_EXIT and len(vector) != simulator.num_resources):
+            outcome = "invalid"
+        elif op == OP_REQUEST:
+            problem = simulator._check_request(row, vector)
+            if problem is not None:
+                outcome = problem[0]
+            elif simulator.request_resources(row, vector):
+                outcome = "granted"
+            else:
+                outcome = "unsafe"
+            if outcome == "unavailable" or outcome == "unsafe":
+                waiting[row] = vector
+            elif outcome != "invalid":     # a malformed request leaves the process as it was
+                waiting.pop(row, None)
+        elif op == OP_RELEASE:
+            outcome = "released" if simulator.release_resources(row, vector) else "invalid"
+        elif op == OP_EXIT:
+            simulator.exit_process(row)
+            waiting.pop(row, None)
+            del rows[pid], pids[row]
+            free_rows.append(row)
+            outcome = "exited"
+        else:
+            outcome = "invalid"
+        yield op, pid, outcome
+
+        if detect_every and count % detect_every == 0 and waiting:
+            request = [waiting.get(i, zero_row) for i in range(simulator.num_processes)]
+            deadlocked, _ = simulator.find_deadlocked(request=request, mode="matrix")
+            if deadlocked:
+                yield OP_DETECT, None, [pids[int(label[1:])] for label in deadlocked]
+
+
+def replay_log(simulator, path, detect_every=0):
+    """
+    Replay a whole log file, keeping only counters in memory
+    Returns: dict with outcome counts, events, deadlock checks that found a
+             deadlock, seconds and events_per_second
+    """
+    counts = {}
+    events = 0
+    deadlocks = 0
+    start = time.perf_counter()
+    for op, _, outcome in replay_events(simulator, read_events(path), detect_every):
+        if op == OP_DETECT:
+            deadlocks += 1
+            continue
+        events += 1
+        counts[outcome] = counts.get(outcome, 0) + 1
+    seconds = time.perf_counter() - start
+    return {
+        "events": events,
+        "outcomes": counts,
+        "deadlocks": deadlocks,
+        "seconds": seconds,
+        "events_per_second": events / seconds if seconds > 0 else 0.0,
+    }
+
+
+def print_summary(summary):
+    """Print a replay summary"""
+    print(f"\n📜 Replayed {summary['events']} events in {summary['seconds']:.2f}s "
+          f"({summary['events_per_second']:,.0f} events/s)")
+    for outcome, number in sorted(summary["outcomes"].items()):
+        print(f"   {outcome:<13} {number}")
+    if summary["deadlocks"]:
+        print(f"⚠️  Deadlock found by {summary['deadlocks']} periodic checks")
+
+
+if __name__ == "__main__":
+    from snapshot_io import load_snapshot
+
+    if len(sys.argv) < 3:
+        print("Usage: python event_replay.py SNAPSHOT EVENT_LOG [DETECT_EVERY]")
+        sys.exit(2)
+    print_summary(replay_log(load_snapshot(sys.argv[1]), sys.argv[2],
+                             int(sys.argv[3]) if len(sys.argv) > 3 else 0))
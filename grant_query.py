@@ -0,0 +1,266 @@
+"""
+Maximum Grantable Request Query
+Author: OS Learning Project
+Description: Read-only answer to "how much of each resource can Pi get right
+             now without going unsafe?", by monotonic bisection over the state
+"""
+
+import heapq
+import operator
+import time
+from bisect import bisect_right
+
+from deadlock_simulator import SafetyTracer, SafetyWorklist
+
+# Worklist copies kept along the way to Pi: a copy costs O(n) list copying in
+# C, a finished process re-run from an older copy costs O(m) plus every need
+# it crosses in Python
+MAX_CHECKPOINTS = 256
+
+
+class GrantWorklist(SafetyWorklist):
+    """SafetyWorklist whose Work can also be lowered, one resource at a time"""
+
+    def lower_work(self, j, amount, column):
+        """
+        Subtract amount from Work[j] and block the processes that stop fitting
+        column: (need, pid) of every process for Rj, sorted
+        """
+        work = self.work[j]
+        sentinel = len(self.need)
+        lowered = column[bisect_right(column, (work - amount, sentinel)):bisect_right(column, (work, sentinel))]
+        blocked = self.blocked
+        finish = self.finish
+        for _, i in lowered:
+            if not finish[i]:
+                blocked[i] += 1
+        self.work[j] = work - amount
+        self._waiting[j] = lowered + self._waiting[j][self._cursor[j]:]
+        self._cursor[j] = 0
+        self._ready = [i for i in self._ready if not blocked[i]]
+        heapq.heapify(self._ready)
+
+    def copy(self):
+        clone = super().copy()
+        clone._waiting = list(self._waiting)    # lower_work replaces entries
+        return clone
+
+
+class _Checkpoints(SafetyTracer):
+    """Copies a worklist every `interval` finished processes while it runs"""
+
+    def __init__(self, worklist, interval):
+        self.worklist = worklist
+        self.interval = interval
+        self.finished = 0
+        self.copies = {0: worklist.copy()}
+
+    def process_finished(self, pid, work):
+        self.finished += 1
+        if self.finished % self.interval == 0:
+            self.copies[self.finished] = self.worklist.copy()
+
+
+class GrantSearch:
+    """
+    Bisection over grants to one process, sharing work between probes.
+
+    - Monotonicity: if granting x is unsafe, so is any larger grant, and if x
+      is safe, so is anything smaller (a smaller grant is a larger one plus a
+      release). So every resource can be bisected on its own.
+    - Only the way to Pi matters: a grant lowers Work until Pi finishes and
+      changes nothing afterwards, since Pi hands it back. So in a safe state a
+      grant is safe exactly when Pi can still be reached, and Pi's own test
+      Need_i - x <= Work - x does not depend on x. A probe runs the other
+      processes only until Work covers Pi's need.
+    - Shared timeline: the way to Pi with nothing granted is run once, keeping
+      up to MAX_CHECKPOINTS copies of the worklist along it. A grant leaves that run
+      valid up to the first process it no longer fits, so a probe resumes
+      from the last copy before it, with Work lowered only in the granted
+      resources.
+    - Witness jumps: the processes a successful probe finished before Pi also
+      reach Pi under any grant up to their slack, min over that prefix of
+      Work - Need. The lower bound jumps straight to it.
+    """
+
+    def __init__(self, available, allocation, need, process_id, prefix):
+        self.available = available
+        self.allocation = allocation
+        self.need = need
+        self.process_id = process_id
+        self.granted = [0] * len(available)     # grants already fixed (frontier search)
+        self.prefix = prefix                    # witness for the current `granted`
+        self.probes = 0
+        self._timeline = None
+        self._checkpoints = None
+        self._interval = max(1, len(need) // MAX_CHECKPOINTS)
+        self._columns = {}
+
+    def _column(self, j):
+        column = self._columns.get(j)
+        if column is None:
+            pid = self.process_id
+            column = self._columns[j] = sorted((row[j], k) for k, row in enumerate(self.need) if k != pid)
+        return column
+
+    def _run_timeline(self):
+        done = [False] * len(self.need)
+        done[self.process_id] = True
+        worklist = GrantWorklist(self.available, self.allocation, self.need, done)
+        recorder = _Checkpoints(worklist, self._interval)
+        self._timeline = worklist.run(recorder, target=self.need[self.process_id])
+        self._checkpoints = recorder.copies
+
+    def _diverges(self, grant):
+        """Returns: position of the first timeline process that `grant` no longer fits"""
+        resources = [j for j, amount in enumerate(grant) if amount]
+        work = [self.available[j] - grant[j] for j in resources]
+        need = self.need
+        allocation = self.allocation
+        for position, k in enumerate(self._timeline):
+            need_row = need[k]
+            alloc_row = allocation[k]
+            for r, j in enumerate(resources):
+                if need_row[j] > work[r]:
+                    return position
+                work[r] += alloc_row[j]
+        return len(self._timeline)
+
+    def slack(self, prefix, j):
+        """Largest extra grant of Rj on top of `granted` that the witness `prefix` certifies"""
+        work = self.available[j] - self.granted[j]
+        slack = work
+        need = self.need
+        allocation = self.allocation
+        for k in prefix:
+            margin = work - need[k][j]
+            if margin < slack:
+                slack = margin
+            work += allocation[k][j]
+        return slack
+
+    def slacks(self, prefix, resources):
+        """
+        slack() for several resources at once
+        Returns: list of slacks, in the order of `resources`
+        """
+        if len(resources) < 2:
+            return [self.slack(prefix, j) for j in resources]
+        pick = operator.itemgetter(*resources)
+        work = list(map(operator.sub, pick(self.available), pick(self.granted)))
+        slack = list(work)
+        for k in prefix:
+            slack = list(map(min, slack, map(operator.sub, work, pick(self.need[k]))))
+            work = list(map(operator.add, work, pick(self.allocation[k])))
+        return slack
+
+    def probe(self, extra):
+        """
+        Check granting `granted + extra` to Pi
+        Returns: (is_safe, the processes finished before Pi, or None)
+        """
+        self.probes += 1
+        if self._timeline is None:
+            self._run_timeline()
+        grant = list(map(operator.add, self.granted, extra))
+        position = self._diverges(grant)
+        if position == len(self._timeline):
+            return True, self._timeline
+        start = position - position % self._interval
+        worklist = self._checkpoints[start].copy()
+        for j, amount in enumerate(grant):
+            if amount:
+                worklist.lower_work(j, amount, self._column(j))
+        target = list(map(operator.sub, self.need[self.process_id], grant))
+        prefix = worklist.run(target=target)
+        if not worklist.covers(target):
+            return False, None
+        return True, self._timeline[:start] + prefix
+
+    def maximize(self, j, limit, slack=None):
+        """
+        Largest amount of Rj grantable on top of `granted`: galloping up from
+        the witness's slack (1, 2, 4, ... more), then bisection, so a tight
+        resource costs O(log answer) probes rather than O(log limit)
+        slack: slack of the current witness in Rj, when already known
+        Returns: (amount, witness prefix certifying it)
+        """
+        witness = self.prefix
+        if slack is None:
+            slack = self.slack(witness, j)
+        low = min(limit, slack)
+        high = limit
+        step = 1
+        extra = [0] * len(self.available)
+        while low < high:
+            middle = min(low + step, high) if step else (low + high + 1) // 2
+            extra[j] = middle
+            is_safe, prefix = self.probe(extra)
+            if is_safe:
+                witness = prefix
+                low = max(middle, min(high, self.slack(prefix, j)))
+                if step:
+                    step *= 2
+            else:
+                high = middle - 1
+                step = 0
+        return low, witness
+
+
+def max_grantable(simulator, process_id, frontier=True):
+    """
+    Read-only query of what a process can be granted right now.
+    max_per_resource[j] is the most of Rj alone that keeps the state safe.
+    frontier is one maximal safe request: resources are raised in order, each
+    as far as it goes given the earlier ones, so no single value can grow.
+    box_safe tells whether max_per_resource itself is safe, in which case it is
+    the only maximal request.
+    Returns: dict with limits (min of Need and Available), max_per_resource,
+             frontier, box_safe, safe_state, probes and seconds
+    """
+    start = time.perf_counter()
+    available, allocation, need = simulator.available, simulator.allocation, simulator.need
+    limits = [min(n, a) for n, a in zip(need[process_id], available)]
+    zeros = [0] * simulator.num_resources
+
+    is_safe, order = simulator._verify_safe(available, allocation, need, key=simulator._state_key())
+    if not is_safe:
+        # Granting more never turns an unsafe state safe
+        return {"process": f"P{process_id}", "limits": limits, "max_per_resource": zeros,
+                "frontier": zeros if frontier else None, "box_safe": False, "safe_state": False,
+                "probes": 0, "seconds": time.perf_counter() - start}
+
+    order = list(order)
+    prefix = order[:order.index(process_id)]
+    search = GrantSearch(available, allocation, need, process_id, prefix)
+    # Resources Pi may not get at all need no search. While every maximum stays
+    # within the base witness's slack, that witness certifies them all together.
+    resources = [j for j, limit in enumerate(limits) if limit]
+    per_resource = list(zeros)
+    box_safe = True
+    for j, slack in zip(resources, search.slacks(prefix, resources)):
+        per_resource[j] = search.maximize(j, limits[j], slack)[0]
+        if per_resource[j] > slack:
+            box_safe = False
+    box_safe = box_safe or search.probe(per_resource)[0]
+    result_frontier = None
+    if frontier:
+        if box_safe:
+            result_frontier = list(per_resource)
+        else:
+            # Raise one resource at a time on top of the ones already fixed
+            for j in resources:
+                amount, search.prefix = search.maximize(j, per_resource[j])
+                search.granted[j] = amount
+            result_frontier = list(search.granted)
+
+    return {
+        "process": f"P{process_id}",
+        "limits": limits,
+        "max_per_resource": per_resource,
+        "frontier": result_frontier,
+        "box_safe": box_safe,
+        "safe_state": True,
+        "probes": search.probes,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,387 @@
+"""
+Crash-Safe Journal
+Author: OS Learning Project
+Description: Appends every committed grant, release, arrival and exit to a
+             compact binary journal with batched fsync, takes periodic binary
+             checkpoints that let old journals be dropped, and rebuilds the
+             state after a restart from the latest checkpoint plus its journal
+"""
+
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+# Journal file: header, then records of
+#   op (u8), pid (u32), count (u32), count x (resource, amount) int32 pairs, crc32 (u32)
+# little-endian, the CRC covering everything before it in the record. Only the
+# nonzero entries of a vector are written.
+JOURNAL_MAGIC = b"DLJRNL01"
+JOURNAL_HEADER = struct.Struct("<8sI")     # magic, number of resource types
+RECORD_HEADER = struct.Struct("<BII")
+RECORD_CRC = struct.Struct("<I")
+
+# Record operations
+OP_GRANT = 1
+OP_RELEASE = 2
+OP_ARRIVE = 3       # pairs are the new process's maximum need
+OP_EXIT = 4         # pairs are what the process still held
+
+# Generation g is checkpoint-g (the state before any record of journal-g) plus journal-g
+CHECKPOINT_NAME = "checkpoint-{:08d}.dls"
+JOURNAL_NAME = "journal-{:08d}.log"
+_GENERATION = re.compile(r"^(checkpoint|journal)-(\d{8})\.(dls|log)$")
+
+SYNC_EVERY = 256            # records per fsync at most
+SYNC_INTERVAL = 0.05        # seconds a record may wait for its fsync at most
+CHECKPOINT_EVERY = 100_000  # records between automatic checkpoints
+
+
+def _pairs(vector):
+    """Returns: array('i') of resource, amount for every nonzero amount"""
+    data = array("i")
+    for j, amount in enumerate(vector):
+        if amount:
+            data.append(j)
+            data.append(amount)
+    return data
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory):
+    """Make renames, creations and deletions in the directory durable (POSIX only)"""
+    if hasattr(os, "O_DIRECTORY"):
+        _fsync_path(directory)
+
+
+class Journal:
+    """
+    Append-only record of a simulator's committed state changes.
+
+    Records are buffered and written with one fsync per batch, so a change
+    is durable once sync() has run after it. A batch is synced when it
+    reaches sync_every records, and a timer thread syncs it sync_interval
+    seconds after its first record even if nothing else is appended, so a
+    crash loses at most the last sync_interval seconds of changes (plus the
+    fsync in progress), never a record half-way: every record carries a CRC
+    and a torn tail is cut off on restore. Call close() before exiting.
+    Tentative grants are recorded when they are committed, and rolled back
+    ones never. Every checkpoint_every records, once no tentative grant is
+    outstanding, the state is written as a binary snapshot and the journal
+    starts over, so a restart replays at most that many records.
+    """
+
+    def __init__(self, simulator, directory, sync_every=SYNC_EVERY, sync_interval=SYNC_INTERVAL,
+                 checkpoint_every=CHECKPOINT_EVERY):
+        self.simulator = simulator
+        self.directory = directory
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.checkpoint_every = checkpoint_every
+        self.records = 0        # records in the current journal
+        self.syncs = 0
+        self.checkpoints = 0
+        self.recovery = None    # what restore() did, when the journal came from it
+        self._file = None
+        self._pending = bytearray()
+        self._unsynced = 0
+        self._timer = None      # pending timed sync of the current batch
+        self._lock = threading.RLock()      # the timer thread syncs too
+        os.makedirs(directory, exist_ok=True)
+        generations = _generations(directory)
+        self.generation = generations[-1][0] if generations else 0     # the next checkpoint supersedes it
+
+    def _path(self, name, generation):
+        return os.path.join(self.directory, name.format(generation))
+
+    # Simulator hooks
+    def granted(self, entries):
+        """Committed tentative grants: (process_id, request) pairs, oldest first"""
+        for process_id, request in entries:
+            self._append(OP_GRANT, process_id, request)
+        self._maybe_checkpoint()
+
+    def released(self, process_id, release):
+        self._append(OP_RELEASE, process_id, release)
+        self._maybe_checkpoint()
+
+    def process_added(self, process_id, max_need):
+        self._append(OP_ARRIVE, process_id, max_need)
+        self._maybe_checkpoint()
+
+    def process_exited(self, process_id, released):
+        self._append(OP_EXIT, process_id, released)
+        self._maybe_checkpoint()
+
+    def _append(self, op, process_id, vector):
+        payload = _pairs(vector)
+        if sys.byteorder != "little":
+            payload.byteswap()
+        record = RECORD_HEADER.pack(op, process_id, len(payload) // 2) + payload.tobytes()
+        with self._lock:
+            self._pending += record
+            self._pending += RECORD_CRC.pack(zlib.crc32(record))
+            self.records += 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.sync_interval, self._timed_sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_sync(self):
+        with self._lock:
+            self._timer = None
+            if self._unsynced:
+                self.sync()
+
+    def _maybe_checkpoint(self):
+        # A checkpoint must not contain grants that may still be rolled back
+        if self.records >= self.checkpoint_every and not self.simulator._undo_log:
+            self.checkpoint()
+
+    # Durability
+    def sync(self):
+        """Write the buffered records and fsync the journal"""
+        with self._lock:
+            if self._file is None:
+                return
+            if self._pending:
+                self._file.write(self._pending)
+                self._pending.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.syncs += 1
+            self._unsynced = 0
+
+    def checkpoint(self):
+        """
+        Save the state as checkpoint g+1, start journal g+1 and delete
+        generation g. The checkpoint is renamed into place only once it is
+        fully on disk, so a crash at any point leaves one complete generation.
+        """
+        from snapshot_io import save_binary
+
+        if self.simulator._undo_log:
+            raise ValueError("Cannot checkpoint while tentative grants are uncommitted!")
+        with self._lock:
+            self.sync()
+            generation = self.generation + 1
+            path = self._path(CHECKPOINT_NAME, generation)
+            save_binary(self.simulator, path + ".tmp")
+            _fsync_path(path + ".tmp")
+            os.replace(path + ".tmp", path)
+            journal = open(self._path(JOURNAL_NAME, generation), "wb")
+            journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.simulator.num_resources))
+            journal.flush()
+            os.fsync(journal.fileno())
+            _fsync_directory(self.directory)
+
+            if self._file is not None:
+                self._file.close()
+            self._file = journal
+            self.generation = generation
+            self.records = 0
+            self.checkpoints += 1
+        for old, _ in _generations(self.directory):
+            if old < generation:
+                for name in (CHECKPOINT_NAME, JOURNAL_NAME):
+                    try:
+                        os.remove(self._path(name, old))
+                    except FileNotFoundError:
+                        pass
+
+    def _resume(self, generation, valid_bytes):
+        """Keep appending to journal `generation`, cutting off anything after valid_bytes"""
+        path = self._path(JOURNAL_NAME, generation)
+        self._file = open(path, "ab")
+        if valid_bytes < JOURNAL_HEADER.size:
+            valid_bytes = 0
+        if self._file.tell() != valid_bytes:
+            self._file.truncate(valid_bytes)
+            self._file.seek(valid_bytes)
+        if valid_bytes == 0:
+            self._file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.simulator.num_resources))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.generation = generation
+
+    def stats(self):
+        """Returns: dict with generation, records, pending (not yet synced), syncs and checkpoints"""
+        return {
+            "generation": self.generation,
+            "records": self.records,
+            "pending": self._unsynced,
+            "syncs": self.syncs,
+            "checkpoints": self.checkpoints,
+        }
+
+    def close(self):
+        """Sync and close the journal file"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+
+def _generations(directory):
+    """Returns: sorted (generation, set of kinds present) for the files in directory"""
+    found = {}
+    for name in os.listdir(directory):
+        match = _GENERATION.match(name)
+        if match:
+            found.setdefault(int(match.group(2)), set()).add(match.group(1))
+    return sorted(found.items())
+
+
+def load_checkpoint(path, tracer=None):
+    """Load a checkpoint into an ordinary list-backed simulator (arrivals need appendable rows)"""
+    from snapshot_io import _build, load_binary
+
+    state = load_binary(path, validate=False)
+    return _build(list(state.available), state.max_need.tolist(), state.allocation.tolist(), tracer)
+
+
+def replay_journal(simulator, path):
+    """
+    Apply a journal's records to the simulator, straight to the matrices: each
+    record was committed, so nothing is checked again
+    Returns: (records applied, bytes up to the end of the last whole record)
+    Raises: ValueError if a whole record does not fit the state
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < JOURNAL_HEADER.size:
+        return 0, 0
+    magic, num_resources = JOURNAL_HEADER.unpack_from(data)
+    if magic != JOURNAL_MAGIC or num_resources != simulator.num_resources:
+        raise ValueError(f"{path} is not a journal of this system")
+
+    view = memoryview(data)
+    available = simulator.available
+    position = JOURNAL_HEADER.size
+    applied = 0
+    while position + RECORD_HEADER.size <= len(data):
+        op, process_id, count = RECORD_HEADER.unpack_from(data, position)
+        end = position + RECORD_HEADER.size + 8 * count
+        if end + RECORD_CRC.size > len(data) or zlib.crc32(view[position:end]) != RECORD_CRC.unpack_from(data, end)[0]:
+            break       # torn or damaged tail: the records before it are the journal
+        payload = array("i")
+        payload.frombytes(view[position + RECORD_HEADER.size:end])
+        if sys.byteorder != "little":
+            payload.byteswap()
+        pairs = iter(payload)
+
+        if op == OP_ARRIVE and process_id <= simulator.num_processes:
+            max_need = [0] * simulator.num_resources
+            for j, amount in zip(pairs, pairs):
+                max_need[j] = amount
+            simulator.add_process(max_need, process_id if process_id < simulator.num_processes else None)
+        elif op in (OP_GRANT, OP_RELEASE, OP_EXIT) and process_id < simulator.num_processes:
+            sign = 1 if op == OP_GRANT else -1
+            allocation, need = simulator.allocation[process_id], simulator.need[process_id]
+            for j, amount in zip(pairs, pairs):
+                amount *= sign
+                available[j] -= amount
+                allocation[j] += amount
+                need[j] -= amount
+            if op == OP_EXIT:
+                simulator.exit_process(process_id)
+        else:
+            raise ValueError(f"{path}: record {applied + 1} does not fit the state (op {op}, P{process_id})")
+        position = end + RECORD_CRC.size
+        applied += 1
+    return applied, position
+
+
+def restore(directory, tracer=None, engine="scan", **options):
+    """
+    Rebuild a simulator after a restart: load the latest checkpoint, replay
+    its journal, cut off a torn tail and keep journaling where it left off.
+    options: Journal settings (sync_every, sync_interval, checkpoint_every)
+    Returns: the simulator; simulator.journal.recovery has generation,
+             replayed, discarded_bytes and seconds
+    Raises: FileNotFoundError when the directory holds no checkpoint
+    """
+    start = time.perf_counter()
+    generations = [g for g, kinds in _generations(directory) if "checkpoint" in kinds]
+    if not generations:
+        raise FileNotFoundError(f"No checkpoint in {directory}")
+    generation = generations[-1]
+    simulator = load_checkpoint(os.path.join(directory, CHECKPOINT_NAME.format(generation)), tracer)
+    simulator.engine = engine
+
+    path = os.path.join(directory, JOURNAL_NAME.format(generation))
+    replayed, valid_bytes = replay_journal(simulator, path) if os.path.exists(path) else (0, 0)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    journal = Journal(simulator, directory, **options)
+    journal._resume(generation, valid_bytes)
+    journal.records = replayed
+    journal.recovery = {
+        "generation": generation,
+        "replayed": replayed,
+        "discarded_bytes": max(0, size - valid_bytes),
+        "seconds": time.perf_counter() - start,
+    }
+    simulator.journal = journal
+    return simulator
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    from deadlock_simulator import DeadlockDetectionSimulator, random_system
+
+    rng = random.Random(0)
+    num_processes, num_resources, operations = 200, 20, 200_000
+    simulator = DeadlockDetectionSimulator(engine="worklist")
+    simulator.num_processes, simulator.num_resources = num_processes, num_resources
+    simulator.available, simulator.max_need, simulator.allocation = random_system(
+        rng, num_processes, num_resources)
+    simulator.calculate_need()
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = simulator.enable_journal(directory)
+        start = time.perf_counter()
+        for _ in range(operations):
+            pid = rng.randrange(num_processes)
+            j = rng.randrange(num_resources)
+            if rng.random() < 0.5 and simulator.need[pid][j] and simulator.available[j]:
+                request = [0] * num_resources
+                request[j] = 1
+                simulator.request_resources(pid, request)
+            elif simulator.allocation[pid][j]:
+                release = [0] * num_resources
+                release[j] = 1
+                simulator.release_resources(pid, release)
+        journal.sync()
+        seconds = time.perf_counter() - start
+        print(f"{operations} operations in {seconds:.1f}s: {journal.checkpoints} checkpoints, "
+              f"{journal.syncs} syncs")
+
+        restored = restore(directory)
+        recovery = restored.journal.recovery
+        same = (restored.available == list(simulator.available) and restored.allocation == simulator.allocation
+                and restored.need == simulator.need)
+        print(f"Restored generation {recovery['generation']} + {recovery['replayed']} records "
+              f"in {recovery['seconds']:.2f}s (state {'matches' if same else 'DIFFERS'})")
+        restored.disable_journal()
+        simulator.disable_journal()
@@ -0,0 +1,241 @@
+"""
+Metrics for the Safety and Request Paths
+Author: OS Learning Project
+Description: A tracer that counts and times what the simulator does, exported
+             as Prometheus text or JSON, with an optional cProfile hook
+"""
+
+import cProfile
+import io
+import json
+import pstats
+from bisect import bisect_left
+from time import perf_counter
+
+from deadlock_simulator import SafetyTracer
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style (le = upper bound)"""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)     # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf if beyond the last bound)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, number in zip(self.bounds + (float("inf"),), self.counts):
+            seen += number
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(bound): number for bound, number in zip(self.bounds + ("+Inf",), self.counts)},
+        }
+
+
+class MetricsTracer(SafetyTracer):
+    """
+    Counters and latency histograms fed by the tracer hooks.
+    Every hook is a counter bump or a perf_counter() call, cheap enough to
+    leave on; to switch metrics off, set the simulator's tracer back to None
+    and the hot paths skip every hook. Checks answered by the verdict cache
+    count as checks but carry no latency sample.
+    Bulk engines (numpy) report a whole round at once, so they never build
+    per-process lists for it.
+    profile: run cProfile around every detect_deadlock call (see profile_report)
+    """
+
+    counts_only = True
+
+    def __init__(self, profile=False):
+        self.profiler = cProfile.Profile() if profile else None
+        self.reset()
+
+    def reset(self):
+        """Zero every counter and histogram (the profile is kept)"""
+        self.safety_checks = 0
+        self.unsafe_checks = 0
+        self.iterations = 0         # scan passes over the processes
+        self.comparisons = 0        # Need <= Work row checks reported by the engine
+        self.warm_replays = 0
+        self.detections = 0
+        self.deadlocks_found = 0
+        self.requests_granted = 0
+        self.requests_denied = {}   # reason -> count; "unsafe" for failed safety checks
+        self.releases = 0
+        self.copy_bytes = 0
+        self.safety_seconds = Histogram()
+        self.request_seconds = Histogram()
+        self.detection_seconds = Histogram()
+        self._safety_start = None
+        self._request_start = None
+        self._detection_start = None
+
+    # Tracer hooks
+    def detection_started(self, simulator):
+        if self.profiler is not None:
+            self.profiler.enable()
+        self._detection_start = perf_counter()
+
+    def detection_failed(self, error):
+        self._detection_start = None
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def safety_started(self):
+        self._safety_start = perf_counter()
+
+    def iteration(self, number, work, finish):
+        self.iterations += 1
+
+    def process_ready(self, pid, need, work):
+        self.comparisons += 1
+
+    def process_waiting(self, pid, need, work):
+        self.comparisons += 1
+
+    def rows_checked(self, number, ready, waiting):
+        self.iterations += 1
+        self.comparisons += ready + waiting
+
+    def safety_finished(self, is_safe, sequence):
+        if self._safety_start is not None:
+            self.safety_seconds.observe(perf_counter() - self._safety_start)
+            self._safety_start = None
+        self.safety_checks += 1
+        if not is_safe:
+            self.unsafe_checks += 1
+
+    def safety_replayed(self, sequence):
+        self.warm_replays += 1
+        self.safety_checks += 1
+
+    def detection_finished(self, is_safe, sequence):
+        if self._detection_start is not None:
+            self.detection_seconds.observe(perf_counter() - self._detection_start)
+            self._detection_start = None
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.detections += 1
+        if not is_safe:
+            self.deadlocks_found += 1
+
+    def request_started(self, pid, request):
+        self._request_start = perf_counter()
+
+    def request_rejected(self, pid, message, reason=None):
+        reason = reason or "invalid"
+        self.requests_denied[reason] = self.requests_denied.get(reason, 0) + 1
+        self._finish_request()
+
+    def request_finished(self, pid, granted):
+        if granted:
+            self.requests_granted += 1
+        else:
+            self.requests_denied["unsafe"] = self.requests_denied.get("unsafe", 0) + 1
+        self._finish_request()
+
+    def resources_released(self, pid, release):
+        self.releases += 1
+
+    def state_copied(self, nbytes):
+        self.copy_bytes += nbytes
+
+    def _finish_request(self):
+        if self._request_start is not None:
+            self.request_seconds.observe(perf_counter() - self._request_start)
+            self._request_start = None
+
+    # Export
+    def snapshot(self):
+        """Returns: every metric as a JSON-ready dict"""
+        return {
+            "safety_checks": self.safety_checks,
+            "unsafe_checks": self.unsafe_checks,
+            "iterations": self.iterations,
+            "comparisons": self.comparisons,
+            "warm_replays": self.warm_replays,
+            "detections": self.detections,
+            "deadlocks_found": self.deadlocks_found,
+            "requests_granted": self.requests_granted,
+            "requests_denied": dict(self.requests_denied),
+            "releases": self.releases,
+            "copy_bytes": self.copy_bytes,
+            "safety_seconds": self.safety_seconds.snapshot(),
+            "request_seconds": self.request_seconds.snapshot(),
+            "detection_seconds": self.detection_seconds.snapshot(),
+        }
+
+    def to_json(self, indent=None):
+        """Returns: the snapshot as a JSON string"""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix="deadlock_"):
+        """Returns: the metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def counter(name, help_text, value):
+            lines.append(f"# HELP {prefix}{name} {help_text}")
+            lines.append(f"# TYPE {prefix}{name} counter")
+            lines.append(f"{prefix}{name} {value}")
+
+        def labelled_counter(name, help_text, label, values):
+            lines.append(f"# HELP {prefix}{name} {help_text}")
+            lines.append(f"# TYPE {prefix}{name} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f'{prefix}{name}{{{label}="{key}"}} {value}')
+
+        def histogram(name, help_text, hist):
+            lines.append(f"# HELP {prefix}{name} {help_text}")
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            cumulative = 0
+            for bound, number in zip(hist.bounds + ("+Inf",), hist.counts):
+                cumulative += number
+                lines.append(f'{prefix}{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}{name}_sum {hist.sum}")
+            lines.append(f"{prefix}{name}_count {hist.count}")
+
+        counter("safety_checks_total", "Safety checks run or answered from cache", self.safety_checks)
+        counter("unsafe_checks_total", "Safety checks that found an unsafe state", self.unsafe_checks)
+        counter("safety_iterations_total", "Scan passes over the processes", self.iterations)
+        counter("safety_comparisons_total", "Need <= Work row checks", self.comparisons)
+        counter("warm_replays_total", "Checks settled by replaying the cached safe sequence", self.warm_replays)
+        counter("detections_total", "detect_deadlock calls", self.detections)
+        counter("deadlocks_found_total", "detect_deadlock calls that found an unsafe state", self.deadlocks_found)
+        counter("requests_granted_total", "Granted resource requests", self.requests_granted)
+        labelled_counter("requests_denied_total", "Denied resource requests by reason", "reason",
+                         self.requests_denied)
+        counter("releases_total", "Resource releases", self.releases)
+        counter("copy_bytes_total", "Bytes of state copied for tentative checks", self.copy_bytes)
+        histogram("safety_check_seconds", "Safety check latency", self.safety_seconds)
+        histogram("request_seconds", "request_resources latency", self.request_seconds)
+        histogram("detection_seconds", "detect_deadlock latency", self.detection_seconds)
+        return "\n".join(lines) + "\n"
+
+    def profile_report(self, limit=20, sort="cumulative"):
+        """Returns: the cProfile statistics gathered around detect_deadlock, as text"""
+        if self.profiler is None:
+            return "Profiling is off (create the tracer with profile=True)"
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
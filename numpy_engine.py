@@ -0,0 +1,137 @@
+"""
+NumPy Banker's Engine
+Author: OS Learning Project
+Description: Vectorized state and safety check for large process x resource matrices
+"""
+
+import numpy as np
+
+from deadlock_simulator import DeadlockDetectionSimulator
+
+
+def numpy_safety(available, allocation, need, tracer=None):
+    """
+    Banker's Safety Algorithm with one broadcast Need <= Work test per round.
+    Every process that fits in Work during a round is released together, which
+    is valid because Work only grows while processes finish.
+    Returns: (is_safe, safe_sequence) with the sequence as process indices
+    """
+    work = np.array(available, dtype=np.int64)
+    allocation = np.asarray(allocation)
+    need = np.asarray(need)
+
+    if tracer is not None:
+        tracer.safety_started()
+    # Counting tracers get one rows_checked per round, with no per-process lists
+    detailed = tracer is not None and not tracer.counts_only
+
+    remaining = np.arange(len(need))
+    pending_need = need
+    safe_sequence = []
+    iteration = 1
+    while len(remaining):
+        if detailed:
+            finish = np.ones(len(need), dtype=bool)
+            finish[remaining] = False
+            tracer.iteration(iteration, work.tolist(), finish.tolist())
+
+        runnable = (pending_need <= work).all(axis=1)
+        ready = int(np.count_nonzero(runnable))
+        if tracer is not None and not detailed:
+            tracer.rows_checked(iteration, ready, len(remaining) - ready)
+        if not ready:
+            if tracer is not None:
+                tracer.safety_finished(False, [])
+            return False, []
+
+        released = remaining[runnable]
+        if detailed:
+            for i in released.tolist():
+                tracer.process_ready(i, need[i].tolist(), work.tolist())
+                work += allocation[i]
+                tracer.process_finished(i, work.tolist())
+        else:
+            work += allocation[released].sum(axis=0)
+        safe_sequence.extend(released.tolist())
+
+        remaining = remaining[~runnable]
+        pending_need = pending_need[~runnable]
+        iteration += 1
+
+    if tracer is not None:
+        tracer.safety_finished(True, safe_sequence)
+    return True, safe_sequence
+
+
+class NumpyBankersState:
+    """System state held as NumPy arrays instead of lists of lists"""
+
+    def __init__(self, available, max_need, allocation):
+        self.available = np.array(available, dtype=np.int64)
+        self.max_need = np.array(max_need, dtype=np.int64)
+        self.allocation = np.array(allocation, dtype=np.int64)
+
+        if self.max_need.ndim != 2 or self.max_need.shape != self.allocation.shape:
+            raise ValueError("Max and Allocation must be matrices of the same shape")
+        if self.available.shape != (self.max_need.shape[1],):
+            raise ValueError(f"Need exactly {self.max_need.shape[1]} available values")
+        if (self.allocation < 0).any() or (self.available < 0).any():
+            raise ValueError("Values cannot be negative!")
+        if (self.allocation > self.max_need).any():
+            raise ValueError("Allocation cannot exceed maximum need!")
+
+        self.calculate_need()
+
+    @classmethod
+    def from_simulator(cls, simulator):
+        """Build a NumPy state from a DeadlockDetectionSimulator"""
+        return cls(simulator.available, simulator.max_need, simulator.allocation)
+
+    @property
+    def num_processes(self):
+        return self.max_need.shape[0]
+
+    @property
+    def num_resources(self):
+        return self.max_need.shape[1]
+
+    def calculate_need(self):
+        """Calculate the Need matrix: Need = Max - Allocation"""
+        self.need = self.max_need - self.allocation
+
+    def safety_algorithm(self, tracer=None):
+        """
+        Run the vectorized safety check on this state
+        Returns: (is_safe, safe_sequence)
+        """
+        return numpy_safety(self.available, self.allocation, self.need, tracer)
+
+    def request_resources(self, process_id, request):
+        """
+        Grant a request if it keeps the system safe
+        Returns: True if the request was granted
+        """
+        request = np.asarray(request, dtype=np.int64)
+        if (request > self.need[process_id]).any() or (request > self.available).any():
+            return False
+
+        self.available -= request
+        self.allocation[process_id] += request
+        self.need[process_id] -= request
+
+        is_safe, _ = self.safety_algorithm()
+        if not is_safe:
+            self.available += request
+            self.allocation[process_id] -= request
+            self.need[process_id] += request
+        return is_safe
+
+    def to_simulator(self, tracer=None):
+        """Copy this state into a DeadlockDetectionSimulator"""
+        simulator = DeadlockDetectionSimulator(tracer=tracer, engine="numpy")
+        simulator.num_processes, simulator.num_resources = self.max_need.shape
+        simulator.available = self.available.tolist()
+        simulator.max_need = self.max_need.tolist()
+        simulator.allocation = self.allocation.tolist()
+        simulator.calculate_need()
+        return simulator
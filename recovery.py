@@ -0,0 +1,269 @@
+"""
+Deadlock Recovery Planner
+Author: OS Learning Project
+Description: Picks the cheapest set of victim processes to preempt or terminate
+             so that the remaining processes have a safe sequence again
+"""
+
+import operator
+import time
+
+from deadlock_simulator import SafetyWorklist, replay_safe_sequence
+
+# What happens to a victim
+RECOVER_TERMINATE = "terminate"     # killed: its allocation is freed and its claim dropped
+RECOVER_PREEMPT = "preempt"         # rolled back: its allocation is freed, it restarts last
+
+# Candidates simulated per greedy step (the rest are ranked by a cheap estimate only)
+GREEDY_SHORTLIST = 8
+
+
+class _Node:
+    """A partial plan: the victims so far and the worklist run to a standstill after them"""
+    __slots__ = ("worklist", "victims", "cost", "order")
+
+    def __init__(self, worklist, victims, cost, order):
+        self.worklist = worklist
+        self.victims = victims
+        self.cost = cost
+        self.order = order      # processes finished so far, in order
+
+    def stuck(self):
+        return [i for i, finished in enumerate(self.worklist.finish) if not finished]
+
+    def child(self, victim, cost):
+        """Returns: the plan with one more victim, resuming this node's run instead of redoing it"""
+        worklist = self.worklist.copy()
+        worklist.finish[victim] = True
+        worklist.add_work(worklist.allocation[victim])
+        return _Node(worklist, self.victims + [victim], self.cost + cost, self.order + worklist.run())
+
+
+def _shortage(worklist, stuck):
+    """Returns: per resource, the total Need of stuck processes above Work"""
+    work = worklist.work
+    shortage = [0] * len(work)
+    for k in stuck:
+        for j, (value, w) in enumerate(zip(worklist.need[k], work)):
+            if value > w:
+                shortage[j] += value - w
+    return shortage
+
+
+def _rank(worklist, stuck, costs):
+    """Stuck processes ordered by cost per unit of shortage their release covers (cheapest first)"""
+    shortage = _shortage(worklist, stuck)
+    allocation = worklist.allocation
+
+    def price(v):
+        covered = sum(min(a, s) for a, s in zip(allocation[v], shortage) if a)
+        return costs[v] / (1 + covered), v
+
+    return sorted(stuck, key=price)
+
+
+def _greedy(root, costs, shortlist):
+    """
+    Add victims one at a time until no process is stuck. Each step simulates
+    the best few candidates by estimate and keeps the one with the lowest cost
+    per process it lets finish (itself included).
+    """
+    node = root
+    stuck = node.stuck()
+    while stuck:
+        best, best_price = None, None
+        for v in _rank(node.worklist, stuck, costs)[:shortlist]:
+            child = node.child(v, costs[v])
+            price = costs[v] / (1 + len(child.order) - len(node.order))
+            if best is None or price < best_price:
+                best, best_price = child, price
+        node = best
+        stuck = node.stuck()
+    return node
+
+
+def _is_enough(worklist, victims):
+    """Returns: True if the worklist's processes all finish once `victims` are gone"""
+    worklist = worklist.copy()
+    for v in victims:
+        worklist.finish[v] = True
+        worklist.add_work(worklist.allocation[v])
+    worklist.run()
+    return all(worklist.finish)
+
+
+def _drop_redundant(root, victims, costs):
+    """Returns: victims without the ones the others make unnecessary, the most expensive dropped first"""
+    kept = list(victims)
+    for v in sorted(victims, key=lambda v: -costs[v]):
+        rest = [u for u in kept if u != v]
+        if _is_enough(root.worklist, rest):
+            kept = rest
+    return kept
+
+
+def _lower_bound(node, costs, limit):
+    """
+    Least extra cost of any completion, with victims added in increasing pid
+    order (every victim of a minimal plan is stuck when it is picked, so the
+    order loses nothing). The run is at a standstill, so at least one more
+    candidate is needed. Beyond that, either every stuck process becomes a
+    victim, or the first one to finish does so on Work plus the victims'
+    allocations alone: covering its shortage in each resource costs at least
+    the shortage times the cheapest price per unit of that resource.
+    limit: extra cost that already loses to the best plan; the bound stops
+           being refined once it reaches it
+    Returns: the bound, or None when no completion exists
+    """
+    stuck = node.stuck()
+    if not stuck:
+        return 0
+    last = node.victims[-1] if node.victims else -1
+    candidates = [v for v in stuck if v > last]
+    if not candidates:
+        return None
+    floor = min(costs[v] for v in candidates)
+    if floor >= limit:
+        return floor
+
+    # Cheapest and second cheapest price per unit of each resource, so a
+    # process's own allocation never prices its own shortage
+    allocation = node.worklist.allocation
+    work = node.worklist.work
+    best = [(float("inf"), -1)] * len(work)
+    second = [float("inf")] * len(work)
+    for v in candidates:
+        for j, amount in enumerate(allocation[v]):
+            if amount:
+                price = costs[v] / amount
+                if price < best[j][0]:
+                    second[j] = best[j][0]
+                    best[j] = (price, v)
+                elif price < second[j]:
+                    second[j] = price
+
+    bound = sum(costs[k] for k in stuck) if len(candidates) == len(stuck) else float("inf")
+    for k in stuck:
+        cover = 0
+        for j, (value, w) in enumerate(zip(node.worklist.need[k], work)):
+            if value > w:
+                price = best[j][0] if best[j][1] != k else second[j]
+                cover = max(cover, (value - w) * price)
+                if cover >= bound:
+                    break
+        bound = min(bound, cover)
+        if bound <= floor:
+            return floor
+    return None if bound == float("inf") else bound
+
+
+def _recovered_state(available, allocation, need, victims, action):
+    """Returns: (available, allocation, need) once the victims are terminated or preempted"""
+    victims = set(victims)
+    work = list(available)
+    for v in victims:
+        work = list(map(operator.add, work, allocation[v]))
+    zeros = [0] * len(available)
+    rows = [zeros if i in victims else row for i, row in enumerate(allocation)]
+    if action == RECOVER_PREEMPT:
+        # A preempted victim holds nothing and claims its whole maximum again
+        needs = [list(map(operator.add, allocation[i], row)) if i in victims else row
+                 for i, row in enumerate(need)]
+    else:
+        needs = [zeros if i in victims else row for i, row in enumerate(need)]
+    return work, rows, needs
+
+
+def plan_recovery(available, allocation, need, costs=None, exact=False, time_budget=1.0,
+                  shortlist=GREEDY_SHORTLIST, action=RECOVER_TERMINATE):
+    """
+    Cheapest set of victims whose removal leaves a safe state.
+    The plan starts from the processes that can already finish and only ever
+    considers the stuck ones, and every candidate plan resumes its parent's
+    worklist run rather than checking safety from scratch.
+    costs: cost of each victim (list or dict by pid); 1 each by default,
+           i.e. as few victims as possible
+    exact: after the greedy plan, search branch-and-bound for a cheaper one;
+           it stops when time_budget seconds have passed and keeps the best
+           plan found
+    action: RECOVER_TERMINATE, or RECOVER_PREEMPT where a victim gives back
+            its allocation and needs its whole maximum claim again. It holds
+            nothing then, so it finishes after all the others as long as its
+            maximum fits in the total resources, which preemption needs of
+            every process (a non-victim whose maximum does not fit never
+            finishes either). Within that, the victim sets are the same.
+    Returns: dict with victims, cost, safe_sequence (of the other processes,
+             followed by preempted victims), optimal (True when the exact
+             search completed), nodes (plans the exact search expanded) and
+             seconds
+    Raises: ValueError if preemption cannot make the state safe
+    """
+    start = time.perf_counter()
+    n = len(need)
+    if costs is None:
+        costs = [1] * n
+    elif isinstance(costs, dict):
+        costs = [costs.get(i, 1) for i in range(n)]
+    if len(costs) != n or any(c < 0 for c in costs):
+        raise ValueError(f"Need {n} non-negative victim costs!")
+    if action not in (RECOVER_TERMINATE, RECOVER_PREEMPT):
+        raise ValueError(f"Unknown recovery action '{action}'")
+    if action == RECOVER_PREEMPT:
+        total = list(available)
+        for row in allocation:
+            total = list(map(operator.add, total, row))
+        for i in range(n):
+            if any(a + b > t for a, b, t in zip(allocation[i], need[i], total)):
+                raise ValueError(f"P{i}'s maximum claim exceeds the total resources, so no "
+                                 f"preemption helps; it has to be terminated")
+
+    worklist = SafetyWorklist(available, allocation, need)
+    root = _Node(worklist, [], 0, worklist.run())
+
+    best = _greedy(root, costs, shortlist)
+    victims = sorted(_drop_redundant(root, best.victims, costs))
+    if victims != sorted(best.victims):
+        best = root
+        for v in victims:
+            best = best.child(v, costs[v])
+
+    nodes = 0
+    optimal = not victims
+    if exact and victims:
+        # Depth-first, cheapest estimated victim first so good plans come
+        # early; a child's run is only resumed once it is popped
+        optimal = True
+        stack = [(root, None)]
+        while stack:
+            if time.perf_counter() - start > time_budget:
+                optimal = False
+                break
+            node, victim = stack.pop()
+            if victim is not None:
+                if node.cost + costs[victim] >= best.cost:
+                    continue
+                node = node.child(victim, costs[victim])
+            nodes += 1
+            bound = _lower_bound(node, costs, best.cost - node.cost)
+            if bound is None or node.cost + bound >= best.cost:
+                continue
+            stuck = node.stuck()
+            if not stuck:
+                best = node
+                continue
+            last = node.victims[-1] if node.victims else -1
+            stack.extend((node, v) for v in reversed(_rank(node.worklist, stuck, costs)) if v > last)
+
+    victims = sorted(best.victims)
+    order = best.order + victims if action == RECOVER_PREEMPT else best.order
+    state = _recovered_state(available, allocation, need, victims, action)
+    if not replay_safe_sequence(*state, best.order + victims):
+        raise RuntimeError(f"Recovery plan {victims} does not leave a valid safe sequence")
+    return {
+        "victims": victims,
+        "cost": best.cost,
+        "safe_sequence": order,
+        "optimal": optimal,
+        "nodes": nodes,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,268 @@
+"""
+Monte-Carlo Scenario Sweeps
+Author: OS Learning Project
+Description: Generates thousands of seeded random systems over a grid of process
+             counts, max-need distributions and availability levels, checks them
+             across a process pool and tabulates how often they are safe
+"""
+
+import argparse
+import itertools
+import operator
+import os
+import random
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from compact_state import CompactState
+from deadlock_simulator import get_engine
+
+# Max-need distributions
+DIST_UNIFORM = "uniform"    # every value equally likely in 0..max_value
+DIST_SKEWED = "skewed"      # mostly small claims, a few processes claim close to max_value
+DIST_BIMODAL = "bimodal"    # each process is either light (<= 20%) or heavy (>= 80%)
+
+DISTRIBUTIONS = (DIST_UNIFORM, DIST_SKEWED, DIST_BIMODAL)
+
+
+class Scenario:
+    """One cell of a sweep grid; every system in it is drawn from the same parameters"""
+    __slots__ = ("num_processes", "num_resources", "distribution", "availability", "max_value")
+
+    def __init__(self, num_processes, num_resources, distribution=DIST_UNIFORM,
+                 availability=0.25, max_value=10):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}' (choose from: {', '.join(DISTRIBUTIONS)})")
+        self.num_processes = num_processes
+        self.num_resources = num_resources
+        self.distribution = distribution
+        self.availability = availability    # Available[j] as a fraction of the total Need of Rj
+        self.max_value = max_value
+
+    def key(self):
+        return self.num_processes, self.num_resources, self.distribution, self.availability, self.max_value
+
+
+def scenario_grid(process_counts=(10, 50, 200), num_resources=5, distributions=DISTRIBUTIONS,
+                  availabilities=(0.05, 0.1, 0.25), max_value=10):
+    """Returns: the list of Scenario cells of a full grid"""
+    return [Scenario(n, num_resources, d, a, max_value)
+            for n, d, a in itertools.product(process_counts, distributions, availabilities)]
+
+
+def generate_systems(scenario, count, rng):
+    """
+    Draw `count` random systems of one scenario straight into compact buffers
+    Returns: (available, allocation, need) array('i') buffers, systems back to back
+    """
+    n, m, top = scenario.num_processes, scenario.num_resources, scenario.max_value
+    draw = rng.random
+    available = array("i")
+    allocation = array("i")
+    need = array("i")
+    for _ in range(count):
+        totals = [0] * m
+        for _ in range(n):
+            if scenario.distribution == DIST_UNIFORM:
+                max_row = [int(draw() * (top + 1)) for _ in range(m)]
+            elif scenario.distribution == DIST_SKEWED:
+                max_row = [int(draw() ** 3 * (top + 1)) for _ in range(m)]
+            else:
+                low, high = (0.0, 0.2) if draw() < 0.5 else (0.8, 1.0)
+                max_row = [int((low + draw() * (high - low)) * top + 0.5) for _ in range(m)]
+            alloc_row = [int(draw() * (v + 1)) for v in max_row]
+            need_row = list(map(operator.sub, max_row, alloc_row))
+            allocation.extend(alloc_row)
+            need.extend(need_row)
+            totals = list(map(operator.add, totals, need_row))
+        available.extend(int(scenario.availability * total) for total in totals)
+    return available, allocation, need
+
+
+def evaluate_compact(available, allocation, need, num_processes, num_resources, engine="worklist"):
+    """
+    Check every system stored back to back in compact buffers
+    Returns: (systems, safe, engine seconds)
+    """
+    check = get_engine(engine)
+    size = num_processes * num_resources
+    available, allocation, need = memoryview(available), memoryview(allocation), memoryview(need)
+    count = len(available) // num_resources if num_resources else 0
+    safe = 0
+    seconds = 0.0
+    for k in range(count):
+        state = CompactState(available[k * num_resources:(k + 1) * num_resources],
+                             allocation[k * size:(k + 1) * size],
+                             need[k * size:(k + 1) * size], num_processes, num_resources)
+        start = time.perf_counter()
+        is_safe, _ = check(state.available, state.allocation, state.need)
+        seconds += time.perf_counter() - start
+        safe += is_safe
+    return count, safe, seconds
+
+
+def _sweep_chunk(scenario_key, seed, chunk, count, engine):
+    # Runs in a worker: the task is a few numbers, the systems are generated here
+    scenario = Scenario(*scenario_key)
+    rng = random.Random(f"{seed}:{scenario_key}:{chunk}")
+    buffers = generate_systems(scenario, count, rng)
+    return evaluate_compact(*buffers, scenario.num_processes, scenario.num_resources, engine)
+
+
+def _run_tasks(tasks, workers, on_result, pool=None):
+    """
+    Run (key, function, args) tasks, keeping at most 2 per worker in flight
+    pool: use a process pool even for one worker (default: only for several)
+    """
+    if not (workers > 1 if pool is None else pool):
+        for key, function, args in tasks:
+            on_result(key, function(*args))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        for key, function, args in tasks:
+            if len(running) >= 2 * workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    on_result(running.pop(future), future.result())
+            running[executor.submit(function, *args)] = key
+        for future in running:
+            on_result(running[future], future.result())
+
+
+def _new_row(scenario):
+    return {
+        "num_processes": scenario.num_processes,
+        "num_resources": scenario.num_resources,
+        "distribution": scenario.distribution,
+        "availability": scenario.availability,
+        "systems": 0,
+        "safe": 0,
+        "seconds": 0.0,
+    }
+
+
+def _finish_rows(rows):
+    for row in rows:
+        row["safe_rate"] = row["safe"] / row["systems"] if row["systems"] else 0.0
+        row["unsafe_rate"] = 1.0 - row["safe_rate"] if row["systems"] else 0.0
+        row["mean_ms"] = row["seconds"] / row["systems"] * 1000 if row["systems"] else 0.0
+    return rows
+
+
+def run_sweep(scenarios, systems=1000, workers=None, seed=0, engine="worklist", chunk_size=100, pool=None):
+    """
+    Evaluate `systems` random systems per scenario across a process pool.
+    Work is split into chunks seeded from (seed, scenario, chunk), so the results
+    are the same for any number of workers. Each task carries only the scenario
+    parameters; the worker draws its systems into flat int32 buffers and checks
+    them through zero-copy views, so nothing bigger than a result tuple is pickled.
+    pool: run through a process pool even with one worker, e.g. for a scaling
+          baseline that pays the same pool overhead (default: only for several)
+    Returns: dict with "rows" (one per scenario), "systems", "seconds", "workers"
+    """
+    workers = workers or os.cpu_count() or 1
+    rows = [_new_row(s) for s in scenarios]
+    tasks = []
+    for index, scenario in enumerate(scenarios):
+        for chunk, start in enumerate(range(0, systems, chunk_size)):
+            tasks.append((index, _sweep_chunk,
+                          (scenario.key(), seed, chunk, min(chunk_size, systems - start), engine)))
+
+    def collect(index, result):
+        count, safe, seconds = result
+        rows[index]["systems"] += count
+        rows[index]["safe"] += safe
+        rows[index]["seconds"] += seconds
+
+    start = time.perf_counter()
+    _run_tasks(tasks, workers, collect, pool)
+    return {
+        "rows": _finish_rows(rows),
+        "systems": sum(row["systems"] for row in rows),
+        "seconds": time.perf_counter() - start,
+        "workers": workers,
+    }
+
+
+def evaluate_systems(systems, workers=None, engine="worklist", chunk_size=100):
+    """
+    Check caller-built (available, max_need, allocation) systems across a process
+    pool. Systems are packed per chunk into compact int32 buffers, which pickle as
+    raw bytes instead of nested lists.
+    Returns: list of (systems, safe, engine seconds) per chunk, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = []         # (available, allocation, need, num_processes, num_resources, engine)
+    count = 0
+    for available, max_need, allocation in systems:
+        shape = (len(max_need), len(available))
+        if not chunks or chunks[-1][3:5] != shape or count == chunk_size:
+            chunks.append((array("i"), array("i"), array("i")) + shape + (engine,))
+            count = 0
+        chunk = chunks[-1]
+        chunk[0].extend(available)
+        for max_row, alloc_row in zip(max_need, allocation):
+            chunk[1].extend(alloc_row)
+            chunk[2].extend(map(operator.sub, max_row, alloc_row))
+        count += 1
+
+    tasks = [(index, evaluate_compact, chunk) for index, chunk in enumerate(chunks)]
+    results = [None] * len(tasks)
+
+    def collect(index, result):
+        results[index] = result
+
+    _run_tasks(tasks, workers, collect)
+    return results
+
+
+def print_sweep(result):
+    """Print a sweep result as a table"""
+    print(f"{'Procs':>6} | {'Res':>4} | {'Distribution':<12} | {'Avail':>5} | {'Systems':>7} | "
+          f"{'Safe %':>6} | {'Mean (ms)':>9}")
+    print("-" * 70)
+    for row in result["rows"]:
+        print(f"{row['num_processes']:>6} | {row['num_resources']:>4} | {row['distribution']:<12} | "
+              f"{row['availability']:>5.2f} | {row['systems']:>7} | {row['safe_rate'] * 100:>6.1f} | "
+              f"{row['mean_ms']:>9.3f}")
+    print(f"\n🎲 {result['systems']} systems in {result['seconds']:.2f}s on {result['workers']} worker(s) "
+          f"({result['systems'] / result['seconds']:,.0f} systems/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte-Carlo sweep of random Banker's systems")
+    parser.add_argument("--processes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--resources", type=int, default=5)
+    parser.add_argument("--availability", type=float, nargs="+", default=[0.05, 0.1, 0.25])
+    parser.add_argument("--distribution", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--max-value", type=int, default=10)
+    parser.add_argument("--systems", type=int, default=1000, help="systems per scenario")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--engine", default="worklist")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scaling", action="store_true",
+                        help="repeat the sweep with 1, 2, 4... workers and report the speedup")
+    args = parser.parse_args(argv)
+
+    scenarios = scenario_grid(args.processes, args.resources, args.distribution,
+                              args.availability, args.max_value)
+    result = run_sweep(scenarios, args.systems, args.workers, args.seed, args.engine)
+    print_sweep(result)
+
+    if args.scaling:
+        print(f"\n{'Workers':>7} | {'Seconds':>8} | {'Speedup':>7}")
+        print("-" * 28)
+        baseline = None
+        count = 1
+        while count <= result["workers"]:
+            # Every row, the 1-worker baseline included, goes through a pool
+            seconds = run_sweep(scenarios, args.systems, count, args.seed, args.engine, pool=True)["seconds"]
+            baseline = baseline or seconds
+            print(f"{count:>7} | {seconds:>8.2f} | {baseline / seconds:>7.2f}")
+            count *= 2
+
+
+if __name__ == "__main__":
+    main()
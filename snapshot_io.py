@@ -0,0 +1,257 @@
+"""
+Snapshot Loading and Saving
+Author: OS Learning Project
+Description: Builds a DeadlockDetectionSimulator from JSON, CSV or memory-mapped
+             binary snapshots, and writes the current state back out
+"""
+
+import csv
+import itertools
+import json
+import mmap
+import operator
+import os
+import struct
+import sys
+from array import array
+
+from compact_state import CompactState
+from deadlock_simulator import DeadlockDetectionSimulator
+
+# Binary layout: header, then Available (m), Allocation (n*m) and Need (n*m)
+# as little-endian int32 in row-major order
+BINARY_MAGIC = b"DLSNAP01"
+BINARY_HEADER = struct.Struct("<8sII")
+
+BINARY_SUFFIXES = (".bin", ".dls")
+
+# Below this many matrix cells, importing NumPy costs more than it saves
+NUMPY_MIN_CELLS = 100_000
+
+_np = False     # NumPy module once imported, None if it is not installed
+
+
+def _numpy():
+    """Import NumPy on first use; validation falls back to flat C-level scans without it"""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+def validate_state(available, max_need, allocation):
+    """
+    Check shapes, non-negative values and Allocation <= Max in bulk.
+    Raises: ValueError describing the first problem found (also for values
+            that are not lists of integers)
+    """
+    try:
+        _validate(available, max_need, allocation)
+    except TypeError:
+        raise ValueError("Available, Max and Allocation must be lists of integers!") from None
+
+
+def _check_integers(available, max_need, allocation):
+    """
+    int() would silently truncate 1.5 and turn True into 1, so only ints and
+    integral floats (2.0, as some JSON writers emit) get through
+    """
+    for row in itertools.chain((available,), max_need, allocation):
+        if set(map(type, row)) <= {int}:
+            continue
+        for value in row:
+            if type(value) is not int and not (type(value) is float and value.is_integer()):
+                raise ValueError(f"Values must be integers! (got {value!r})")
+
+
+def _validate(available, max_need, allocation):
+    _check_integers(available, max_need, allocation)
+    num_resources = len(available)
+    if len(max_need) != len(allocation):
+        raise ValueError(f"Max has {len(max_need)} processes but Allocation has {len(allocation)}")
+
+    np = _numpy() if len(max_need) * num_resources >= NUMPY_MIN_CELLS else None
+    if np is not None:
+        try:
+            available = np.asarray(available, dtype=np.int64).reshape(num_resources)
+            max_need = np.asarray(max_need, dtype=np.int64).reshape(len(max_need), num_resources)
+            allocation = np.asarray(allocation, dtype=np.int64).reshape(max_need.shape)
+        except ValueError:
+            raise ValueError(f"Every row needs exactly {num_resources} values!") from None
+        if (available < 0).any() or (max_need < 0).any() or (allocation < 0).any():
+            raise ValueError("Values cannot be negative!")
+        bad = np.argwhere(allocation > max_need)
+        if len(bad):
+            raise ValueError(f"Allocation cannot exceed maximum need! (P{bad[0][0]}, R{bad[0][1]})")
+        return
+
+    if min(available, default=0) < 0:
+        raise ValueError("Values cannot be negative!")
+    for i, (max_row, alloc_row) in enumerate(zip(max_need, allocation)):
+        if len(max_row) != num_resources or len(alloc_row) != num_resources:
+            raise ValueError(f"Every row needs exactly {num_resources} values! (P{i})")
+        if min(alloc_row, default=0) < 0 or min(max_row, default=0) < 0:
+            raise ValueError("Values cannot be negative!")
+        if not all(map(operator.le, alloc_row, max_row)):
+            raise ValueError(f"Allocation cannot exceed maximum need! (P{i})")
+
+
+def _build(available, max_need, allocation, tracer=None):
+    validate_state(available, max_need, allocation)
+    simulator = DeadlockDetectionSimulator(tracer=tracer)
+    simulator.num_processes = len(max_need)
+    simulator.num_resources = len(available)
+    simulator.available = [int(v) for v in available]
+    simulator.max_need = [[int(v) for v in row] for row in max_need]
+    simulator.allocation = [[int(v) for v in row] for row in allocation]
+    simulator.calculate_need()
+    return simulator
+
+
+def load_json(path, tracer=None):
+    """Load {"available": [...], "max_need": [[...]], "allocation": [[...]]}"""
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must hold a JSON object")
+    return _build(data["available"], data["max_need"], data["allocation"], tracer)
+
+
+def save_json(simulator, path):
+    """Save the state as JSON; Need is derived again on load"""
+    data = {
+        "available": list(simulator.available),
+        "max_need": [list(row) for row in simulator.max_need],
+        "allocation": [list(row) for row in simulator.allocation],
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def load_csv(path, tracer=None):
+    """
+    Load rows of `kind,process,R0,R1,...` where kind is available, max or allocation
+    (the process column is empty for the available row)
+    """
+    available = None
+    max_need = {}
+    allocation = {}
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0] == "kind":
+                continue
+            kind, process, values = row[0].strip().lower(), row[1].strip(), list(map(int, row[2:]))
+            if kind == "available":
+                available = values
+            elif kind == "max":
+                max_need[int(process)] = values
+            elif kind == "allocation":
+                allocation[int(process)] = values
+            else:
+                raise ValueError(f"Unknown row kind '{row[0]}'")
+
+    if available is None:
+        raise ValueError("Snapshot has no available row")
+    if sorted(max_need) != list(range(len(max_need))) or sorted(allocation) != sorted(max_need):
+        raise ValueError("Max and allocation rows must cover processes 0..n-1 exactly once")
+    order = range(len(max_need))
+    return _build(available, [max_need[i] for i in order], [allocation[i] for i in order], tracer)
+
+
+def save_csv(simulator, path):
+    """Save the state in the CSV layout read by load_csv"""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind", "process"] + [f"R{j}" for j in range(simulator.num_resources)])
+        writer.writerow(["available", ""] + list(simulator.available))
+        for i, row in enumerate(simulator.max_need):
+            writer.writerow(["max", i] + list(row))
+        for i, row in enumerate(simulator.allocation):
+            writer.writerow(["allocation", i] + list(row))
+
+
+def save_binary(simulator, path):
+    """Save the state as a binary snapshot (int32, row-major)"""
+    num_processes, num_resources = simulator.num_processes, simulator.num_resources
+    with open(path, "wb") as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, num_processes, num_resources))
+        for block in ([simulator.available], simulator.allocation, simulator.need):
+            data = array("i")
+            for row in block:
+                data.extend(row)
+            if sys.byteorder != "little":
+                data.byteswap()
+            data.tofile(f)
+
+
+def load_binary(path, tracer=None, validate=True):
+    """
+    Memory-map a binary snapshot: nothing is parsed into Python objects, the
+    simulator's matrices are views of the mapped file. The mapping is
+    copy-on-write, so grants change the loaded state but never the file.
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Binary snapshots are little-endian; use JSON or CSV on this machine")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < BINARY_HEADER.size:
+            raise ValueError(f"{path} is truncated or corrupt ({size} bytes, no header)")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, num_processes, num_resources = BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{path} is not a deadlock simulator snapshot")
+    matrix_bytes = num_processes * num_resources * 4
+    expected = BINARY_HEADER.size + num_resources * 4 + 2 * matrix_bytes
+    if len(buffer) != expected:
+        raise ValueError(f"{path} is truncated or corrupt ({len(buffer)} bytes, expected {expected})")
+
+    view = memoryview(buffer)
+    start = BINARY_HEADER.size
+    available = view[start:start + num_resources * 4]
+    start += num_resources * 4
+    allocation = view[start:start + matrix_bytes]
+    need = view[start + matrix_bytes:start + 2 * matrix_bytes]
+
+    if validate:
+        # Allocation >= 0 and Need >= 0 is the same as 0 <= Allocation <= Max
+        np = _numpy() if num_processes * num_resources >= NUMPY_MIN_CELLS else None
+        for name, block in (("Available", available), ("Allocation", allocation), ("Need", need)):
+            if np is not None:
+                negative = len(block) > 0 and np.frombuffer(block, dtype="<i4").min() < 0
+            else:
+                negative = min(block.cast("i"), default=0) < 0
+            if negative:
+                raise ValueError(f"{name} has negative values! (Allocation cannot exceed maximum need)")
+
+    state = CompactState(available, allocation, need, num_processes, num_resources)
+    return state.to_simulator(tracer=tracer)
+
+
+def load_snapshot(path, tracer=None):
+    """Load a snapshot, choosing the format from the file extension"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".json":
+        return load_json(path, tracer)
+    if suffix == ".csv":
+        return load_csv(path, tracer)
+    if suffix in BINARY_SUFFIXES:
+        return load_binary(path, tracer)
+    raise ValueError(f"Unknown snapshot format '{suffix}' (use .json, .csv, .bin or .dls)")
+
+
+def save_snapshot(simulator, path):
+    """Save a snapshot, choosing the format from the file extension"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".json":
+        save_json(simulator, path)
+    elif suffix == ".csv":
+        save_csv(simulator, path)
+    elif suffix in BINARY_SUFFIXES:
+        save_binary(simulator, path)
+    else:
+        raise ValueError(f"Unknown snapshot format '{suffix}' (use .json, .csv, .bin or .dls)")
@@ -0,0 +1,331 @@
+"""
+Sparse (CSR) State
+Author: OS Learning Project
+Description: Keeps Max, Allocation and Need in compressed-row form for systems
+             whose matrices are mostly zero, so memory and safety checks scale
+             with the nonzero entries instead of n x m
+"""
+
+import operator
+from array import array
+from bisect import bisect_left
+
+from deadlock_simulator import DeadlockDetectionSimulator, SafetyWorklist
+
+
+def _entries(row):
+    """(resource, value) pairs of a row: only the stored ones for sparse rows"""
+    items = getattr(row, "items", None)
+    return items() if items is not None else enumerate(row)
+
+
+class SparseRow:
+    """
+    One row of a SparseMatrix, reading and writing the shared buffers.
+    Indexing is a bisection over the row's stored resources; iterating yields
+    all m values so the row still works wherever a list row does.
+    """
+    __slots__ = ("_matrix", "_i")
+
+    def __init__(self, matrix, i):
+        self._matrix = matrix
+        self._i = i
+
+    def _find(self, j):
+        state = self._matrix.state
+        if not 0 <= j < state.num_resources:
+            raise IndexError("resource index out of range")
+        start, end = state.indptr[self._i], state.indptr[self._i + 1]
+        k = bisect_left(state.indices, j, start, end)
+        return k, k < end and state.indices[k] == j
+
+    def __len__(self):
+        return self._matrix.state.num_resources
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += len(self)
+        k, stored = self._find(j)
+        return self._matrix.data[k] if stored else 0
+
+    def __setitem__(self, j, value):
+        if j < 0:
+            j += len(self)
+        k, stored = self._find(j)
+        if not stored:
+            if not value:
+                return
+            self._matrix.state.insert_entry(self._i, j, k)
+        self._matrix.data[k] = value
+
+    def items(self):
+        """Returns: (resource, value) pairs of the stored entries (explicit zeros included)"""
+        state = self._matrix.state
+        start, end = state.indptr[self._i], state.indptr[self._i + 1]
+        return zip(state.indices[start:end], self._matrix.data[start:end])
+
+    def tolist(self):
+        row = [0] * len(self)
+        for j, value in self.items():
+            row[j] = value
+        return row
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class SparseMatrix:
+    """
+    Max, Allocation or Need seen as a list of rows: one value buffer aligned
+    with the sparsity pattern the three matrices share
+    """
+    __slots__ = ("state", "data")
+
+    def __init__(self, state, data):
+        self.state = state
+        self.data = data
+
+    def __len__(self):
+        return self.state.num_processes
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return SparseRow(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SparseRow(self, i)
+
+    def append(self, row):
+        """
+        Append a process row. Max is appended first and fixes the row's
+        pattern; Allocation and Need then fill their values into it
+        (the order DeadlockDetectionSimulator.add_process uses).
+        """
+        state = self.state
+        if self is state.max_need:
+            state.append_row(row)
+            return
+        start, end = state.indptr[-2], state.indptr[-1]
+        for k in range(start, end):
+            self.data[k] = row[state.indices[k]]
+        if sum(map(bool, row)) > sum(map(bool, self.data[start:end])):
+            raise ValueError("Allocation and Need must be zero wherever Max is")
+
+    def tolist(self):
+        return [row.tolist() for row in self]
+
+
+class SparseWorklist(SafetyWorklist):
+    """SafetyWorklist that only visits the stored entries of sparse Need and Allocation rows"""
+
+    def __init__(self, work, allocation, need, done=None):
+        self.work = list(work)
+        self.allocation = allocation
+        self.need = need
+        self.finish = [False] * len(need) if done is None else list(done)
+        self.blocked = [0] * len(need)
+        self._waiting = [[] for _ in self.work]
+        self._cursor = [0] * len(self.work)
+        self._ready = []
+
+        work = self.work
+        for i, row in enumerate(need):
+            if self.finish[i]:
+                continue
+            count = 0
+            for j, value in _entries(row):
+                if value > work[j]:
+                    self._waiting[j].append((value, i))
+                    count += 1
+            self.blocked[i] = count
+            if count == 0:
+                self._ready.append(i)
+        for entries in self._waiting:
+            entries.sort()
+
+    def add_work(self, vector):
+        work = self.work
+        for j, value in _entries(vector):
+            if value:
+                work[j] += value
+                self._unblock(j)
+
+
+def sparse_safety(available, allocation, need, tracer=None):
+    """
+    Banker's Safety Algorithm over the stored entries only: O(nnz·log n + m).
+    Same lowest-pid-first sequence as worklist_safety; rows that are not
+    sparse (plain lists, or a row swapped in for a hypothetical grant) are
+    walked in full.
+    Returns: (is_safe, safe_sequence) with the sequence as process indices
+    """
+    if tracer is not None:
+        tracer.safety_started()
+
+    safe_sequence = SparseWorklist(available, allocation, need).run(tracer)
+    is_safe = len(safe_sequence) == len(need)
+    if not is_safe:
+        safe_sequence = []
+
+    if tracer is not None:
+        tracer.safety_finished(is_safe, safe_sequence)
+    return is_safe, safe_sequence
+
+
+class SparseState:
+    """
+    Compressed sparse rows: indptr[i]:indptr[i + 1] spans process i's stored
+    resources in `indices` (sorted), and max_data, allocation_data and
+    need_data hold the three matrices' values at those positions.
+    Allocation and Need are never nonzero where Max is zero, so the pattern
+    of Max covers all three and grants and releases never change it; zeros
+    left behind by a release stay stored. Only a process arriving with a
+    claim outside its row's pattern inserts entries, in O(nnz).
+    """
+    __slots__ = ("num_processes", "num_resources", "available", "indptr", "indices",
+                 "max_data", "allocation_data", "need_data", "max_need", "allocation", "need")
+
+    def __init__(self, available, indptr, indices, max_data, allocation_data):
+        self.num_processes = len(indptr) - 1
+        self.num_resources = len(available)
+        self.available = array("i", available)
+        self.indptr = indptr
+        self.indices = indices
+        self.max_data = max_data
+        self.allocation_data = allocation_data
+        self.need_data = array("i", map(operator.sub, max_data, allocation_data))
+        if not len(indices) == len(max_data) == len(allocation_data) == indptr[-1]:
+            raise ValueError(f"Expected {indptr[-1]} stored values per matrix")
+        self.max_need = SparseMatrix(self, self.max_data)
+        self.allocation = SparseMatrix(self, self.allocation_data)
+        self.need = SparseMatrix(self, self.need_data)
+
+    @classmethod
+    def from_entries(cls, available, num_processes, entries):
+        """
+        Build from (process, resource, max, allocation) tuples without ever
+        holding a dense matrix; unlisted entries are zero
+        """
+        rows = [[] for _ in range(num_processes)]
+        for i, j, max_value, alloc_value in entries:
+            if alloc_value > max_value:
+                raise ValueError(f"P{i} holds more R{j} than its maximum claim")
+            if max_value:
+                rows[i].append((j, max_value, alloc_value))
+        indptr = array("q", [0])
+        indices, max_data, allocation_data = array("i"), array("i"), array("i")
+        for row in rows:
+            row.sort()
+            for j, max_value, alloc_value in row:
+                indices.append(j)
+                max_data.append(max_value)
+                allocation_data.append(alloc_value)
+            indptr.append(len(indices))
+        return cls(available, indptr, indices, max_data, allocation_data)
+
+    @classmethod
+    def from_lists(cls, available, max_need, allocation):
+        """Compress list-of-lists matrices, keeping the nonzeros of Max"""
+        indptr = array("q", [0])
+        indices, max_data, allocation_data = array("i"), array("i"), array("i")
+        for max_row, alloc_row in zip(max_need, allocation):
+            for j, value in enumerate(max_row):
+                if value:
+                    indices.append(j)
+                    max_data.append(value)
+                    allocation_data.append(alloc_row[j])
+            indptr.append(len(indices))
+        return cls(available, indptr, indices, max_data, allocation_data)
+
+    @classmethod
+    def from_simulator(cls, simulator):
+        """Compress a DeadlockDetectionSimulator's state"""
+        return cls.from_lists(simulator.available, simulator.max_need, simulator.allocation)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def calculate_need(self):
+        """
+        Need = Max - Allocation over the stored entries only, in place: O(nnz)
+        Returns: bytes written
+        """
+        self.need_data[:] = array("i", map(operator.sub, self.max_data, self.allocation_data))
+        return self.need_data.itemsize * len(self.need_data)
+
+    def append_row(self, max_row):
+        """Append a process with the given maximum claim and nothing allocated"""
+        for j, value in enumerate(max_row):
+            if value:
+                self.indices.append(j)
+                self.max_data.append(value)
+                self.allocation_data.append(0)
+                self.need_data.append(value)
+        self.indptr.append(len(self.indices))
+        self.num_processes += 1
+
+    def insert_entry(self, i, j, k):
+        """Store a zero for (Pi, Rj) at position k of the buffers: O(nnz)"""
+        self.indices.insert(k, j)
+        for data in (self.max_data, self.allocation_data, self.need_data):
+            data.insert(k, 0)
+        indptr = self.indptr
+        for r in range(i + 1, len(indptr)):
+            indptr[r] += 1
+
+    def nbytes(self):
+        """Bytes held by the buffers"""
+        return sum(buffer.itemsize * len(buffer) for buffer in (
+            self.available, self.indptr, self.indices, self.max_data, self.allocation_data, self.need_data))
+
+    def to_simulator(self, tracer=None, engine="sparse"):
+        """
+        Build a simulator whose matrices are views of this state (no copy).
+        Grants, releases, arrivals and exits write straight into the buffers,
+        and the simulator's calculate_need() recomputes Need in place.
+        """
+        simulator = DeadlockDetectionSimulator(tracer=tracer, engine=engine)
+        simulator.num_processes = self.num_processes
+        simulator.num_resources = self.num_resources
+        simulator.available = self.available
+        simulator.max_need = self.max_need
+        simulator.allocation = self.allocation
+        simulator.need = self.need
+        return simulator
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from compact_state import list_matrix_bytes
+    from deadlock_simulator import worklist_safety
+
+    print(f"{'Processes':>9} | {'Resources':>9} | {'Density':>7} | {'Lists (MB)':>10} | {'Sparse (MB)':>11} | "
+          f"{'Worklist (ms)':>13} | {'Sparse (ms)':>11}")
+    print("-" * 89)
+    rng = random.Random(0)
+    for num_processes, num_resources, density in [(1000, 100, 0.05), (2000, 500, 0.02), (2000, 500, 0.2)]:
+        available = [rng.randint(5, 20) for _ in range(num_resources)]
+        max_need = [[rng.randint(1, 10) if rng.random() < density else 0 for _ in range(num_resources)]
+                    for _ in range(num_processes)]
+        allocation = [[rng.randint(0, v) for v in row] for row in max_need]
+        state = SparseState.from_lists(available, max_need, allocation)
+        lists = list_matrix_bytes(max_need) + list_matrix_bytes(allocation) * 2
+        need = state.need.tolist()
+        timings = []
+        for engine, args in ((worklist_safety, (available, allocation, need)),
+                             (sparse_safety, (state.available, state.allocation, state.need))):
+            start = time.perf_counter()
+            engine(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{num_processes:>9} | {num_resources:>9} | {density:>7.0%} | {lists / 1e6:>10.2f} | "
+              f"{state.nbytes() / 1e6:>11.2f} | {timings[0]:>13.1f} | {timings[1]:>11.1f}")
@@ -0,0 +1,254 @@
+"""
+State Rendering
+Author: OS Learning Project
+Description: Renders the simulator's state page by page into one buffered
+             write, with auto-sized columns and summary views for large systems
+"""
+
+import heapq
+import io
+import sys
+from itertools import islice
+
+# Views of the process table
+VIEW_FULL = "full"                  # every process, in pid order
+VIEW_TOP = "top"                    # the processes with the most remaining need
+VIEW_BLOCKED = "blocked"            # processes whose Need exceeds Available right now
+VIEW_DEADLOCKED = "deadlocked"      # processes no order can finish (exact detection on Need)
+VIEW_UTILISATION = "utilisation"    # one row per resource type instead of per process
+
+VIEWS = (VIEW_FULL, VIEW_TOP, VIEW_BLOCKED, VIEW_DEADLOCKED, VIEW_UTILISATION)
+
+
+def _exceeds(row, available):
+    """Returns: whether a Need row is above Available anywhere (stored entries only for sparse rows)"""
+    items = getattr(row, "items", None)
+    return any(value > available[j] for j, value in (items() if items is not None else enumerate(row)))
+
+
+def _border(widths):
+    return "+" + "+".join("-" * (w + 2) for w in widths) + "+\n"
+
+
+def _line(cells, widths):
+    return "|" + "|".join(f" {cell:^{w}} " for cell, w in zip(cells, widths)) + "|\n"
+
+
+def write_table(out, headers, rows):
+    """Write a boxed table; every column is as wide as its widest cell"""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for k, cell in enumerate(row):
+            if len(cell) > widths[k]:
+                widths[k] = len(cell)
+    border = _border(widths)
+    out.write(border)
+    out.write(_line(headers, widths))
+    out.write(border)
+    for row in rows:
+        out.write(_line(row, widths))
+    out.write(border)
+
+
+def write_classic(out, simulator, title="System State"):
+    """
+    Write the whole state in the console's original fixed-width layout
+    (every process and every resource type), as print_state showed it
+    before paging existed
+    """
+    num_resources = simulator.num_resources
+    out.write(f"\n{'=' * 60}\n{title:^60}\n{'=' * 60}\n")
+    out.write("\n📊 Available Resources:\n")
+    out.write("+---" * num_resources + "+\n")
+    out.write("| " + " | ".join(f"R{j}" for j in range(num_resources)) + " |\n")
+    out.write("+---" * num_resources + "+\n")
+    out.write("| " + " | ".join(f"{x:^3}" for x in simulator.available) + " |\n")
+    out.write("+---" * num_resources + "+\n")
+
+    border = "+---------+" + "---------+" * (num_resources * 3) + "\n"
+    headers = (["Process"] + [f"Max R{j}" for j in range(num_resources)]
+               + [f"Alloc R{j}" for j in range(num_resources)] + [f"Need R{j}" for j in range(num_resources)])
+    out.write("\n📋 Process Information:\n")
+    out.write(border)
+    out.write("|" + "".join(f" {h:^7} |" for h in headers) + "\n")
+    out.write(border)
+    for i in range(simulator.num_processes):
+        row = [f"P{i}", *simulator.max_need[i], *simulator.allocation[i], *simulator.need[i]]
+        out.write("|" + "".join(f" {value:^7} |" for value in row) + "\n")
+    out.write(border)
+
+
+class StateRenderer:
+    """
+    Renders one page of a view at a time. Selecting the processes of a page
+    only reads as far into the state as that page needs (the top-k view has to
+    rank every process, but formats only the k it shows), and only the
+    resource columns on screen are formatted.
+    The top-k and deadlocked selections are computed once and reused while
+    paging; call refresh() after the state changes.
+    page_size: process (or resource) rows per page
+    max_resources: resource types shown side by side, the rest paged by
+                   `resource_page`; None shows every resource type
+    """
+
+    def __init__(self, simulator, page_size=50, max_resources=None):
+        self.simulator = simulator
+        self.page_size = page_size
+        self.max_resources = max_resources
+        self._selections = {}   # (view, top) -> pids of views that rank the whole state
+
+    def refresh(self):
+        """Forget the cached top-k and deadlocked selections"""
+        self._selections.clear()
+
+    def process_ids(self, view=VIEW_FULL, top=10):
+        """Yield the pids of a view lazily, in display order"""
+        simulator = self.simulator
+        if view == VIEW_FULL:
+            return iter(range(simulator.num_processes))
+        if view == VIEW_BLOCKED:
+            available = simulator.available
+            return (i for i, row in enumerate(simulator.need) if _exceeds(row, available))
+
+        key = (view, top if view == VIEW_TOP else None)
+        if key not in self._selections:
+            if view == VIEW_TOP:
+                self._selections[key] = heapq.nlargest(top, range(simulator.num_processes),
+                                                       key=lambda i: sum(simulator.need[i]))
+            elif view == VIEW_DEADLOCKED:
+                from detection import detect_deadlocked
+                self._selections[key] = detect_deadlocked(simulator.available, simulator.allocation,
+                                                          simulator.need)
+            else:
+                raise ValueError(f"Unknown view '{view}' (choose from: {', '.join(VIEWS)})")
+        return iter(self._selections[key])
+
+    def _resource_window(self, resource_page):
+        if self.max_resources is None:
+            return range(self.simulator.num_resources)
+        start = resource_page * self.max_resources
+        return range(start, min(start + self.max_resources, self.simulator.num_resources))
+
+    def render(self, title="System State", view=VIEW_FULL, page=0, top=10, resource_page=0):
+        """Returns: one page of the view as a string"""
+        return self._render(title, view, page, top, resource_page)[0]
+
+    def _render(self, title, view, page, top, resource_page):
+        """Returns: (page text, whether a next page exists)"""
+        out = io.StringIO()
+        simulator = self.simulator
+        columns = self._resource_window(resource_page)
+        hidden = simulator.num_resources - len(columns)
+
+        out.write(f"\n{'=' * 60}\n{title:^60}\n{'=' * 60}\n")
+        out.write("\n📊 Available Resources:\n")
+        write_table(out, [f"R{j}" for j in columns], [[simulator.available[j] for j in columns]])
+
+        if view == VIEW_UTILISATION:
+            more = self._write_utilisation(out, page)
+            return out.getvalue(), more
+
+        start = page * self.page_size
+        pids = list(islice(self.process_ids(view, top), start, start + self.page_size + 1))
+        more = len(pids) > self.page_size
+        pids = pids[:self.page_size]
+
+        label = {VIEW_FULL: "Process Information", VIEW_TOP: f"Top {top} Processes by Remaining Need",
+                 VIEW_BLOCKED: "Blocked Processes (Need > Available)",
+                 VIEW_DEADLOCKED: "Deadlocked Processes"}[view]
+        out.write(f"\n📋 {label}:\n")
+        if not pids:
+            out.write("   (none)\n" if page == 0 else "   (no more processes)\n")
+            return out.getvalue(), False
+
+        headers = (["Process"] + [f"Max R{j}" for j in columns] + [f"Alloc R{j}" for j in columns]
+                   + [f"Need R{j}" for j in columns])
+        rows = []
+        for i in pids:
+            max_row, alloc_row, need_row = simulator.max_need[i], simulator.allocation[i], simulator.need[i]
+            rows.append([f"P{i}"] + [max_row[j] for j in columns] + [alloc_row[j] for j in columns]
+                        + [need_row[j] for j in columns])
+        write_table(out, headers, rows)
+
+        notes = [f"rows {start + 1}-{start + len(pids)}"]
+        if view == VIEW_FULL:
+            notes[0] += f" of {simulator.num_processes}"
+        if more:
+            notes.append(f"more on page {page + 2}")
+        if hidden:
+            notes.append(f"R{columns.start}-R{columns.stop - 1} of {simulator.num_resources} resource types shown")
+        out.write(f"   ({'; '.join(notes)})\n")
+        return out.getvalue(), more
+
+    def _write_utilisation(self, out, page):
+        simulator = self.simulator
+        start = page * self.page_size
+        resources = range(start, min(start + self.page_size, simulator.num_resources))
+        allocated = [0] * len(resources)
+        outstanding = [0] * len(resources)
+        waiting = [0] * len(resources)
+        for alloc_row, need_row in zip(simulator.allocation, simulator.need):
+            for k, j in enumerate(resources):
+                allocated[k] += alloc_row[j]
+                outstanding[k] += need_row[j]
+                if need_row[j] > simulator.available[j]:
+                    waiting[k] += 1
+
+        rows = []
+        for k, j in enumerate(resources):
+            total = allocated[k] + simulator.available[j]
+            rows.append([f"R{j}", total, allocated[k], simulator.available[j],
+                         f"{allocated[k] / total * 100:.1f}%" if total else "-", outstanding[k], waiting[k]])
+        out.write("\n📈 Resource Utilisation:\n")
+        write_table(out, ["Resource", "Total", "Allocated", "Available", "Used", "Outstanding Need",
+                          "Short For"], rows)
+        more = resources.stop < simulator.num_resources
+        if more:
+            out.write(f"   (resources R{resources.start}-R{resources.stop - 1} of {simulator.num_resources}; "
+                      f"more on page {page + 2})\n")
+        return more
+
+    def pages(self, title="System State", view=VIEW_FULL, top=10, resource_page=0):
+        """Yield rendered pages one at a time; nothing past the current page is formatted"""
+        page = 0
+        more = True
+        while more:
+            text, more = self._render(title, view, page, top, resource_page)
+            yield text
+            page += 1
+
+    def print(self, title="System State", view=VIEW_FULL, page=0, top=10, resource_page=0, out=None):
+        """Write one page with a single call to the output stream"""
+        (out or sys.stdout).write(self.render(title, view, page, top, resource_page))
+
+
+def browse_state(simulator, page_size=20, max_resources=8):
+    """Interactive pager over the views of a large system"""
+    renderer = StateRenderer(simulator, page_size, max_resources)
+    view, page, resource_page, top = VIEW_FULL, 0, 0, 10
+    keys = {"f": VIEW_FULL, "t": VIEW_TOP, "b": VIEW_BLOCKED, "d": VIEW_DEADLOCKED, "u": VIEW_UTILISATION}
+    while True:
+        renderer.print(view=view, page=page, top=top, resource_page=resource_page)
+        choice = input("\n[n]ext [p]rev [>]/[<] resources | views: [f]ull [t]op [b]locked "
+                       "[d]eadlocked [u]tilisation | [q]uit: ").strip().lower()
+        if choice == "q":
+            return
+        if choice == "n":
+            page += 1
+        elif choice == "p":
+            page = max(0, page - 1)
+        elif choice == ">":
+            if (resource_page + 1) * max_resources < simulator.num_resources:
+                resource_page += 1
+        elif choice == "<":
+            resource_page = max(0, resource_page - 1)
+        elif choice in keys:
+            view, page = keys[choice], 0
+            if view == VIEW_TOP:
+                try:
+                    top = int(input("How many processes? ") or top)
+                except ValueError:
+                    print("❌ Invalid number, keeping the previous value")
+        else:
+            print("❌ Invalid choice!")
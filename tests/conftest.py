@@ -0,0 +1,58 @@
+"""Shared helpers: the modules live at the repository root, next to this directory"""
+
+import itertools
+import operator
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlock_simulator import DeadlockDetectionSimulator, random_system  # noqa: E402
+
+
+def build_simulator(available, max_need, allocation, engine="worklist"):
+    """A list-backed simulator holding copies of the given matrices"""
+    simulator = DeadlockDetectionSimulator(engine=engine)
+    simulator.num_processes = len(max_need)
+    simulator.num_resources = len(available)
+    simulator.available = list(available)
+    simulator.max_need = [list(row) for row in max_need]
+    simulator.allocation = [list(row) for row in allocation]
+    simulator.calculate_need()
+    return simulator
+
+
+def random_systems(count, max_processes=7, max_resources=4, seed=0, max_value=10):
+    """Yield `count` random (available, max_need, allocation) systems"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield random_system(rng, rng.randint(1, max_processes), rng.randint(1, max_resources), max_value)
+
+
+def need_of(max_need, allocation):
+    return [list(map(operator.sub, m, a)) for m, a in zip(max_need, allocation)]
+
+
+def brute_force_safe(available, allocation, need):
+    """Safety by trying every order of the processes (small systems only)"""
+    le = operator.le
+    for order in itertools.permutations(range(len(need))):
+        work = list(available)
+        for i in order:
+            if not all(map(le, need[i], work)):
+                break
+            work = list(map(operator.add, work, allocation[i]))
+        else:
+            return True
+    return False
+
+
+@pytest.fixture
+def example_safe():
+    """Example 1 of the predefined examples (the textbook safe state)"""
+    return ([3, 3, 2],
+            [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]],
+            [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]])
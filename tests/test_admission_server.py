@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from admission_server import AdmissionServer, run_load
+from conftest import build_simulator
+from deadlock_simulator import SafetyTracer
+
+
+class RequestLog(SafetyTracer):
+    def __init__(self):
+        self.requests = []
+
+    def request_started(self, pid, request):
+        self.requests.append((pid, list(request)))
+
+
+def _serve(simulator, client):
+    async def main():
+        server = AdmissionServer(simulator)
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return await client(port)
+    return asyncio.run(main())
+
+
+def test_invalid_utf8_gets_an_error_reply(example_safe):
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"REQ 1 \xff\xfe 0\nSTATE\n")
+        replies = [await reader.readline(), await reader.readline()]
+        writer.close()
+        return replies
+
+    replies = _serve(build_simulator(*example_safe), client)
+    assert replies[0].startswith(b"ERR")
+    assert replies[1].startswith(b"OK ")
+
+
+def test_load_honors_processes_and_resources(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.tracer = log = RequestLog()
+
+    async def client(port):
+        return await run_load(port=port, clients=4, requests=20, num_processes=2, num_resources=1)
+
+    result = _serve(simulator, client)
+    assert result["requests"] == 80
+    assert {pid for pid, _ in log.requests} <= {0, 1}
+    assert all(not any(request[1:]) for _, request in log.requests)
+
+
+def test_load_rejects_more_processes_than_the_server_has(example_safe):
+    async def client(port):
+        return await run_load(port=port, clients=1, requests=1, num_processes=50)
+
+    with pytest.raises(ValueError):
+        _serve(build_simulator(*example_safe), client)
+
+
+def test_other_commands_flush_pending_requests_first(example_safe):
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"REQ 1 1 0 2\nSTATE\n")
+        replies = [await reader.readline(), await reader.readline()]
+        writer.close()
+        return replies
+
+    simulator = build_simulator(*example_safe)
+    server = AdmissionServer(simulator, window=10.0)     # only a flush can answer in time
+    flushed = []
+    original = server._flush
+    server._flush = lambda: flushed.append(True) or original()
+
+    async def main():
+        listener = await server.start(port=0)
+        async with listener:
+            return await asyncio.wait_for(client(listener.sockets[0].getsockname()[1]), 5)
+
+    replies = asyncio.run(main())
+    assert replies[0] == b"GRANT\n"
+    assert b'"available":[2,3,0]' in replies[1]
+    assert flushed
+
+
+def test_cancelled_batch_resolves_with_an_error(example_safe):
+    async def main():
+        server = AdmissionServer(build_simulator(*example_safe))
+        loop = asyncio.get_running_loop()
+        pending = [loop.create_future(), loop.create_future()]
+        pending[1].cancel()
+        executor_future = loop.create_future()
+        executor_future.cancel()
+        server._resolve([(0, [0, 0, 0], pending[0]), (1, [0, 0, 0], pending[1])], executor_future)
+        return pending[0].result()
+
+    assert asyncio.run(main()).startswith("ERR")
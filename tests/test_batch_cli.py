@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import batch_cli
+import benchmark
+from conftest import build_simulator
+from snapshot_io import save_snapshot
+
+
+def _run(capsys, argv):
+    status = batch_cli.main(argv)
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return status, lines
+
+
+@pytest.fixture
+def snapshot(example_safe, tmp_path):
+    path = str(tmp_path / "state.bin")
+    save_snapshot(build_simulator(*example_safe), path)
+    return path
+
+
+def test_bench_choices_match_benchmark_module():
+    assert set(batch_cli.BENCH_GENERATORS) == set(benchmark.GENERATORS)
+    assert set(batch_cli.BENCH_OPERATIONS) == set(benchmark.OPERATIONS)
+
+
+def test_check_truncated_binary_is_an_error(capsys, snapshot):
+    with open(snapshot, "r+b") as f:
+        f.truncate(10)
+    status, lines = _run(capsys, ["check", snapshot])
+    assert status == batch_cli.EXIT_ERROR
+    assert "error" in lines[0]
+
+
+@pytest.mark.parametrize("content", [
+    b'{"available": 5, "max_need": [[1]], "allocation": [[0]]}',
+    b"\xff\xfe\x00garbage",
+])
+def test_check_malformed_json_is_an_error(capsys, tmp_path, content):
+    path = tmp_path / "state.json"
+    path.write_bytes(content)
+    status, lines = _run(capsys, ["check", str(path)])
+    assert status == batch_cli.EXIT_ERROR
+    assert "error" in lines[0]
+
+
+@pytest.mark.parametrize("line", ['[1, 2]', '{"pid": 1, "request": 5}', '{"pid": null, "request": [1]}'])
+def test_request_malformed_request_file_is_an_error(capsys, tmp_path, snapshot, line):
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text(line + "\n")
+    status, lines = _run(capsys, ["request", snapshot, "--requests", str(requests)])
+    assert status == batch_cli.EXIT_ERROR
+    assert "error" in lines[0]
+
+
+def test_request_creates_save_dir(capsys, tmp_path, snapshot):
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text('{"pid": 1, "request": [1, 0, 2]}\n')
+    save_dir = tmp_path / "out" / "states"
+    status, lines = _run(capsys, ["request", snapshot, "--requests", str(requests), "--save-dir", str(save_dir)])
+    assert status == batch_cli.EXIT_OK
+    assert lines[0]["granted"] == [0]
+    assert (save_dir / "state.bin").exists()
+
+
+def test_bench_unknown_generator_is_a_usage_error():
+    with pytest.raises(SystemExit) as exc:
+        batch_cli.main(["bench", "--generators", "foo"])
+    assert exc.value.code == batch_cli.EXIT_ERROR
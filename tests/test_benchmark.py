@@ -0,0 +1,67 @@
+import pytest
+
+import benchmark
+
+
+def _run(*cases):
+    """A run holding one result per (generator, operation, min_seconds)"""
+    return {"meta": {}, "results": [
+        {"generator": generator, "num_processes": 100, "num_resources": 10, "engine": "worklist",
+         "operation": operation, "min_seconds": seconds}
+        for generator, operation, seconds in cases]}
+
+
+def test_slowdown_above_the_threshold_is_a_regression():
+    baseline = _run(("safe", "safety_algorithm", 0.010), ("safe", "detect_deadlock", 0.010))
+    current = _run(("safe", "safety_algorithm", 0.012), ("safe", "detect_deadlock", 0.0105))
+    regressions = benchmark.compare_results(baseline, current, threshold=0.10)
+    assert [(r["operation"], old) for r, old, _ in regressions] == [("safety_algorithm", 0.010)]
+    assert regressions[0][2] == pytest.approx(1.2)
+
+
+def test_speedups_and_equal_timings_are_not_regressions():
+    baseline = _run(("safe", "safety_algorithm", 0.010), ("dense", "safety_algorithm", 0.010))
+    current = _run(("safe", "safety_algorithm", 0.005), ("dense", "safety_algorithm", 0.010))
+    assert benchmark.compare_results(baseline, current) == []
+
+
+def test_differences_below_the_floor_are_noise():
+    baseline = _run(("safe", "calculate_need", 0.0001))
+    current = _run(("safe", "calculate_need", 0.0003))
+    assert benchmark.compare_results(baseline, current) == []
+    assert len(benchmark.compare_results(baseline, current, floor=0.0001)) == 1
+
+
+def test_regressions_are_sorted_worst_first_and_unmatched_cases_skipped():
+    baseline = _run(("safe", "safety_algorithm", 0.010), ("dense", "safety_algorithm", 0.010),
+                    ("sparse", "safety_algorithm", 0.0))
+    current = _run(("safe", "safety_algorithm", 0.015), ("dense", "safety_algorithm", 0.030),
+                   ("sparse", "safety_algorithm", 0.001), ("unsafe", "safety_algorithm", 9.0))
+    regressions = benchmark.compare_results(baseline, current)
+    assert [r["generator"] for r, _, _ in regressions] == ["sparse", "dense", "safe"]
+    assert regressions[0][2] == float("inf")
+
+
+def test_cases_are_matched_by_engine_too():
+    baseline = _run(("safe", "safety_algorithm", 0.010))
+    current = _run(("safe", "safety_algorithm", 0.050))
+    current["results"][0]["engine"] = "scan"
+    assert benchmark.compare_results(baseline, current) == []
+
+
+def test_a_run_compares_clean_against_itself():
+    run = benchmark.run_benchmarks(grid=[(20, 3)], generators=["safe", "unsafe"],
+                                   operations=("safety_algorithm", "request_resources"), repeat=1, requests=3)
+    assert len(run["results"]) == 4
+    assert benchmark.compare_results(run, run) == []
+
+
+@pytest.mark.parametrize("engine", ["worklist", "scan"])
+def test_adversarial_systems_are_always_timed_on_the_scan_engine(engine):
+    run = benchmark.run_benchmarks(grid=[(30, 2)], generators=["adversarial"], engine=engine,
+                                   operations=("safety_algorithm", "request_resources"), repeat=1, requests=2)
+    cases = [(r["engine"], r["operation"]) for r in run["results"]]
+    expected = [(engine, "safety_algorithm"), (engine, "request_resources")]
+    if engine != "scan":
+        expected.append(("scan", "safety_algorithm"))
+    assert cases == expected
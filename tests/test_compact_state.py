@@ -0,0 +1,35 @@
+import random
+
+from compact_state import CompactState
+from conftest import build_simulator, random_systems
+
+
+def test_compact_simulator_tracks_list_simulator():
+    rng = random.Random(13)
+    for available, max_need, allocation in random_systems(30, max_processes=8, seed=13):
+        lists = build_simulator(available, max_need, allocation)
+        compact = CompactState.from_lists(available, max_need, allocation).to_simulator(engine="worklist")
+        compact.calculate_need()
+        m = len(available)
+        for _ in range(30):
+            pid = rng.randrange(lists.num_processes)
+            if rng.random() < 0.6:
+                request = [rng.randint(0, 2) for _ in range(m)]
+                assert compact.request_resources(pid, request) == lists.request_resources(pid, request)
+            else:
+                release = [rng.randint(0, v) for v in lists.allocation[pid]]
+                assert compact.release_resources(pid, release) == lists.release_resources(pid, release)
+            compact.calculate_need()
+            lists.calculate_need()
+            assert compact.max_need.tolist() == lists.max_need
+            assert compact.need.tolist() == lists.need
+            assert compact.safety_algorithm() == lists.safety_algorithm()
+
+
+def test_calculate_need_keeps_the_compact_buffers(example_safe):
+    simulator = CompactState.from_lists(*example_safe).to_simulator()
+    need = simulator.need
+    simulator.calculate_need()
+    assert simulator.need is need
+    simulator.request_resources(1, [1, 0, 2])
+    assert simulator.max_need[1] == [3, 2, 2]
@@ -0,0 +1,60 @@
+import random
+
+from conftest import build_simulator
+from deadlock_simulator import random_system, replay_safe_sequence
+
+
+def _blocks(rng, groups, processes, resources):
+    """A system whose processes only claim resources of their own group"""
+    available, max_need, allocation = [], [], []
+    for _ in range(groups):
+        a, mx, al = random_system(rng, processes, resources, max_value=6)
+        available += a
+        offset = len(max_need and max_need[0])
+        for rows, block in ((max_need, mx), (allocation, al)):
+            for row in rows:
+                row.extend([0] * resources)
+            for row in block:
+                rows.append([0] * offset + row)
+    return available, max_need, allocation
+
+
+def test_components_agree_with_whole_system_checks():
+    rng = random.Random(6)
+    for _ in range(20):
+        available, max_need, allocation = _blocks(rng, rng.randint(1, 4), rng.randint(1, 4), rng.randint(1, 3))
+        whole = build_simulator(available, max_need, allocation)
+        split = build_simulator(available, max_need, allocation)
+        split.enable_components()
+        m = len(available)
+        for _ in range(40):
+            pid = rng.randrange(whole.num_processes)
+            op = rng.random()
+            if op < 0.5:
+                request = [rng.randint(0, 2) for _ in range(m)]
+                assert split.request_resources(pid, request) == whole.request_resources(pid, request)
+            elif op < 0.8:
+                release = [rng.randint(0, v) for v in whole.allocation[pid]]
+                whole.release_resources(pid, release)
+                split.release_resources(pid, release)
+            elif op < 0.9:
+                whole.exit_process(pid)
+                split.exit_process(pid)
+            else:
+                claim = [rng.randint(0, 3) if rng.random() < 0.3 else 0 for _ in range(m)]
+                whole.add_process(claim)
+                split.add_process(claim)
+            is_safe, order = split.safety_algorithm()
+            assert is_safe == whole.safety_algorithm()[0]
+            if is_safe:
+                assert replay_safe_sequence(split.available, split.allocation, split.need,
+                                            [int(label[1:]) for label in order])
+
+
+def test_component_count():
+    rng = random.Random(7)
+    available, max_need, allocation = _blocks(rng, 3, 2, 2)
+    max_need = [[v or (1 if j // 2 == i // 2 else 0) for j, v in enumerate(row)] for i, row in enumerate(max_need)]
+    simulator = build_simulator(available, max_need, allocation)
+    simulator.enable_components()
+    assert simulator.components.stats()["components"] == 3
@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+from concurrent_allocator import ConcurrentBankersAllocator
+
+
+def test_negative_request_is_rejected(example_safe):
+    available, max_need, allocation = example_safe
+    allocator = ConcurrentBankersAllocator(available, max_need, allocation)
+    with pytest.raises(ValueError):
+        allocator.acquire(1, [-2, 0, 0])
+    assert list(allocator.snapshot()[0]) == available
+
+
+def test_threads_never_leave_an_unsafe_state(example_safe):
+    available, max_need, allocation = example_safe
+    allocator = ConcurrentBankersAllocator(available, max_need, allocation)
+
+    def worker(pid):
+        need = [m - a for m, a in zip(max_need[pid], allocation[pid])]
+        request = [1 if j == need.index(max(need)) else 0 for j in range(len(need))]
+        for _ in range(50):
+            if allocator.try_acquire(pid, request):
+                allocator.release(pid, request)
+
+    threads = [threading.Thread(target=worker, args=(pid,)) for pid in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert list(allocator.snapshot()[0]) == available
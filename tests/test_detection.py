@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from conftest import build_simulator
+from detection import detect_deadlocked, detect_wait_for_deadlock
+
+
+def brute_force_deadlocked(available, allocation, request):
+    """
+    Explore every order of finishing processes: a process holding resources
+    is deadlocked when no reachable set of finished processes includes it
+    """
+    n = len(allocation)
+    best = frozenset()
+    seen = set()
+    stack = [frozenset()]
+    while stack:
+        finished = stack.pop()
+        if finished in seen:
+            continue
+        seen.add(finished)
+        best = max(best, finished, key=len)
+        work = list(available)
+        for i in finished:
+            work = [w + a for w, a in zip(work, allocation[i])]
+        for i in range(n):
+            if i not in finished and all(r <= w for r, w in zip(request[i], work)):
+                stack.append(finished | {i})
+    return [i for i in range(n) if i not in best and any(allocation[i])]
+
+
+def random_single_instance(rng):
+    n, m = rng.randint(1, 6), rng.randint(1, 5)
+    allocation = [[0] * m for _ in range(n)]
+    available = [0] * m
+    for j in range(m):
+        kind = rng.random()
+        if kind < 0.6:
+            allocation[rng.randrange(n)][j] = 1
+        elif kind < 0.9:
+            available[j] = 1
+        # otherwise the resource type has no instance at all
+    request = [[rng.choice((0, 0, 1, 1, 2)) if rng.random() < 0.4 else 0 for _ in range(m)]
+               for _ in range(n)]
+    return available, allocation, request
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_both_modes_match_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        available, allocation, request = random_single_instance(rng)
+        expected = brute_force_deadlocked(available, allocation, request)
+        assert detect_deadlocked(available, allocation, request) == expected
+        deadlocked, cycles = detect_wait_for_deadlock(allocation, request, available)
+        assert deadlocked == expected
+        for cycle in cycles:
+            assert set(cycle) <= set(expected)
+
+
+def test_self_request_and_missing_resource_agree():
+    # P0 asks for a second instance of the R0 it holds; P1 asks for R1, which has no instance
+    available = [0, 0]
+    allocation = [[1, 0], [0, 0], [0, 0]]
+    for request, expected in (([[1, 0], [0, 0], [0, 0]], [0]),
+                              ([[0, 1], [0, 0], [0, 0]], [0]),
+                              ([[0, 0], [1, 0], [0, 0]], [])):
+        assert detect_deadlocked(available, allocation, request) == expected
+        assert detect_wait_for_deadlock(allocation, request, available) == (expected, [])
+
+
+def test_find_deadlocked_modes_agree():
+    # Classic circular wait: P0 holds R0 and wants R1, P1 holds R1 and wants R0
+    simulator = build_simulator([0, 0, 1], [[1, 1, 0], [1, 1, 0], [0, 0, 1]],
+                                [[1, 0, 0], [0, 1, 0], [0, 0, 0]])
+    graph = simulator.find_deadlocked(mode="graph")
+    assert simulator.find_deadlocked(mode="matrix")[0] == graph[0] == ["P0", "P1"]
+    assert graph[1] == [["P0", "P1"]]
+    assert simulator.find_deadlocked()[0] == ["P0", "P1"]
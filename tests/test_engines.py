@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import brute_force_safe, need_of, random_systems
+from deadlock_simulator import (cross_check_engines, get_engine, replay_safe_sequence,
+                                scan_safety, worklist_safety)
+
+ENGINES = ["scan", "worklist", "sparse", "numpy"]
+
+
+def _engine(name):
+    if name == "numpy":
+        pytest.importorskip("numpy")
+    return get_engine(name)
+
+
+@pytest.mark.parametrize("name", ENGINES)
+def test_engine_matches_brute_force(name):
+    engine = _engine(name)
+    for available, max_need, allocation in random_systems(300, max_processes=6, seed=1):
+        need = need_of(max_need, allocation)
+        is_safe, order = engine(available, allocation, need)
+        assert is_safe == brute_force_safe(available, allocation, need)
+        if is_safe:
+            assert replay_safe_sequence(available, allocation, need, order)
+        else:
+            assert order == []
+
+
+@pytest.mark.parametrize("name", ["worklist", "sparse"])
+def test_worklist_engines_give_the_scan_sequence(name):
+    engine = _engine(name)
+    for available, max_need, allocation in random_systems(300, max_processes=12, seed=2):
+        need = need_of(max_need, allocation)
+        assert engine(available, allocation, need) == scan_safety(available, allocation, need)
+
+
+def test_sparse_engine_on_sparse_state():
+    from sparse_state import SparseState, sparse_safety
+
+    for available, max_need, allocation in random_systems(200, max_processes=12, max_resources=8, seed=3):
+        max_need = [[v if v % 3 == 0 else 0 for v in row] for row in max_need]
+        allocation = [[min(a, m) for a, m in zip(arow, mrow)] for arow, mrow in zip(allocation, max_need)]
+        state = SparseState.from_lists(available, max_need, allocation)
+        need = need_of(max_need, allocation)
+        assert state.need.tolist() == need
+        assert sparse_safety(state.available, state.allocation, state.need) == \
+            worklist_safety(available, allocation, need)
+
+
+def test_cross_check_engines_finds_no_mismatch():
+    assert cross_check_engines(trials=200, seed=4) == []
+
+
+def test_example_one_sequence(example_safe):
+    available, max_need, allocation = example_safe
+    need = need_of(max_need, allocation)
+    for name in ("scan", "worklist", "sparse"):
+        assert get_engine(name)(available, allocation, need) == (True, [1, 3, 0, 2, 4])
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        get_engine("nope")
@@ -0,0 +1,60 @@
+import json
+
+import batch_cli
+from compact_state import CompactState
+from conftest import build_simulator
+from event_replay import OP_DETECT, replay_events, replay_log
+from snapshot_io import load_snapshot, save_snapshot
+
+EVENTS = [
+    ("request", 0, [1, 0, 2]),
+    ("arrive", 5, [2, 2, 2]),
+    ("request", 5, [1, 1, 1]),
+    ("release", 0, [1, 0, 2]),
+    ("exit", 3, []),
+    ("arrive", 6, [1, 1, 1]),     # reuses P3's row
+    ("request", 6, [1, 0, 0]),
+]
+
+
+def _outcomes(simulator):
+    return [outcome for _, _, outcome in replay_events(simulator, EVENTS)]
+
+
+def test_replay_with_arrivals_on_compact_state(example_safe):
+    lists = build_simulator(*example_safe)
+    compact = CompactState.from_lists(*example_safe).to_simulator(engine="worklist")
+    assert _outcomes(compact) == _outcomes(lists)
+    assert compact.num_processes == lists.num_processes == 6
+    assert [list(r) for r in compact.allocation] == lists.allocation
+    assert [list(r) for r in compact.max_need] == lists.max_need
+    assert list(compact.available) == lists.available
+
+
+def test_replay_binary_snapshot(example_safe, tmp_path):
+    snapshot = str(tmp_path / "state.bin")
+    save_snapshot(build_simulator(*example_safe), snapshot)
+    log = tmp_path / "events.jsonl"
+    log.write_text("".join(json.dumps({"op": op, "pid": pid, "vector": vector}) + "\n"
+                           for op, pid, vector in EVENTS))
+
+    summary = replay_log(load_snapshot(snapshot), str(log))
+    assert summary["outcomes"]["arrived"] == 2
+    assert summary["outcomes"] == replay_log(build_simulator(*example_safe), str(log))["outcomes"]
+    assert batch_cli.main(["--engine", "worklist", "replay", snapshot, str(log)]) == batch_cli.EXIT_OK
+
+
+def _detections(events):
+    # P0 and P1 each hold one R0 and Available is empty
+    simulator = build_simulator([0, 0], [[2, 0], [2, 5]], [[1, 0], [1, 0]])
+    return [outcome for op, _, outcome in replay_events(simulator, events, detect_every=1)
+            if op == OP_DETECT]
+
+
+def test_invalid_request_does_not_wait():
+    assert _detections([("request", 0, [1, 0]), ("request", 1, [-1, 5])]) == []
+
+
+def test_invalid_request_keeps_the_earlier_wait():
+    assert _detections([("request", 0, [1, 0]), ("request", 1, [1, 0]),
+                        ("request", 1, [-1, 0])]) == [[0, 1], [0, 1]]
@@ -0,0 +1,41 @@
+import random
+
+from conftest import build_simulator, random_systems
+
+
+def _safe_with(simulator, pid, request):
+    return simulator.is_request_safe(pid, request)[0]
+
+
+def test_max_grantable_is_tight():
+    rng = random.Random(8)
+    for available, max_need, allocation in random_systems(150, max_processes=7, seed=8):
+        simulator = build_simulator(available, max_need, allocation)
+        pid = rng.randrange(simulator.num_processes)
+        result = simulator.max_grantable(pid)
+        m = simulator.num_resources
+        if not result["safe_state"]:
+            assert not simulator.safety_algorithm()[0]
+            continue
+        for j, amount in enumerate(result["max_per_resource"]):
+            alone = [0] * m
+            alone[j] = amount
+            assert _safe_with(simulator, pid, alone)
+            if amount < result["limits"][j]:
+                alone[j] = amount + 1
+                assert not _safe_with(simulator, pid, alone)
+        frontier = result["frontier"]
+        assert _safe_with(simulator, pid, frontier)
+        for j in range(m):
+            if frontier[j] < result["limits"][j]:
+                more = list(frontier)
+                more[j] += 1
+                assert not _safe_with(simulator, pid, more)
+        assert result["box_safe"] == _safe_with(simulator, pid, result["max_per_resource"])
+
+
+def test_max_grantable_leaves_state_untouched(example_safe):
+    simulator = build_simulator(*example_safe)
+    before = (list(simulator.available), [list(r) for r in simulator.allocation])
+    simulator.max_grantable(1)
+    assert (simulator.available, simulator.allocation) == before
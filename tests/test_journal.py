@@ -0,0 +1,108 @@
+import os
+import random
+import subprocess
+import sys
+import textwrap
+import time
+
+import journal
+from conftest import build_simulator, random_systems
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _state(simulator):
+    return (list(simulator.available), [list(r) for r in simulator.allocation],
+            [list(r) for r in simulator.max_need], [list(r) for r in simulator.need])
+
+
+def _random_operations(simulator, rng, count):
+    m = simulator.num_resources
+    for _ in range(count):
+        pid = rng.randrange(simulator.num_processes)
+        op = rng.random()
+        if op < 0.5:
+            simulator.request_resources(pid, [rng.randint(0, 2) for _ in range(m)])
+        elif op < 0.7:
+            simulator.release_resources(pid, [rng.randint(0, v) for v in simulator.allocation[pid]])
+        elif op < 0.8:
+            simulator.exit_process(pid)
+        elif op < 0.9:
+            simulator.add_process([rng.randint(0, 4) for _ in range(m)])
+        elif op < 0.95:
+            simulator.admit_batch([(rng.randrange(simulator.num_processes), [rng.randint(0, 1)] * m, 0)
+                                   for _ in range(3)])
+        elif not any(simulator.allocation[pid]):
+            simulator.add_process([rng.randint(0, 4) for _ in range(m)], pid)
+
+
+def test_restore_matches_the_live_state(tmp_path):
+    rng = random.Random(12)
+    for k, system in enumerate(random_systems(15, max_processes=10, seed=12)):
+        directory = str(tmp_path / str(k))
+        simulator = build_simulator(*system)
+        simulator.enable_journal(directory, checkpoint_every=rng.choice([7, 60, 10_000]),
+                                 sync_every=rng.choice([1, 16, 10_000]))
+        _random_operations(simulator, rng, 250)
+        simulator.journal.sync()
+        restored = journal.restore(directory)
+        assert _state(restored) == _state(simulator)
+        restored.disable_journal()
+        simulator.disable_journal()
+        assert len(os.listdir(directory)) == 2      # one checkpoint and its journal
+
+
+def test_torn_tail_is_cut_off(tmp_path):
+    directory = str(tmp_path)
+    simulator = build_simulator([5, 5], [[3, 3], [2, 2]], [[0, 0], [0, 0]])
+    simulator.enable_journal(directory)
+    simulator.request_resources(0, [1, 1])
+    simulator.disable_journal()
+    path = os.path.join(directory, journal.JOURNAL_NAME.format(1))
+    with open(path, "ab") as f:
+        f.write(b"\x01\x00\x00")
+    restored = journal.restore(directory)
+    assert restored.journal.recovery["discarded_bytes"] == 3
+    assert _state(restored) == _state(simulator)
+    restored.request_resources(1, [1, 0])
+    restored.disable_journal()
+    assert journal.restore(directory).allocation == [[1, 1], [1, 0]]
+
+
+def test_idle_batch_is_synced_after_the_interval(tmp_path):
+    directory = str(tmp_path)
+    simulator = build_simulator([3, 3], [[2, 2], [2, 2]], [[0, 0], [0, 0]])
+    log = simulator.enable_journal(directory, sync_interval=0.05)
+    simulator.request_resources(0, [1, 1])
+    simulator.request_resources(1, [1, 0])
+    time.sleep(0.5)
+    assert log.stats()["pending"] == 0
+    assert journal.restore(directory).allocation == [[1, 1], [1, 0]]
+    simulator.disable_journal()
+
+
+def test_killed_process_loses_at_most_the_sync_interval(tmp_path):
+    directory = str(tmp_path)
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {ROOT!r})
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+        from conftest import build_simulator
+        simulator = build_simulator([3, 3], [[2, 2], [2, 2]], [[0, 0], [0, 0]])
+        simulator.enable_journal({directory!r}, sync_interval=0.05)
+        simulator.request_resources(0, [1, 1])
+        simulator.request_resources(1, [1, 0])
+        print("granted", flush=True)
+        time.sleep(60)
+    """)
+    child = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+    try:
+        assert child.stdout.readline().strip() == "granted"
+        time.sleep(0.5)
+    finally:
+        child.kill()
+        child.wait()
+    restored = journal.restore(directory)
+    assert restored.allocation == [[1, 1], [1, 0]]
+    assert restored.available == [1, 2]
+    restored.disable_journal()
@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+from conftest import build_simulator
+from metrics import MetricsTracer
+
+
+def test_admit_batch_is_counted(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.tracer = tracer = MetricsTracer()
+    requests = [(1, [1, 0, 2]), (0, [8, 0, 0]), (9, [0, 0, 0]), (4, [3, 3, 0]), (0, [0, 2, 0]), (0, [0, 3, 0])]
+    result = simulator.admit_batch(requests)
+    assert tracer.requests_granted == len(result["granted"])
+    assert sum(tracer.requests_denied.values()) == len(result["denied"])
+    for reason in set(result["denied"].values()):
+        assert tracer.requests_denied[reason] == list(result["denied"].values()).count(reason)
+    assert tracer.request_seconds.count == len(requests)
+
+
+def test_admit_batch_dry_run_is_not_counted(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.tracer = tracer = MetricsTracer()
+    simulator.admit_batch([(1, [1, 0, 2])], apply=False)
+    assert tracer.requests_granted == 0 and tracer.request_seconds.count == 0
+
+
+def test_numpy_engine_reports_rounds(example_safe):
+    pytest.importorskip("numpy")
+
+    class NoPerProcess(MetricsTracer):
+        def process_ready(self, pid, need, work):
+            raise AssertionError("per-process hook called")
+
+    simulator = build_simulator(*example_safe, engine="numpy")
+    simulator.tracer = tracer = NoPerProcess()
+    assert simulator.safety_algorithm()[0]
+    assert tracer.safety_checks == 1
+    assert tracer.iterations >= 1
+    assert tracer.comparisons >= len(example_safe[1])
+
+
+def test_profiler_stops_when_detection_raises(example_safe):
+    def broken(available, allocation, need, tracer=None):
+        raise RuntimeError("engine failed")
+
+    simulator = build_simulator(*example_safe, engine=broken)
+    simulator.tracer = tracer = MetricsTracer(profile=True)
+    with pytest.raises(RuntimeError):
+        simulator.detect_deadlock()
+    assert sys.getprofile() is None
+    simulator.engine = "worklist"
+    assert simulator.detect_deadlock()[0]
+    assert tracer.detections == 1 and tracer.detection_seconds.count == 1
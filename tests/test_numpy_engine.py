@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from conftest import build_simulator, random_systems  # noqa: E402
+from numpy_engine import NumpyBankersState  # noqa: E402
+
+
+def _arrays(state):
+    return [state.available.copy(), state.allocation.copy(), state.need.copy()]
+
+
+def _assert_unchanged(state, before):
+    for array, saved in zip(_arrays(state), before):
+        assert array.dtype == saved.dtype
+        assert np.array_equal(array, saved)
+
+
+def test_requests_match_the_list_simulator():
+    rng = random.Random(4)
+    for available, max_need, allocation in random_systems(100, max_processes=8, seed=4):
+        state = NumpyBankersState(available, max_need, allocation)
+        simulator = build_simulator(available, max_need, allocation)
+        for _ in range(10):
+            pid = rng.randrange(len(max_need))
+            request = [rng.randint(0, 3) for _ in available]
+            assert state.request_resources(pid, request) == simulator.request_resources(pid, request)
+            assert state.available.tolist() == simulator.available
+            assert state.allocation.tolist() == simulator.allocation
+            assert state.need.tolist() == simulator.need
+
+
+def test_granted_request_updates_the_state(example_safe):
+    state = NumpyBankersState(*example_safe)
+    assert state.request_resources(1, [1, 0, 2])
+    assert state.available.tolist() == [2, 3, 0]
+    assert state.allocation[1].tolist() == [3, 0, 2]
+    assert state.need[1].tolist() == [0, 2, 0]
+
+
+def test_unsafe_request_is_rolled_back(example_safe):
+    state = NumpyBankersState(*example_safe)
+    state.request_resources(1, [1, 0, 2])
+    before = _arrays(state)
+    assert not state.request_resources(0, [0, 2, 0])
+    _assert_unchanged(state, before)
+
+
+@pytest.mark.parametrize("pid, vector", [(1, [2, 0, 0]), (0, [4, 0, 0]), (4, [3, 3, 3])])
+def test_invalid_request_leaves_the_state_alone(example_safe, pid, vector):
+    state = NumpyBankersState(*example_safe)
+    before = _arrays(state)
+    assert not state.request_resources(pid, vector)
+    _assert_unchanged(state, before)
+
+
+@pytest.mark.parametrize("available, max_need, allocation", [
+    ([1, 1], [[1, 1]], [[1]]),
+    ([1], [[1, 1]], [[0, 0]]),
+    ([-1, 0], [[1, 1]], [[0, 0]]),
+    ([1, 1], [[1, 1]], [[2, 0]]),
+])
+def test_malformed_state_raises_value_error(available, max_need, allocation):
+    with pytest.raises(ValueError):
+        NumpyBankersState(available, max_need, allocation)
+
+
+def test_simulator_round_trip(example_safe):
+    state = NumpyBankersState.from_simulator(build_simulator(*example_safe))
+    simulator = state.to_simulator()
+    assert simulator.engine == "numpy"
+    assert simulator.detect_deadlock() == (True, ["P1", "P3", "P0", "P2", "P4"])
+    assert simulator.need == state.need.tolist()
@@ -0,0 +1,79 @@
+import itertools
+import operator
+
+import pytest
+
+from conftest import brute_force_safe, build_simulator, need_of, random_systems
+from deadlock_simulator import replay_safe_sequence
+from recovery import plan_recovery
+
+
+def _cheapest_by_brute_force(available, allocation, need, costs):
+    """Cheapest set of terminated victims leaving the others safe"""
+    n = len(need)
+    best = None
+    for size in range(n + 1):
+        for victims in itertools.combinations(range(n), size):
+            work = list(available)
+            for v in victims:
+                work = [w + a for w, a in zip(work, allocation[v])]
+            rest = [i for i in range(n) if i not in victims]
+            if brute_force_safe(work, [allocation[i] for i in rest], [need[i] for i in rest]):
+                cost = sum(costs[v] for v in victims)
+                if best is None or cost < best:
+                    best = cost
+    return best
+
+
+def test_exact_plan_is_optimal():
+    for k, (available, max_need, allocation) in enumerate(random_systems(150, max_processes=6, seed=9)):
+        need = need_of(max_need, allocation)
+        costs = [1 + (k * 7 + i * 3) % 5 for i in range(len(need))]
+        plan = plan_recovery(available, allocation, need, costs, exact=True, time_budget=5.0)
+        assert plan["optimal"]
+        assert plan["cost"] == _cheapest_by_brute_force(available, allocation, need, costs)
+
+
+def test_terminate_leaves_a_safe_system():
+    for available, max_need, allocation in random_systems(150, max_processes=7, seed=10):
+        simulator = build_simulator(available, max_need, allocation)
+        if simulator.safety_algorithm()[0]:
+            continue
+        plan = simulator.plan_recovery(action="terminate", exact=True)
+        simulator.recover(plan)
+        assert simulator.safety_algorithm()[0]
+        # Terminated victims hold and need nothing, so they fit anywhere in the plan's order
+        order = [int(label[1:]) for label in plan["safe_sequence"] + plan["victims"]]
+        assert replay_safe_sequence(simulator.available, simulator.allocation, simulator.need, order)
+
+
+def test_preempt_leaves_a_safe_system():
+    planned = 0
+    for available, max_need, allocation in random_systems(200, max_processes=7, seed=11):
+        simulator = build_simulator(available, max_need, allocation)
+        if simulator.safety_algorithm()[0]:
+            continue
+        total = [sum(column) for column in zip(available, *allocation)]
+        fits = all(all(map(operator.le, row, total)) for row in max_need)
+        if not fits:
+            with pytest.raises(ValueError):
+                simulator.plan_recovery(action="preempt")
+            continue
+        plan = simulator.plan_recovery(action="preempt", exact=True)
+        simulator.recover(plan)
+        planned += 1
+        assert simulator.safety_algorithm()[0]
+        order = [int(label[1:]) for label in plan["safe_sequence"]]
+        assert replay_safe_sequence(simulator.available, simulator.allocation, simulator.need, order)
+    assert planned
+
+
+def test_preempt_rejects_claims_beyond_the_total():
+    # Example 2: P1 claims 2 of R1 but only 1 exists
+    simulator = build_simulator([0, 0, 1], [[2, 1, 2], [1, 2, 1], [2, 1, 2]],
+                                [[2, 0, 1], [0, 1, 0], [1, 0, 0]])
+    with pytest.raises(ValueError):
+        simulator.plan_recovery(action="preempt")
+    plan = simulator.plan_recovery(action="terminate")
+    simulator.recover(plan)
+    assert simulator.safety_algorithm()[0]
@@ -0,0 +1,103 @@
+import random
+
+from conftest import build_simulator, random_systems
+from deadlock_simulator import DeadlockDetectionSimulator
+from event_replay import replay_events
+from wait_queue import WaitQueue
+
+
+def _state(simulator):
+    return list(simulator.available), [list(r) for r in simulator.allocation]
+
+
+def test_negative_requests_are_rejected(example_safe):
+    simulator = build_simulator(*example_safe)
+    before = _state(simulator)
+    assert simulator.request_resources(1, [-2, 0, 0]) is False
+    assert simulator.is_request_safe(1, [-2, 0, 0]) == (False, [])
+    result = simulator.admit_batch([(1, [-2, 0, 0], 0), (1, [1, 0, 2], 0)])
+    assert result["denied"] == {0: "invalid"}
+    assert result["granted"] == [1]
+    simulator.release_resources(1, [1, 0, 2])
+    assert _state(simulator) == before
+    assert [outcome for *_, outcome in replay_events(simulator, [("request", 1, [0, -1, 0])])] == ["invalid"]
+    assert WaitQueue(simulator).submit(1, [0, 0, -1]) == ("invalid", None)
+    assert _state(simulator) == before
+
+
+def _snapshot(simulator):
+    """Values, element types and row identities of the mutable state"""
+    matrices = (simulator.available, simulator.allocation, simulator.need)
+    return (repr(matrices), [type(v) for row in simulator.allocation + simulator.need for v in row],
+            [id(row) for row in simulator.allocation + simulator.need], id(simulator.available))
+
+
+def test_unsafe_grant_is_undone_exactly(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.enable_verdict_cache()
+    assert simulator.request_resources(1, [1, 0, 2])
+    before = _snapshot(simulator)
+    fingerprint = simulator._fingerprint.value
+    assert not simulator.request_resources(0, [0, 2, 0])
+    assert _snapshot(simulator) == before
+    assert simulator._fingerprint.value == fingerprint
+    assert simulator._undo_log == []
+
+
+def test_random_denials_are_undone_exactly():
+    rng = random.Random(6)
+    for available, max_need, allocation in random_systems(100, max_processes=8, seed=6):
+        simulator = build_simulator(available, max_need, allocation)
+        for _ in range(10):
+            pid = rng.randrange(len(max_need))
+            request = [rng.randint(0, 3) for _ in available]
+            before = _snapshot(simulator)
+            if not simulator.request_resources(pid, request):
+                assert _snapshot(simulator) == before
+            assert simulator._undo_log == []
+
+
+def test_dry_run_batch_is_undone_exactly(example_safe):
+    simulator = build_simulator(*example_safe)
+    before = _snapshot(simulator)
+    result = simulator.admit_batch([(1, [1, 0, 2]), (0, [0, 2, 0]), (4, [3, 3, 0])], apply=False)
+    assert result["granted"]
+    assert _snapshot(simulator) == before
+    assert simulator._undo_log == []
+
+
+class CountingSimulator(DeadlockDetectionSimulator):
+    __slots__ = ("checks",)
+
+    def _verify_safe(self, *args, **kwargs):
+        self.checks += 1
+        return super()._verify_safe(*args, **kwargs)
+
+
+def test_grantable_batch_takes_one_safety_check(example_safe):
+    simulator = CountingSimulator(engine="worklist")
+    simulator.num_processes, simulator.num_resources = 5, 3
+    simulator.available = list(example_safe[0])
+    simulator.max_need = [list(row) for row in example_safe[1]]
+    simulator.allocation = [list(row) for row in example_safe[2]]
+    simulator.calculate_need()
+    simulator.checks = 0
+    result = simulator.admit_batch([(1, [1, 0, 0]), (3, [0, 1, 0]), (1, [0, 0, 1]), (9, [0, 0, 0])])
+    assert result["granted"] == [0, 1, 2]
+    assert result["denied"] == {3: "invalid"}
+    assert simulator.checks == 1
+
+
+def test_batch_grants_what_one_by_one_admission_grants():
+    rng = random.Random(5)
+    for available, max_need, allocation in random_systems(150, seed=5):
+        batched = build_simulator(available, max_need, allocation)
+        single = build_simulator(available, max_need, allocation)
+        requests = []
+        for _ in range(rng.randint(2, 6)):
+            pid = rng.randrange(len(max_need))
+            requests.append((pid, [rng.randint(0, max(0, v) // 2 + 1) for v in batched.need[pid]]))
+        result = batched.admit_batch(requests)
+        expected = [k for k, (pid, request) in enumerate(requests) if single.request_resources(pid, request)]
+        assert result["granted"] == expected
+        assert _state(batched) == _state(single)
@@ -0,0 +1,10 @@
+from scenario_sweep import run_sweep, scenario_grid
+
+
+def test_pooled_single_worker_matches_in_process():
+    scenarios = scenario_grid((5, 12), 3)[:4]
+    in_process = run_sweep(scenarios, systems=150, workers=1, chunk_size=40)
+    pooled = run_sweep(scenarios, systems=150, workers=1, chunk_size=40, pool=True)
+    assert [(row["systems"], row["safe"]) for row in pooled["rows"]] == \
+        [(row["systems"], row["safe"]) for row in in_process["rows"]]
+    assert pooled["systems"] == 600
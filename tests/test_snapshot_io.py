@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from conftest import build_simulator
+from snapshot_io import load_snapshot, save_snapshot
+
+
+@pytest.mark.parametrize("suffix", [".json", ".csv", ".bin"])
+def test_round_trip(example_safe, tmp_path, suffix):
+    path = str(tmp_path / f"state{suffix}")
+    save_snapshot(build_simulator(*example_safe), path)
+    loaded = load_snapshot(path)
+    assert list(loaded.available) == example_safe[0]
+    assert [list(row) for row in loaded.max_need] == example_safe[1]
+    assert [list(row) for row in loaded.allocation] == example_safe[2]
+
+
+@pytest.mark.parametrize("keep", [0, 4, 20, -4])
+def test_truncated_binary_raises_value_error(example_safe, tmp_path, keep):
+    path = tmp_path / "state.bin"
+    save_snapshot(build_simulator(*example_safe), str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[:keep])
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+@pytest.mark.parametrize("data", [
+    {"available": 5, "max_need": [[1]], "allocation": [[0]]},
+    {"available": [5], "max_need": [1], "allocation": [0]},
+    {"available": ["5"], "max_need": [[1]], "allocation": [[0]]},
+    {"available": [5], "max_need": None, "allocation": None},
+    [1, 2, 3],
+    {"available": [1.5], "max_need": [[2]], "allocation": [[0]]},
+    {"available": [5, 5], "max_need": [[2, 1]], "allocation": [[0, 0.5]]},
+    {"available": [True], "max_need": [[1]], "allocation": [[0]]},
+    {"available": [5], "max_need": [[1]], "allocation": [[False]]},
+    {"available": [5], "max_need": [[None]], "allocation": [[0]]},
+])
+def test_malformed_json_raises_value_error(tmp_path, data):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+def test_integral_floats_load_as_ints(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"available": [3.0], "max_need": [[2.0]], "allocation": [[1]]}))
+    simulator = load_snapshot(str(path))
+    assert simulator.available == [3] and type(simulator.available[0]) is int
+    assert simulator.need == [[1]]
+
+
+def test_large_json_with_a_fraction_is_rejected(tmp_path):
+    rows = [[2] * 100 for _ in range(1000)]
+    rows[-1][-1] = 1.5              # large enough for the NumPy path
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"available": [1] * 100, "max_need": rows, "allocation": [[0] * 100] * 1000}))
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
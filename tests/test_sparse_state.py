@@ -0,0 +1,113 @@
+import random
+from array import array
+
+import pytest
+
+from conftest import build_simulator, random_systems
+from sparse_state import SparseState
+
+
+def _sparse_system(available, max_need, allocation):
+    """Zero out two thirds of Max so the rows have real gaps"""
+    max_need = [[v if v % 3 == 0 else 0 for v in row] for row in max_need]
+    allocation = [[min(a, m) for a, m in zip(arow, mrow)] for arow, mrow in zip(allocation, max_need)]
+    return available, max_need, allocation
+
+
+def _assert_well_formed(state):
+    assert len(state.indptr) == state.num_processes + 1
+    assert state.indptr[-1] == len(state.indices) == len(state.max_data) == len(state.need_data)
+    for i in range(state.num_processes):
+        row = list(state.indices[state.indptr[i]:state.indptr[i + 1]])
+        assert row == sorted(set(row))
+
+
+def _assert_same_state(state, simulator):
+    assert list(state.available) == simulator.available
+    assert state.max_need.tolist() == simulator.max_need
+    assert state.allocation.tolist() == simulator.allocation
+    assert state.need.tolist() == simulator.need
+
+
+def test_mutations_match_the_list_simulator():
+    rng = random.Random(7)
+    for system in random_systems(60, max_processes=8, max_resources=6, seed=7):
+        system = _sparse_system(*system)
+        state = SparseState.from_lists(*system)
+        sparse = state.to_simulator()
+        dense = build_simulator(*system)
+        for _ in range(30):
+            action = rng.random()
+            pid = rng.randrange(dense.num_processes)
+            if action < 0.4:
+                request = [rng.randint(0, 2) for _ in range(dense.num_resources)]
+                assert sparse.request_resources(pid, request) == dense.request_resources(pid, request)
+            elif action < 0.6:
+                release = [rng.randint(0, v) for v in dense.allocation[pid]]
+                assert sparse.release_resources(pid, release) == dense.release_resources(pid, release)
+            elif action < 0.75:
+                assert sparse.exit_process(pid) == dense.exit_process(pid)
+            elif action < 0.9:
+                claim = [rng.randint(0, 4) * rng.randint(0, 1) for _ in range(dense.num_resources)]
+                reuse = pid if not any(dense.allocation[pid]) else None
+                assert sparse.add_process(claim, reuse) == dense.add_process(claim, reuse)
+            else:
+                sparse.calculate_need()
+                dense.calculate_need()
+            _assert_same_state(state, dense)
+            _assert_well_formed(state)
+            assert sparse.num_processes == state.num_processes == dense.num_processes
+        assert sparse.detect_deadlock() == dense.detect_deadlock()
+
+
+def test_setting_a_gap_inserts_one_entry():
+    state = SparseState.from_lists([5, 5, 5], [[1, 0, 3], [0, 2, 0]], [[0, 0, 1], [0, 1, 0]])
+    assert state.nnz == 3
+    state.max_need[0][1] = 4
+    assert list(state.indices) == [0, 1, 2, 1]
+    assert list(state.indptr) == [0, 3, 4]
+    assert state.max_need.tolist() == [[1, 4, 3], [0, 2, 0]]
+    assert state.allocation.tolist() == [[0, 0, 1], [0, 1, 0]]
+    assert state.need.tolist() == [[1, 0, 2], [0, 1, 0]]    # Need of the new entry is set by its owner
+
+
+def test_zero_written_to_a_gap_stores_nothing():
+    state = SparseState.from_lists([5, 5], [[1, 0]], [[0, 0]])
+    state.need[0][1] = 0
+    state.need[0][-1] = 0
+    assert state.nnz == 1
+    with pytest.raises(IndexError):
+        state.need[0][2] = 1
+
+
+def test_append_row_adds_only_the_nonzeros():
+    state = SparseState.from_lists([5, 5, 5], [[1, 0, 3]], [[1, 0, 0]])
+    state.append_row([0, 2, 0])
+    assert state.num_processes == 2
+    assert list(state.indptr) == [0, 2, 3]
+    assert state.max_need[1].tolist() == state.need[1].tolist() == [0, 2, 0]
+    assert state.allocation[1].tolist() == [0, 0, 0]
+
+
+def test_appending_values_outside_the_max_pattern_is_rejected():
+    state = SparseState.from_lists([5, 5], [[1, 0]], [[0, 0]])
+    state.max_need.append([0, 3])
+    state.allocation.append([0, 1])
+    with pytest.raises(ValueError):
+        state.allocation.append([2, 0])
+
+
+def test_calculate_need_writes_in_place():
+    state = SparseState.from_lists([5, 5], [[4, 0], [2, 3]], [[1, 0], [2, 0]])
+    need_data = state.need_data
+    state.allocation[1][1] = 3
+    assert state.calculate_need() == need_data.itemsize * 3
+    assert state.need_data is need_data
+    assert state.need.tolist() == [[3, 0], [0, 0]]
+
+
+def test_malformed_input_raises_value_error():
+    with pytest.raises(ValueError):
+        SparseState.from_entries([1], 1, [(0, 0, 1, 2)])
+    with pytest.raises(ValueError):
+        SparseState([1], array("q", [0, 2]), array("i", [0]), array("i", [1]), array("i", [0]))
@@ -0,0 +1,95 @@
+import io
+
+from conftest import build_simulator
+from detection import detect_deadlocked
+from state_render import StateRenderer
+
+# print_state output of the original console before paging existed
+CLASSIC = """
+============================================================
+                           Golden                           
+============================================================
+
+📊 Available Resources:
++---+---+
+| R0 | R1 |
++---+---+
+|  3  | 10  |
++---+---+
+
+📋 Process Information:
++---------+---------+---------+---------+---------+---------+---------+
+| Process | Max R0  | Max R1  | Alloc R0 | Alloc R1 | Need R0 | Need R1 |
++---------+---------+---------+---------+---------+---------+---------+
+|   P0    |    7    |    5    |    0    |    1    |    7    |    4    |
+|   P1    |    3    |   12    |    2    |    0    |    1    |   12    |
++---------+---------+---------+---------+---------+---------+---------+
+"""
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_small_system_keeps_classic_layout(capsys):
+    simulator = build_simulator([3, 10], [[7, 5], [3, 12]], [[0, 1], [2, 0]])
+    simulator.print_state("Golden")
+    assert capsys.readouterr().out == CLASSIC
+
+
+def test_print_state_shows_every_resource_type(capsys):
+    simulator = build_simulator([1] * 12, [[2] * 12] * 3, [[1] * 12] * 3)
+    simulator.print_state()
+    assert "Need R11" in capsys.readouterr().out
+    simulator.print_state(view="top")
+    assert "Need R11" in capsys.readouterr().out
+    assert "Need R11" in StateRenderer(simulator).render()
+
+
+def test_pages_cover_every_process_once(example_safe):
+    simulator = build_simulator(*example_safe)
+    pages = list(StateRenderer(simulator, page_size=2).pages())
+    assert len(pages) == 3
+    shown = [f"P{i}" for i in range(5) if any(f" P{i} " in page for page in pages)]
+    assert shown == ["P0", "P1", "P2", "P3", "P4"]
+    assert "rows 1-2 of 5; more on page 2" in pages[0]
+    assert "rows 5-5 of 5)" in pages[2]
+    assert "(no more processes)" in StateRenderer(simulator, page_size=2).render(page=3)
+
+
+def test_resource_columns_page_when_limited():
+    simulator = build_simulator([1] * 10, [[2] * 10] * 2, [[1] * 10] * 2)
+    renderer = StateRenderer(simulator, max_resources=4)
+    first, last = renderer.render(), renderer.render(resource_page=2)
+    assert "Need R3" in first and "Need R4" not in first
+    assert "Need R9" in last and "Need R7" not in last
+    assert "R8-R9 of 10 resource types shown" in last
+
+
+def test_summary_views(example_safe):
+    simulator = build_simulator(*example_safe)
+    renderer = StateRenderer(simulator)
+    need_sums = [sum(row) for row in simulator.need]
+    assert list(renderer.process_ids("top", top=2)) == sorted(range(5), key=lambda i: -need_sums[i])[:2]
+    blocked = [i for i, row in enumerate(simulator.need) if any(v > a for v, a in zip(row, simulator.available))]
+    assert list(renderer.process_ids("blocked")) == blocked
+    assert list(renderer.process_ids("deadlocked")) == detect_deadlocked(simulator.available,
+                                                                         simulator.allocation, simulator.need)
+    utilisation = renderer.render(view="utilisation")
+    assert "Resource Utilisation" in utilisation
+    total_r0 = simulator.available[0] + sum(row[0] for row in simulator.allocation)
+    assert " R0 " in utilisation and f" {total_r0} " in utilisation
+
+
+def test_one_write_per_page(example_safe):
+    simulator = build_simulator(*example_safe)
+    out = CountingStream()
+    StateRenderer(simulator, page_size=2).print(view="full", page=1, out=out)
+    assert out.writes == 1
+    assert " P2 " in out.getvalue() and " P3 " in out.getvalue()
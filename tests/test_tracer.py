@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from conftest import build_simulator
+from deadlock_simulator import TRACE_QUIET, TRACE_STEPS, ConsoleTracer, SafetyTracer
+
+
+class EventLog(SafetyTracer):
+    """Records every hook call as (name, args), copying live lists"""
+
+    def __init__(self):
+        self.events = []
+
+    def names(self):
+        return [name for name, _ in self.events]
+
+
+def _recorder(name):
+    def record(self, *args):
+        self.events.append((name, [list(a) if isinstance(a, list) else a for a in args]))
+    return record
+
+
+for _hook in [name for name in vars(SafetyTracer) if not name.startswith("_") and name != "counts_only"]:
+    setattr(EventLog, _hook, _recorder(_hook))
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    def fail(seconds):
+        raise AssertionError(f"slept {seconds}s")
+    monkeypatch.setattr(time, "sleep", fail)
+
+
+@pytest.mark.parametrize("engine", ["scan", "worklist"])
+def test_headless_simulator_is_silent(example_safe, capsys, no_sleep, engine):
+    simulator = build_simulator(*example_safe, engine=engine)
+    assert simulator.detect_deadlock() == (True, ["P1", "P3", "P0", "P2", "P4"])
+    assert simulator.request_resources(1, [1, 0, 2])
+    assert not simulator.request_resources(0, [0, 2, 0])
+    assert capsys.readouterr().out == ""
+
+
+def test_scan_reports_every_step_to_the_tracer(example_safe):
+    simulator = build_simulator(*example_safe, engine="scan")
+    simulator.tracer = log = EventLog()
+    simulator.detect_deadlock()
+
+    names = log.names()
+    assert names[:2] == ["detection_started", "state_changed"]
+    assert names[-2:] == ["safety_finished", "detection_finished"]
+    finished = [args[0] for name, args in log.events if name == "process_finished"]
+    assert finished == [1, 3, 0, 2, 4]
+    assert names.count("iteration") == 5
+    assert ("safety_finished", [True, [1, 3, 0, 2, 4]]) in log.events
+
+
+def test_denied_request_reports_its_steps(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.request_resources(1, [1, 0, 2])
+    simulator.tracer = log = EventLog()
+    assert not simulator.request_resources(0, [0, 2, 0])
+
+    names = log.names()
+    assert names[0] == "request_started"
+    assert names.index("request_tentative") < names.index("safety_finished")
+    assert log.events[-1] == ("request_finished", [0, False])
+
+
+def test_invalid_request_is_rejected_before_any_safety_run(example_safe):
+    simulator = build_simulator(*example_safe)
+    simulator.tracer = log = EventLog()
+    assert not simulator.request_resources(4, [4, 0, 0])
+    assert log.names() == ["request_started", "request_rejected"]
+
+
+def test_console_tracer_narrates_each_step(example_safe, capsys, no_sleep):
+    simulator = build_simulator(*example_safe, engine="scan")
+    simulator.tracer = ConsoleTracer(verbosity=TRACE_STEPS, delay=0)
+    simulator.detect_deadlock()
+    out = capsys.readouterr().out
+    assert "Iteration 5:" in out
+    assert "P1 finished. Work becomes: [5, 3, 2]" in out
+    assert "Safe sequence: P1 → P3 → P0 → P2 → P4" in out
+    assert "CONCLUSION: No deadlock detected!" in out
+
+
+def test_quiet_console_tracer_prints_only_conclusions(example_safe, capsys, no_sleep):
+    simulator = build_simulator(*example_safe, engine="scan")
+    simulator.tracer = ConsoleTracer(verbosity=TRACE_QUIET)
+    simulator.detect_deadlock()
+    simulator.request_resources(1, [1, 0, 2])
+    out = capsys.readouterr().out
+    assert "Iteration" not in out and "Running Safety Algorithm" not in out
+    assert "CONCLUSION: No deadlock detected!" in out
+    assert "Request by P1 can be GRANTED safely" in out
+
+
+def test_console_tracer_pauses_between_iterations(example_safe, monkeypatch, capsys):
+    pauses = []
+    monkeypatch.setattr(time, "sleep", pauses.append)
+    simulator = build_simulator(*example_safe, engine="scan")
+    simulator.tracer = ConsoleTracer(delay=0.25)
+    simulator.safety_algorithm()
+    assert pauses == [0.25] * 4
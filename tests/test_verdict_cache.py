@@ -0,0 +1,56 @@
+import random
+
+from conftest import build_simulator, random_systems
+
+
+def _random_operations(simulator, rng, count):
+    """Yield after each random request, release, arrival or exit"""
+    m = simulator.num_resources
+    for _ in range(count):
+        pid = rng.randrange(simulator.num_processes)
+        op = rng.random()
+        if op < 0.5:
+            simulator.request_resources(pid, [rng.randint(0, 2) for _ in range(m)])
+        elif op < 0.8:
+            simulator.release_resources(pid, [rng.randint(0, v) for v in simulator.allocation[pid]])
+        elif op < 0.9:
+            simulator.exit_process(pid)
+        else:
+            simulator.add_process([rng.randint(0, 4) for _ in range(m)])
+        yield
+
+
+def test_cached_verdicts_match_uncached():
+    rng = random.Random(5)
+    for available, max_need, allocation in random_systems(30, max_processes=8, seed=5):
+        plain = build_simulator(available, max_need, allocation)
+        cached = build_simulator(available, max_need, allocation)
+        cached.enable_verdict_cache()
+        seed = rng.random()
+        for _ in zip(_random_operations(plain, random.Random(seed), 40),
+                     _random_operations(cached, random.Random(seed), 40)):
+            assert cached.allocation == plain.allocation
+            assert cached.safety_algorithm()[0] == plain.safety_algorithm()[0]
+
+
+def test_repeated_state_is_a_hit(example_safe):
+    simulator = build_simulator(*example_safe)
+    cache = simulator.enable_verdict_cache()
+    first = simulator.safety_algorithm()
+    simulator.request_resources(1, [1, 0, 2])
+    simulator.release_resources(1, [1, 0, 2])
+    hits = cache.hits
+    assert simulator.safety_algorithm() == first
+    assert cache.hits == hits + 1
+
+
+def test_fingerprint_collision_needs_equal_available(example_safe, monkeypatch):
+    import verdict_cache
+
+    monkeypatch.setattr(verdict_cache, "_cell", lambda kind, i, j, value: 0)   # every state collides
+    simulator = build_simulator(*example_safe)
+    simulator.enable_verdict_cache()
+    assert simulator.safety_algorithm()[0]
+    assert simulator.request_resources(1, [1, 0, 2])
+    assert simulator.is_request_safe(0, [0, 2, 0]) == (False, [])
+    assert not simulator.request_resources(0, [0, 2, 0])
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from conftest import build_simulator
+from detection import IncrementalWaitForGraph, build_wait_for_graph, strongly_connected_components
+
+
+def _on_cycles(allocation, request):
+    """Processes in a cyclic component of the rebuilt wait-for graph"""
+    graph = build_wait_for_graph(allocation, request)
+    return [f"P{i}" for i in sorted(i for c in strongly_connected_components(graph) if len(c) > 1 for i in c)]
+
+
+def _assert_cycles_exist(graph, allocation, request):
+    for cycle in graph.cycles():
+        for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+            if a[0] == "P":
+                assert request[int(a[1:])][int(b[1:])], cycle
+            else:
+                assert allocation[int(b[1:])][int(a[1:])], cycle
+
+
+def test_cycle_through_two_parked_edges():
+    # Two deadlocks P0<->P1 and P2<->P3, then P1 and P3 also wait on each other's other resource
+    graph = IncrementalWaitForGraph(4, 4)
+    for i, j in ((0, 0), (1, 1), (2, 2), (3, 3)):
+        graph.grant(i, j)
+    assert graph.add_request(0, 1) is None
+    assert graph.add_request(1, 0) is not None
+    assert graph.add_request(2, 3) is None
+    assert graph.add_request(3, 2) is not None
+    # Breaking P0 <-> P1 leaves only P2 <-> P3
+    graph.remove_request(0, 1)
+    assert graph.deadlocked_processes() == ["P2", "P3"]
+    # A cycle P1 -> R2 -> P2 -> R3 -> P3 -> R0 -> P0 -> R1 -> P1 only closes through parked edges
+    graph.add_request(0, 1)
+    graph.remove_request(1, 0)
+    assert graph.add_request(1, 2) is None
+    assert graph.add_request(3, 0) is not None
+    assert graph.deadlocked_processes() == ["P0", "P1", "P2", "P3"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_rebuilt_graph_after_every_edge(seed):
+    rng = random.Random(seed)
+    n, m = rng.randint(2, 7), rng.randint(2, 7)
+    graph = IncrementalWaitForGraph(n, m)
+    holder = [None] * m
+    request = [[0] * m for _ in range(n)]
+    for _ in range(200):
+        i, j = rng.randrange(n), rng.randrange(m)
+        if holder[j] is None and rng.random() < 0.4:
+            holder[j] = i
+            request[i][j] = 0
+            graph.grant(i, j)
+        elif holder[j] == i:
+            holder[j] = None
+            graph.release(i, j)
+        elif request[i][j]:
+            request[i][j] = 0
+            graph.remove_request(i, j)
+        else:
+            request[i][j] = 1
+            graph.add_request(i, j)
+        allocation = [[int(holder[j] == i) for j in range(m)] for i in range(n)]
+        expected = _on_cycles(allocation, request)
+        assert graph.deadlocked_processes() == expected
+        assert bool(graph.cycles()) == bool(expected)
+        _assert_cycles_exist(graph, allocation, request)
+
+
+def test_simulator_updates_graph_on_release():
+    # P0 holds R0 and needs R1, P1 holds R1 and needs R0
+    simulator = build_simulator([0, 0], [[1, 1], [1, 1]], [[1, 0], [0, 1]])
+    graph = simulator.enable_wait_for_graph()
+    assert graph.deadlocked_processes() == ["P0", "P1"]
+    simulator.release_resources(1, [0, 1])
+    assert graph.deadlocked_processes() == []
+    assert simulator.request_resources(0, [0, 1])
+    assert graph.cycles() == []
+
+
+def test_simulator_keeps_graph_in_step():
+    rng = random.Random(3)
+    for _ in range(30):
+        n, m = rng.randint(2, 6), rng.randint(2, 6)
+        max_need = [[int(rng.random() < 0.6) for _ in range(m)] for _ in range(n)]
+        allocation = [[0] * m for _ in range(n)]
+        available = [1] * m
+        for j in range(m):
+            claimants = [i for i in range(n) if max_need[i][j]]
+            if claimants and rng.random() < 0.7:
+                allocation[rng.choice(claimants)][j] = 1
+                available[j] = 0
+        simulator = build_simulator(available, max_need, allocation)
+        graph = simulator.enable_wait_for_graph()
+        for _ in range(40):
+            assert graph.num_processes == simulator.num_processes
+            assert graph.deadlocked_processes() == _on_cycles(simulator.allocation, simulator.need)
+            pid = rng.randrange(simulator.num_processes)
+            choice = rng.random()
+            if choice < 0.5:
+                request = [int(v and a and rng.random() < 0.5) for v, a in
+                           zip(simulator.need[pid], simulator.available)]
+                simulator.request_resources(pid, request)
+            elif choice < 0.8:
+                simulator.release_resources(pid, [a * (rng.random() < 0.5) for a in simulator.allocation[pid]])
+            elif choice < 0.9:
+                simulator.exit_process(pid)
+            else:
+                simulator.add_process([int(rng.random() < 0.5) for _ in range(m)])
@@ -0,0 +1,83 @@
+import random
+
+from conftest import build_simulator, random_systems
+from wait_queue import WaitQueue
+
+
+class RetryEveryRelease(WaitQueue):
+    """Reference queue: every unsafe waiter counts as stuck behind every process"""
+
+    def _stuck(self, waiter):
+        return set(range(self.simulator.num_processes))
+
+
+def _drive(queue, rng, steps):
+    simulator = queue.simulator
+    outcomes = []
+    for _ in range(steps):
+        pid = rng.randrange(simulator.num_processes)
+        choice = rng.random()
+        if choice < 0.55:
+            request = [rng.randint(0, v) for v in simulator.need[pid]]
+            outcomes.append(("submit", queue.submit(pid, request)[0]))
+        elif choice < 0.9:
+            release = [rng.randint(0, v) for v in simulator.allocation[pid]]
+            outcomes.append(("release", queue.release(pid, release)))
+        else:
+            outcomes.append(("exit", queue.exit(pid)))
+    return outcomes
+
+
+def test_unsafe_waiters_woken_only_when_needed_match_full_rescan():
+    for seed, system in enumerate(random_systems(60, seed=11)):
+        queues = [cls(build_simulator(*system)) for cls in (WaitQueue, RetryEveryRelease)]
+        results = [_drive(queue, random.Random(seed), 60) for queue in queues]
+        assert results[0] == results[1]
+        assert queues[0].simulator.allocation == queues[1].simulator.allocation
+        assert len(queues[0]) == len(queues[1])
+
+
+def test_release_by_a_process_that_can_finish_skips_the_retry():
+    # Granting P0 [1, 0] would leave P1 short of R0 forever; P2 can always finish
+    simulator = build_simulator([1, 1], [[2, 0], [2, 1], [0, 2]], [[0, 0], [1, 0], [0, 1]])
+    queue = WaitQueue(simulator)
+    calls = []
+    original = simulator.request_resources
+    outcome, ticket = queue.submit(0, [1, 0])
+    assert outcome == "waiting"
+
+    class Spy(type(simulator)):
+        __slots__ = ()
+
+        def request_resources(self, process_id, request):
+            calls.append(process_id)
+            return original(process_id, request)
+
+    simulator.__class__ = Spy
+    assert queue.release(2, [0, 1]) == []
+    assert calls == []
+    assert queue.release(1, [1, 0]) == [(ticket, 0, [1, 0])]
+    assert calls == [0]
+
+
+def test_unrelated_release_after_a_grant_retries_nobody():
+    # P0..P198 fight over two R0 instances; P199 and P200 only ever touch R1
+    count = 199
+    max_need = [[2, 0]] * count + [[0, 1], [0, 1]]
+    allocation = [[1, 0]] + [[0, 0]] * (count - 1) + [[0, 1], [0, 0]]
+    queue = WaitQueue(build_simulator([1, 1], max_need, allocation))
+    for pid in range(1, count):
+        assert queue.submit(pid, [1, 0])[0] == "waiting"
+    assert queue.submit(count + 1, [0, 1])[0] == "granted"
+
+    attempts = []
+    original = queue._attempt
+    queue._attempt = lambda waiter: attempts.append(waiter.ticket) or original(waiter)
+    assert queue.release(count, [0, 1]) == []
+    assert attempts == []
+    assert len(queue) == count - 1
+
+    queue.exit(count)
+    assert attempts == []
+    queue.release(0, [1, 0])
+    assert len(attempts) == count - 1
@@ -0,0 +1,51 @@
+import random
+
+from conftest import build_simulator, need_of, random_systems
+from deadlock_simulator import replay_safe_sequence, scan_safety
+from metrics import MetricsTracer
+
+
+def test_replay_rejects_stale_and_malformed_orders(example_safe):
+    available, max_need, allocation = example_safe
+    need = need_of(max_need, allocation)
+    assert replay_safe_sequence(available, allocation, need, [1, 3, 0, 2, 4])
+    assert not replay_safe_sequence(available, allocation, need, [0, 1, 2, 3, 4])    # P0 does not fit first
+    assert not replay_safe_sequence(available, allocation, need, [1, 3, 0, 2])       # incomplete
+    assert not replay_safe_sequence(available, allocation, need, [1, 1, 3, 0, 2])    # repeated
+    # Once Available drops, the proved order is stale: P1 no longer fits first
+    assert not replay_safe_sequence([0, 0, 0], allocation, need, [1, 3, 0, 2, 4])
+
+
+def test_warm_start_matches_cold_checks_over_long_runs():
+    rng = random.Random(7)
+    replays = 0
+    for system in random_systems(40, max_processes=8, max_resources=4, seed=7):
+        warm = build_simulator(*system)
+        cold = build_simulator(*system)
+        cold.warm_start = False
+        warm.tracer = tracer = MetricsTracer()
+        for _ in range(80):
+            pid = rng.randrange(warm.num_processes)
+            choice = rng.random()
+            if choice < 0.5:
+                request = [rng.randint(0, max(0, v)) for v in warm.need[pid]]
+                assert warm.is_request_safe(pid, request)[0] == cold.is_request_safe(pid, request)[0]
+                assert warm.request_resources(pid, request) == cold.request_resources(pid, request)
+            elif choice < 0.85:
+                release = [rng.randint(0, v) for v in warm.allocation[pid]]
+                assert warm.release_resources(pid, release) == cold.release_resources(pid, release)
+            elif choice < 0.95:
+                warm.exit_process(pid)
+                cold.exit_process(pid)
+            else:
+                max_need = [rng.randint(0, 6) for _ in range(warm.num_resources)]
+                assert warm.add_process(max_need) == cold.add_process(max_need)
+            assert warm.allocation == cold.allocation
+            is_safe, order = warm.safety_algorithm()
+            assert is_safe == cold.safety_algorithm()[0] == scan_safety(warm.available, warm.allocation,
+                                                                        warm.need)[0]
+            if is_safe:
+                assert replay_safe_sequence(warm.available, warm.allocation, warm.need,
+                                            [int(label[1:]) for label in order])
+        replays += tracer.warm_replays
+    assert replays > 0
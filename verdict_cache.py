@@ -0,0 +1,127 @@
+"""
+Safety Verdict Cache
+Author: OS Learning Project
+Description: Memoizes (is_safe, safe_sequence) by an incrementally maintained
+             fingerprint of (Available, Allocation, Need), with LRU eviction
+"""
+
+from collections import OrderedDict
+
+# Matrix tags mixed into every cell hash
+_AVAILABLE = 0
+_ALLOCATION = 1
+_NEED = 2
+
+_MASK = (1 << 64) - 1
+
+
+def _cell(kind, i, j, value):
+    # Zero cells contribute nothing, so idle rows are free to add and clear
+    return hash((kind, i, j, value)) & _MASK if value else 0
+
+
+class StateFingerprint:
+    """
+    64-bit hash of a Banker's state kept as a sum of per-cell hashes, so
+    changing a cell only subtracts its old hash and adds the new one: a grant
+    or release of an m-vector costs O(m), never a rehash of the matrices.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, available, allocation, need):
+        self.value = 0
+        self.rehash(available, allocation, need)
+
+    def rehash(self, available, allocation, need):
+        """Recompute from scratch: O(n·m)"""
+        total = sum(_cell(_AVAILABLE, 0, j, v) for j, v in enumerate(available))
+        for i, (alloc_row, need_row) in enumerate(zip(allocation, need)):
+            total += sum(_cell(_ALLOCATION, i, j, v) for j, v in enumerate(alloc_row))
+            total += sum(_cell(_NEED, i, j, v) for j, v in enumerate(need_row))
+        self.value = total & _MASK
+
+    def with_grant(self, process_id, request, available, allocation_row, need_row, sign=1):
+        """
+        Fingerprint of the state after moving `request` from Available to the
+        process (sign=-1 moves it back), given the rows before the change
+        Returns: the new value; the fingerprint itself is left unchanged
+        """
+        value = self.value
+        for j, amount in enumerate(request):
+            if amount:
+                amount *= sign
+                a, h, n = available[j], allocation_row[j], need_row[j]
+                value += (_cell(_AVAILABLE, 0, j, a - amount) - _cell(_AVAILABLE, 0, j, a)
+                          + _cell(_ALLOCATION, process_id, j, h + amount) - _cell(_ALLOCATION, process_id, j, h)
+                          + _cell(_NEED, process_id, j, n - amount) - _cell(_NEED, process_id, j, n))
+        return value & _MASK
+
+    def apply_grant(self, process_id, request, available, allocation_row, need_row, sign=1):
+        """Account for a grant (or a release with sign=-1) about to be applied"""
+        self.value = self.with_grant(process_id, request, available, allocation_row, need_row, sign)
+
+    def replace_need_row(self, process_id, old_row, new_row):
+        """Account for a process's Need row about to change (arrival or exit)"""
+        value = self.value
+        for j, (old, new) in enumerate(zip(old_row, new_row)):
+            if old != new:
+                value += _cell(_NEED, process_id, j, new) - _cell(_NEED, process_id, j, old)
+        self.value = value & _MASK
+
+
+class VerdictCache:
+    """
+    Bounded LRU map from state fingerprints to (is_safe, safe_sequence).
+    Keys are (num_processes, fingerprint, Available); sequences are stored as tuples.
+    A hit is trusted without comparing Allocation and Need, which would cost
+    O(n·m). Two distinct states with the same Available share a key only if
+    their 64-bit fingerprints collide: about one chance in 2^64 per pair, so
+    around 2^32 cached states before a wrong verdict becomes likely. Callers
+    that cannot accept that risk should keep the cache off.
+    """
+
+    def __init__(self, max_size=1024):
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns: the cached (is_safe, safe_sequence), or None on a miss"""
+        verdict = self._entries.get(key)
+        if verdict is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return verdict
+
+    def put(self, key, is_safe, sequence):
+        """Store a verdict, evicting the least recently used entry when full"""
+        self._entries[key] = (is_safe, tuple(sequence))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; the statistics are kept"""
+        self._entries.clear()
+
+    def stats(self):
+        """Returns: dict with size, max_size, hits, misses, evictions and hit_rate"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,180 @@
+"""
+Deferred Request Queue
+Author: OS Learning Project
+Description: Parks denied resource requests and retries them when resources are
+             released, waking only the waiters a release can actually unblock
+"""
+
+import heapq
+
+from deadlock_simulator import SafetyWorklist
+
+# Wakeup ordering policies
+WAIT_FIFO = "fifo"            # Oldest waiter first
+WAIT_PRIORITY = "priority"    # Highest priority first, plus `aging` per event waited
+
+
+class _Waiter:
+    __slots__ = ("ticket", "process_id", "request", "priority", "enqueued", "blocked", "generation",
+                 "stuck")
+
+    def __init__(self, ticket, process_id, request, priority, enqueued):
+        self.ticket = ticket
+        self.process_id = process_id
+        self.request = list(request)
+        self.priority = priority
+        self.enqueued = enqueued
+        self.blocked = 0          # resource types still short when last parked
+        self.generation = 0       # bumped on every re-park; older index entries are stale
+        self.stuck = ()           # processes left unfinished if an unsafe request were granted
+
+
+class WaitQueue:
+    """
+    Wait queue in front of DeadlockDetectionSimulator.request_resources.
+    A request short on Available is indexed under every resource it is short on,
+    in a heap ordered by the amount it asks for, so a release of Rj only pops the
+    waiters whose Rj amount the new Available[j] covers. A waiter is retried once
+    none of its resources is short any more.
+    A request denied as unsafe records which processes could not finish if it
+    were granted (one extra safety pass when it is parked) and is filed under
+    each of them. A release or exit by any other process finishes in the safety
+    run either way, and a grant can only make more processes stuck, so neither
+    can make the request safe: it is retried only when a process it is filed
+    under releases or exits, and re-filed with a fresh set if still unsafe.
+    Wakeups therefore cost in proportion to the waiters they concern, not to
+    the length of the queue.
+    """
+
+    def __init__(self, simulator, policy=WAIT_FIFO, aging=0.0):
+        if policy not in (WAIT_FIFO, WAIT_PRIORITY):
+            raise ValueError(f"Unknown wait policy '{policy}'")
+        self.simulator = simulator
+        self.policy = policy
+        self.aging = aging
+        self._waiters = {}                                      # ticket -> _Waiter
+        self._by_resource = [[] for _ in range(simulator.num_resources)]
+        self._by_process = {}                                   # pid -> tickets it waits on
+        self._stuck_on = {}                                     # pid -> unsafe tickets filed under it
+        self._clock = 0                                         # submit/release events seen
+        self._next_ticket = 0
+
+    def __len__(self):
+        return len(self._waiters)
+
+    def submit(self, process_id, request, priority=0):
+        """
+        Request resources, parking the request if it cannot be granted now
+        Returns: (outcome, ticket) - outcome is "granted", "waiting",
+                 "exceeds-need" or "invalid"; ticket identifies a waiting request
+        """
+        self._clock += 1
+        waiter = _Waiter(self._next_ticket, process_id, request, priority, self._clock)
+        self._next_ticket += 1
+        outcome = self._attempt(waiter)
+        return outcome, waiter.ticket if outcome == "waiting" else None
+
+    def cancel(self, ticket):
+        """Withdraw a waiting request; returns True if it was still waiting"""
+        waiter = self._waiters.get(ticket)
+        if waiter is None:
+            return False
+        self._unpark(waiter)
+        return True
+
+    def release(self, process_id, release):
+        """
+        Release resources and retry the waiters it may unblock
+        Returns: list of (ticket, process_id, request) granted by this release
+        """
+        self._clock += 1
+        if not self.simulator.release_resources(process_id, release):
+            return []
+        return self._wake(process_id, release)
+
+    def exit(self, process_id):
+        """
+        Finish a process: drop its waiting requests, release what it holds and
+        retry the waiters that release may unblock
+        Returns: list of (ticket, process_id, request) granted as a result
+        """
+        self._clock += 1
+        for ticket in list(self._by_process.get(process_id, ())):
+            self.cancel(ticket)
+        return self._wake(process_id, self.simulator.exit_process(process_id))
+
+    def _attempt(self, waiter):
+        simulator = self.simulator
+        problem = simulator._check_request(waiter.process_id, waiter.request)
+        if problem is None:
+            if simulator.request_resources(waiter.process_id, waiter.request):
+                return "granted"
+            self._park(waiter, [], self._stuck(waiter))
+            return "waiting"
+        if problem[0] == "unavailable":
+            available = simulator.available
+            self._park(waiter, [j for j, amount in enumerate(waiter.request) if amount > available[j]])
+            return "waiting"
+        return problem[0]
+
+    def _stuck(self, waiter):
+        """Returns: the processes that could not finish with the waiter's request granted"""
+        worklist = SafetyWorklist(*self.simulator._with_grant(waiter.process_id, waiter.request))
+        worklist.run()
+        return [i for i, finished in enumerate(worklist.finish) if not finished]
+
+    def _park(self, waiter, short, stuck=()):
+        waiter.generation += 1
+        waiter.blocked = len(short)
+        waiter.stuck = stuck
+        self._waiters[waiter.ticket] = waiter
+        self._by_process.setdefault(waiter.process_id, set()).add(waiter.ticket)
+        for j in short:
+            heapq.heappush(self._by_resource[j], (waiter.request[j], waiter.ticket, waiter.generation))
+        for pid in stuck:
+            self._stuck_on.setdefault(pid, set()).add(waiter.ticket)
+
+    def _unpark(self, waiter):
+        """Drop a waiter from every index (heap entries go stale through its generation)"""
+        del self._waiters[waiter.ticket]
+        waiter.generation += 1
+        tickets = self._by_process[waiter.process_id]
+        tickets.discard(waiter.ticket)
+        if not tickets:
+            del self._by_process[waiter.process_id]
+        for pid in waiter.stuck:
+            tickets = self._stuck_on[pid]
+            tickets.discard(waiter.ticket)
+            if not tickets:
+                del self._stuck_on[pid]
+        waiter.stuck = ()
+
+    def _wake(self, process_id, release):
+        available = self.simulator.available
+        candidates = [self._waiters[t] for t in self._stuck_on.get(process_id, ())]
+        for j, amount in enumerate(release):
+            if not amount:
+                continue
+            heap = self._by_resource[j]
+            while heap and heap[0][0] <= available[j]:
+                _, ticket, generation = heapq.heappop(heap)
+                waiter = self._waiters.get(ticket)
+                if waiter is None or waiter.generation != generation:
+                    continue    # cancelled, granted or re-parked since
+                waiter.blocked -= 1
+                if waiter.blocked == 0:
+                    candidates.append(waiter)
+
+        candidates.sort(key=self._rank)
+        granted = []
+        for waiter in candidates:
+            self._unpark(waiter)
+            outcome = self._attempt(waiter)
+            if outcome == "granted":
+                granted.append((waiter.ticket, waiter.process_id, waiter.request))
+        return granted
+
+    def _rank(self, waiter):
+        if self.policy == WAIT_FIFO:
+            return waiter.enqueued
+        return -(waiter.priority + self.aging * (self._clock - waiter.enqueued)), waiter.enqueued